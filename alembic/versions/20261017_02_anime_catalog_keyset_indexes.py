@@ -0,0 +1,37 @@
+"""anime catalog keyset indexes
+
+Revision ID: 20261017_02
+Revises: 20260227_01
+Create Date: 2026-10-17 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_02"
+down_revision: Union[str, None] = "20260227_01"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_animes_title_keyset",
+        "animes",
+        [sa.text("coalesce(title, '')"), "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_animes_members_keyset",
+        "animes",
+        [sa.text("coalesce(members, -1)"), "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_animes_members_keyset", table_name="animes")
+    op.drop_index("ix_animes_title_keyset", table_name="animes")
@@ -0,0 +1,73 @@
+"""catalog import jobs and checkpoints
+
+Revision ID: 20261017_03
+Revises: 20261017_02
+Create Date: 2026-10-17 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_03"
+down_revision: Union[str, None] = "20261017_02"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "catalog_import_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("start_year", sa.Integer(), nullable=False),
+        sa.Column("end_year", sa.Integer(), nullable=False),
+        sa.Column("seasons", sa.String(), nullable=False),
+        sa.Column("pages_per_season", sa.Integer(), nullable=False),
+        sa.Column("inserted_or_updated", sa.Integer(), nullable=False),
+        sa.Column("created_by", sa.Integer(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("heartbeat_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["created_by"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_catalog_import_jobs_id", "catalog_import_jobs", ["id"], unique=False)
+    op.create_index("ix_catalog_import_jobs_status", "catalog_import_jobs", ["status"], unique=False)
+
+    op.create_table(
+        "catalog_import_segments",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("job_id", sa.Integer(), nullable=False),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("season", sa.String(), nullable=False),
+        sa.Column("page", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("items_fetched", sa.Integer(), nullable=False),
+        sa.Column("inserted_or_updated", sa.Integer(), nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["job_id"], ["catalog_import_jobs.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("job_id", "year", "season", "page", name="uq_catalog_import_segment"),
+    )
+    op.create_index("ix_catalog_import_segments_id", "catalog_import_segments", ["id"], unique=False)
+    op.create_index(
+        "ix_catalog_import_segments_job_status",
+        "catalog_import_segments",
+        ["job_id", "status"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_catalog_import_segments_job_status", table_name="catalog_import_segments")
+    op.drop_index("ix_catalog_import_segments_id", table_name="catalog_import_segments")
+    op.drop_table("catalog_import_segments")
+    op.drop_index("ix_catalog_import_jobs_status", table_name="catalog_import_jobs")
+    op.drop_index("ix_catalog_import_jobs_id", table_name="catalog_import_jobs")
+    op.drop_table("catalog_import_jobs")
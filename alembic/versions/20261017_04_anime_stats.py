@@ -0,0 +1,52 @@
+"""materialized per-anime stats aggregate
+
+Revision ID: 20261017_04
+Revises: 20261017_03
+Create Date: 2026-10-17 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_04"
+down_revision: Union[str, None] = "20261017_03"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "anime_stats",
+        sa.Column("anime_id", sa.Integer(), nullable=False),
+        sa.Column("watcher_count", sa.Integer(), nullable=False),
+        sa.Column("score_sum", sa.Integer(), nullable=False),
+        sa.Column("score_count", sa.Integer(), nullable=False),
+        sa.Column("average_score", sa.Float(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["anime_id"], ["animes.id"]),
+        sa.PrimaryKeyConstraint("anime_id"),
+    )
+    op.create_index("ix_anime_stats_average_score", "anime_stats", ["average_score", "anime_id"], unique=False)
+    op.create_index("ix_anime_stats_watcher_count", "anime_stats", ["watcher_count", "anime_id"], unique=False)
+    op.execute(
+        """
+        INSERT INTO anime_stats (anime_id, watcher_count, score_sum, score_count, average_score, updated_at)
+        SELECT anime_id,
+               COUNT(id),
+               COALESCE(SUM(score), 0),
+               COUNT(score),
+               CASE WHEN COUNT(score) > 0 THEN CAST(SUM(score) AS FLOAT) / COUNT(score) END,
+               CURRENT_TIMESTAMP
+        FROM user_animes
+        GROUP BY anime_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_anime_stats_watcher_count", table_name="anime_stats")
+    op.drop_index("ix_anime_stats_average_score", table_name="anime_stats")
+    op.drop_table("anime_stats")
@@ -0,0 +1,55 @@
+"""home timeline entries and activity fan-out flag
+
+Revision ID: 20261017_05
+Revises: 20261017_04
+Create Date: 2026-10-17 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_05"
+down_revision: Union[str, None] = "20261017_04"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Atividades existentes ficam com fanned_out=False e sao lidas pelo caminho de pull.
+    op.add_column(
+        "activities",
+        sa.Column("fanned_out", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+    op.create_index("ix_activities_pull", "activities", ["fanned_out", "user_id", "created_at"], unique=False)
+
+    op.create_table(
+        "timeline_entries",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+        sa.Column("activity_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["owner_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["activity_id"], ["activities.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("owner_id", "activity_id", name="uq_timeline_owner_activity"),
+    )
+    op.create_index("ix_timeline_entries_id", "timeline_entries", ["id"], unique=False)
+    op.create_index("ix_timeline_entries_activity_id", "timeline_entries", ["activity_id"], unique=False)
+    op.create_index(
+        "ix_timeline_entries_owner_created",
+        "timeline_entries",
+        ["owner_id", "created_at", "activity_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_timeline_entries_owner_created", table_name="timeline_entries")
+    op.drop_index("ix_timeline_entries_activity_id", table_name="timeline_entries")
+    op.drop_index("ix_timeline_entries_id", table_name="timeline_entries")
+    op.drop_table("timeline_entries")
+    op.drop_index("ix_activities_pull", table_name="activities")
+    op.drop_column("activities", "fanned_out")
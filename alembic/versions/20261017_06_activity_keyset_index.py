@@ -0,0 +1,27 @@
+"""activity keyset index for cursor pagination
+
+Revision ID: 20261017_06
+Revises: 20261017_05
+Create Date: 2026-10-17 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_06"
+down_revision: Union[str, None] = "20261017_05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # (user_id, created_at, id) cobre o desempate do cursor e substitui o indice antigo.
+    op.create_index("ix_activities_user_keyset", "activities", ["user_id", "created_at", "id"], unique=False)
+    op.drop_index("ix_activities_user_created", table_name="activities")
+
+
+def downgrade() -> None:
+    op.create_index("ix_activities_user_created", "activities", ["user_id", "created_at"], unique=False)
+    op.drop_index("ix_activities_user_keyset", table_name="activities")
@@ -0,0 +1,39 @@
+"""transactional outbox for domain events
+
+Revision ID: 20261017_07
+Revises: 20261017_06
+Create Date: 2026-10-17 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_07"
+down_revision: Union[str, None] = "20261017_06"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "outbox_events",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("event_name", sa.String(), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("published_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_outbox_events_id", "outbox_events", ["id"], unique=False)
+    op.create_index("ix_outbox_events_pending", "outbox_events", ["published_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_outbox_events_pending", table_name="outbox_events")
+    op.drop_index("ix_outbox_events_id", table_name="outbox_events")
+    op.drop_table("outbox_events")
@@ -0,0 +1,27 @@
+"""lease columns for outbox claims
+
+Revision ID: 20261017_08
+Revises: 20261017_07
+Create Date: 2026-10-17 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_08"
+down_revision: Union[str, None] = "20261017_07"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("outbox_events", sa.Column("claimed_by", sa.String(length=32), nullable=True))
+    op.add_column("outbox_events", sa.Column("claimed_until", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("outbox_events", "claimed_until")
+    op.drop_column("outbox_events", "claimed_by")
@@ -3,17 +3,75 @@
 # Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
 # Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
 
+from dataclasses import asdict, dataclass
+
 import jwt
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
 
+from app import models
+from app.core.cache import cache_store
 from app.core.config import settings
 from app.database import get_db
 from app.repositories.user_repository import UserRepository
 
 security = HTTPBearer()
 
+PRINCIPAL_CACHE_PREFIX = "auth:principal:"
+_PRINCIPAL_FIELDS = ("username", "email", "role", "is_active")
+_PENDING_INVALIDATIONS = "principal_invalidations"
+
+
+@dataclass(frozen=True)
+class Principal:
+    # Snapshot do usuario autenticado: o que as rotas usam, sem sessao nem lazy load.
+    id: int
+    username: str
+    email: str
+    role: str
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: models.User) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            role=user.role,
+            is_active=bool(user.is_active),
+        )
+
+
+def principal_cache_key(user_id: int) -> str:
+    return f"{PRINCIPAL_CACHE_PREFIX}{user_id}"
+
+
+def invalidate_principal(user_id: int) -> None:
+    cache_store.invalidate(principal_cache_key(user_id))
+
+
+def _load_principal(db: Session, user_id: int | None, username: str) -> Principal | None:
+    if user_id is not None:
+        cached = cache_store.get(principal_cache_key(user_id))
+        if cached is not None:
+            return Principal(**cached)
+        user = UserRepository().get_by_id(db, user_id)
+    else:
+        # Token emitido antes do claim uid: vai ao banco ate expirar.
+        user = UserRepository().get_by_username(db, username)
+    if not user:
+        return None
+    principal = Principal.from_user(user)
+    cache_store.set(
+        principal_cache_key(principal.id),
+        asdict(principal),
+        ttl_seconds=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS,
+    )
+    return principal
+
 
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
@@ -35,19 +93,48 @@ def get_current_user(
         )
 
     username = payload.get("sub")
-    if not username:
+    user_id = payload.get("uid")
+    if not username or (user_id is not None and not isinstance(user_id, int)):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token payload",
         )
 
-    user = UserRepository().get_by_username(db, username)
-    if not user:
+    principal = _load_principal(db, user_id, username)
+    if not principal or principal.username != username:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found for token",
         )
-    return user
+    return principal
+
+
+@event.listens_for(models.User, "after_update")
+def _track_principal_change(mapper, connection, target) -> None:
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in _PRINCIPAL_FIELDS):
+        session = object_session(target)
+        if session is not None:
+            session.info.setdefault(_PENDING_INVALIDATIONS, set()).add(target.id)
+
+
+@event.listens_for(models.User, "after_delete")
+def _track_principal_delete(mapper, connection, target) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_INVALIDATIONS, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_principals(session: Session) -> None:
+    # So depois do commit: invalidar no flush deixaria outro request recarregar o valor antigo.
+    for user_id in session.info.pop(_PENDING_INVALIDATIONS, ()):
+        invalidate_principal(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_principal_changes(session: Session) -> None:
+    session.info.pop(_PENDING_INVALIDATIONS, None)
 
 
 
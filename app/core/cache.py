@@ -3,10 +3,22 @@
 # Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
 # Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
 
+import logging
+import math
+import random
 import threading
 import time
 import json
+import uuid
+from collections import OrderedDict
+from datetime import date
+from itertools import islice
+from contextlib import contextmanager
+from typing import Callable
 
+from prometheus_client import Counter, Gauge
+
+from app.core.cache_codecs import CacheSerializer
 from app.core.config import settings
 
 try:
@@ -14,70 +26,533 @@ try:
 except Exception:  # pragma: no cover
     redis = None
 
+logger = logging.getLogger(__name__)
+
+CACHE_REQUESTS = Counter(
+    "anime_manager_cache_requests_total",
+    "Cache lookups per tier and result",
+    ["tier", "result"],
+)
+CACHE_EVICTIONS = Counter(
+    "anime_manager_cache_evictions_total",
+    "Entries dropped from the in-process cache tier",
+    ["reason"],
+)
+CACHE_COMPUTE = Counter(
+    "anime_manager_cache_compute_total",
+    "get_or_compute outcomes (fresh, stale, computed, coalesced)",
+    ["outcome"],
+)
+CACHE_ENTRIES = Gauge("anime_manager_cache_entries", "Entries held by the in-process cache tier")
+CACHE_BYTES = Gauge("anime_manager_cache_bytes", "Estimated bytes held by the in-process cache tier")
+
+
+# Containers maiores que isso sao estimados por amostra (primeiros itens x tamanho).
+_SIZE_SAMPLE_ITEMS = 32
+# Acima disso a amostra pode errar o bastante para pesar no teto de bytes: mede serializando.
+_EXACT_SIZE_THRESHOLD = 64 * 1024
+
+
+def _structural_size(value, depth: int = 0) -> int:
+    # Aproxima o tamanho em JSON sem serializar: custo limitado pela amostra, nao pelo valor.
+    if isinstance(value, str):
+        return len(value) + 2
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if value is None or isinstance(value, (bool, int, float)):
+        return 8
+    if isinstance(value, date):
+        return 32
+    if depth >= 8:
+        return 64
+    if isinstance(value, dict):
+        items = list(islice(value.items(), _SIZE_SAMPLE_ITEMS))
+        sampled = sum(len(str(item_key)) + 4 + _structural_size(item, depth + 1) for item_key, item in items)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = list(islice(value, _SIZE_SAMPLE_ITEMS))
+        sampled = sum(_structural_size(item, depth + 1) + 1 for item in items)
+    else:
+        return 64
+    if not items:
+        return 2
+    return 2 + sampled * len(value) // len(items)
+
+
+def _estimate_size(key: str, value, encoded: bytes | None = None) -> int:
+    # Com Redis o valor ja foi codificado para o L2: usa esses bytes em vez de serializar de novo.
+    if encoded is not None:
+        return len(key) + len(encoded)
+    size = _structural_size(value)
+    if size >= _EXACT_SIZE_THRESHOLD:
+        try:
+            size = len(json.dumps(value, default=str, separators=(",", ":")).encode("utf-8"))
+        except Exception:
+            pass
+    return len(key) + size
+
+
+_ENVELOPE_MARKER = "__cache_envelope__"
+
+# Libera o lock do Redis somente se ainda for o dono (token), evitando apagar lock alheio.
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _unwrap(value):
+    if isinstance(value, dict) and value.get(_ENVELOPE_MARKER):
+        return value.get("value")
+    return value
+
+
+class _LocalTier:
+    """L1 em processo: LRU limitado por entradas e por bytes estimados, com TTL por chave.
+
+    Expirados saem no get (lazy) e tambem pelo sweep(), chamado periodicamente
+    pela thread de limpeza do CacheStore.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int | None = None):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes if max_bytes and max_bytes > 0 else None
+        self._data: OrderedDict[str, tuple[float, object, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value, _size = entry
+            if expires_at < time.time():
+                self._pop(key)
+                CACHE_EVICTIONS.labels("expired").inc()
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl_seconds: float, encoded: bytes | None = None) -> None:
+        size = _estimate_size(key, value, encoded)
+        with self._lock:
+            self._pop(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                # Valor maior que o teto inteiro: nao admite (evitaria esvaziar o cache por um item).
+                CACHE_EVICTIONS.labels("rejected").inc()
+                return
+            self._data[key] = (time.time() + ttl_seconds, value, size)
+            self._bytes += size
+            self._evict_over_capacity()
+
+    def replace(self, key: str, expected, value, ttl_seconds: float) -> bool:
+        # Compare-and-set: so grava se a entrada ainda e o mesmo objeto lido pelo chamador.
+        size = _estimate_size(key, value)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] is not expected or entry[0] < time.time():
+                return False
+            self._pop(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                CACHE_EVICTIONS.labels("rejected").inc()
+                return True
+            self._data[key] = (time.time() + ttl_seconds, value, size)
+            self._bytes += size
+            self._evict_over_capacity()
+            return True
+
+    def _evict_over_capacity(self) -> None:
+        # Chamado com o lock ja adquirido; remove do mais antigo (LRU) ate caber nos tetos.
+        while len(self._data) > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes):
+            oldest = next(iter(self._data))
+            self._pop(oldest)
+            CACHE_EVICTIONS.labels("size").inc()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._pop(key)
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                self._pop(key)
+
+    def sweep(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (expires_at, _value, _size) in self._data.items() if expires_at < now]
+            for key in expired:
+                self._pop(key)
+        if expired:
+            CACHE_EVICTIONS.labels("expired").inc(len(expired))
+        return len(expired)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _pop(self, key: str) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
 
 class CacheStore:
+    """Cache em dois niveis: L1 local (LRU/TTL) na frente do Redis (L2), quando configurado.
+
+    Sem Redis o L1 e o unico nivel e guarda o TTL completo. Com Redis o L1 guarda
+    no maximo CACHE_L1_TTL_SECONDS e invalidacoes sao propagadas aos outros workers
+    via pub/sub; o TTL curto limita a defasagem se alguma mensagem se perder.
+
+    Familias grandes de chaves (ex.: stats:user:{id}) usam namespaces versionados:
+    namespace_key embute a versao atual e invalidate_namespace e um unico INCR,
+    sem varrer chaves. As chaves da versao antiga morrem pelo proprio TTL.
+
+    get_or_compute e o cache-aside com protecao contra stampede: misses
+    concorrentes da mesma chave viram um unico calculo (lock local + lock NX no
+    Redis), valores vencidos dentro de stale_seconds continuam sendo servidos
+    enquanto um unico chamador recalcula, e a expiracao antecipada
+    probabilistica (XFetch) espalha as renovacoes antes do vencimento.
+    Escritas usam mark_dirty (recalculo com debounce) em vez de apagar chaves quentes.
+    """
+
     def __init__(self):
-        self._data: dict[str, tuple[float, object]] = {}
-        self._lock = threading.Lock()
+        self._local = _LocalTier(settings.CACHE_L1_MAX_ENTRIES, settings.CACHE_L1_MAX_BYTES)
+        self._instance_id = uuid.uuid4().hex
         self._redis_client = None
+        self._subscriber: threading.Thread | None = None
+        self._sweeper: threading.Thread | None = None
+        self._sweeper_stop = threading.Event()
+        self._namespace_versions: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._key_locks: dict[str, list] = {}
+        self._serializer = CacheSerializer(
+            codec=settings.CACHE_CODEC,
+            compression=settings.CACHE_COMPRESSION,
+            compression_threshold=settings.CACHE_COMPRESSION_THRESHOLD_BYTES,
+        )
         if settings.REDIS_URL and redis is not None:
             try:
                 self._redis_client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=False)
                 self._redis_client.ping()
             except Exception:
                 self._redis_client = None
+        if self._redis_client is not None:
+            self._start_invalidation_listener()
 
     def get(self, key: str):
-        if self._redis_client is not None:
-            raw = self._redis_client.get(key)
-            if raw is None:
-                return None
-            try:
-                return json.loads(raw.decode("utf-8"))
-            except Exception:
-                self._redis_client.delete(key)
-                return None
+        return _unwrap(self._get_raw(key))
 
-        with self._lock:
-            entry = self._data.get(key)
-            if not entry:
-                return None
-            expires_at, value = entry
-            if expires_at < time.time():
-                self._data.pop(key, None)
-                return None
+    def _get_raw(self, key: str):
+        value = self._local.get(key)
+        if value is not None:
+            CACHE_REQUESTS.labels("l1", "hit").inc()
             return value
+        CACHE_REQUESTS.labels("l1", "miss").inc()
+
+        if self._redis_client is None:
+            return None
+
+        raw = self._redis_client.get(key)
+        if raw is None:
+            CACHE_REQUESTS.labels("l2", "miss").inc()
+            return None
+        try:
+            value = self._serializer.loads(raw)
+        except Exception:
+            self._redis_client.delete(key)
+            CACHE_REQUESTS.labels("l2", "miss").inc()
+            return None
+        CACHE_REQUESTS.labels("l2", "hit").inc()
+        self._local.set(key, value, settings.CACHE_L1_TTL_SECONDS, encoded=raw)
+        return value
 
     def set(self, key: str, value, ttl_seconds: int = 60):
         if self._redis_client is not None:
-            self._redis_client.setex(key, ttl_seconds, json.dumps(value))
+            payload = self._serializer.dumps(value)
+            self._redis_client.setex(key, ttl_seconds, payload)
+            self._local.set(key, value, min(ttl_seconds, settings.CACHE_L1_TTL_SECONDS), encoded=payload)
+            self._publish_invalidation("key", key)
             return
 
+        self._local.set(key, value, ttl_seconds)
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], object],
+        ttl_seconds: int = 60,
+        stale_seconds: int = 0,
+        beta: float = 1.0,
+    ):
+        envelope = self._get_envelope(key)
+        if envelope is not None:
+            if not self._should_refresh(envelope, beta):
+                CACHE_COMPUTE.labels("fresh").inc()
+                return envelope["value"]
+            # Vencido (ou sorteado para renovar cedo): um unico chamador recalcula, os demais
+            # seguem com o valor atual sem esperar.
+            with self._single_flight(key, wait=False) as owner:
+                if owner:
+                    return self._compute_and_store(key, compute, ttl_seconds, stale_seconds)
+            CACHE_COMPUTE.labels("stale").inc()
+            return envelope["value"]
+
+        with self._single_flight(key, wait=True):
+            # Quem esperou o lock normalmente encontra o valor gravado pelo dono.
+            envelope = self._get_envelope(key)
+            if envelope is not None and envelope["soft_expires_at"] > time.time():
+                CACHE_COMPUTE.labels("coalesced").inc()
+                return envelope["value"]
+            return self._compute_and_store(key, compute, ttl_seconds, stale_seconds)
+
+    def mark_dirty(self, key: str, refresh_within: float, stale_seconds: int = 0) -> bool:
+        """Antecipa o vencimento leve da chave para no maximo refresh_within segundos.
+
+        Debounce de recalculo: varias escritas dentro da janela gravam uma unica vez
+        e geram um unico recalculo (feito pelo get_or_compute seguinte, servindo o
+        valor atual enquanto isso). Retorna False se ja havia recalculo agendado.
+        """
+        deadline = time.time() + refresh_within
+        ttl_seconds = int(math.ceil(refresh_within)) + max(0, stale_seconds)
+        if self._redis_client is not None:
+            return self._mark_dirty_remote(key, deadline, ttl_seconds)
+
+        envelope = self._get_envelope(key)
+        if envelope is None or envelope["soft_expires_at"] <= deadline:
+            return False
+        # Uma gravacao concorrente troca o objeto da entrada: replace falha e o valor novo fica.
+        return self._local.replace(key, envelope, {**envelope, "soft_expires_at": deadline}, ttl_seconds)
+
+    def _mark_dirty_remote(self, key: str, deadline: float, ttl_seconds: int) -> bool:
+        # WATCH/MULTI: se outro worker regravar a chave entre a leitura e a escrita, o EXEC
+        # falha e o envelope mais novo nao e sobrescrito pelo antigo.
+        try:
+            with self._redis_client.pipeline() as pipe:
+                pipe.watch(key)
+                raw = pipe.get(key)
+                envelope = self._serializer.loads(raw) if raw is not None else None
+                if not (isinstance(envelope, dict) and envelope.get(_ENVELOPE_MARKER)):
+                    return False
+                if envelope["soft_expires_at"] <= deadline:
+                    return False
+                pipe.multi()
+                pipe.setex(key, ttl_seconds, self._serializer.dumps({**envelope, "soft_expires_at": deadline}))
+                pipe.execute()
+        except redis.WatchError:
+            return False
+        # L1 descartado em vez de regravado: a proxima leitura busca no Redis o valor vigente.
+        self._local.delete(key)
+        self._publish_invalidation("key", key)
+        return True
+
+    def _get_envelope(self, key: str) -> dict | None:
+        raw = self._get_raw(key)
+        if isinstance(raw, dict) and raw.get(_ENVELOPE_MARKER):
+            return raw
+        return None
+
+    @staticmethod
+    def _should_refresh(envelope: dict, beta: float) -> bool:
+        # XFetch: now - delta * beta * ln(rand) >= expiry. Quanto mais caro o calculo (delta),
+        # mais cedo a renovacao pode ser sorteada.
+        delta = float(envelope.get("delta") or 0.0)
+        jitter = -delta * beta * math.log(max(random.random(), 1e-12))
+        return time.time() + jitter >= envelope["soft_expires_at"]
+
+    def _compute_and_store(self, key: str, compute: Callable[[], object], ttl_seconds: int, stale_seconds: int):
+        started = time.perf_counter()
+        value = compute()
+        delta = time.perf_counter() - started
+        envelope = {
+            _ENVELOPE_MARKER: 1,
+            "value": value,
+            "soft_expires_at": time.time() + ttl_seconds,
+            "delta": delta,
+        }
+        self.set(key, envelope, ttl_seconds=ttl_seconds + max(0, stale_seconds))
+        CACHE_COMPUTE.labels("computed").inc()
+        return value
+
+    @contextmanager
+    def _single_flight(self, key: str, wait: bool):
+        timeout = settings.CACHE_LOCK_TIMEOUT_SECONDS
         with self._lock:
-            self._data[key] = (time.time() + ttl_seconds, value)
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        local_lock = entry[0]
+        local_owner = local_lock.acquire(timeout=timeout) if wait else local_lock.acquire(blocking=False)
+        token = None
+        try:
+            if local_owner and self._redis_client is not None:
+                token = self._acquire_redis_lock(key, wait, timeout)
+            yield local_owner and (self._redis_client is None or token is not None)
+        finally:
+            if token is not None:
+                self._release_redis_lock(key, token)
+            if local_owner:
+                local_lock.release()
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    self._key_locks.pop(key, None)
+
+    def _acquire_redis_lock(self, key: str, wait: bool, timeout: float) -> str | None:
+        token = uuid.uuid4().hex
+        lock_key = f"lock:{key}"
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if self._redis_client.set(lock_key, token, nx=True, px=int(timeout * 1000)):
+                    return token
+            except Exception:
+                return None
+            if not wait or time.monotonic() >= deadline:
+                return None
+            time.sleep(0.05)
+            # Outro worker ja gravou o valor: nao precisa do lock para ler.
+            if self._get_envelope(key) is not None:
+                return None
+
+    def _release_redis_lock(self, key: str, token: str) -> None:
+        try:
+            self._redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, f"lock:{key}", token)
+        except Exception:
+            logger.warning("cache.lock.release.failed", extra={"key": key})
 
     def invalidate(self, key: str):
+        self._local.delete(key)
         if self._redis_client is not None:
             self._redis_client.delete(key)
-            return
-
-        with self._lock:
-            self._data.pop(key, None)
+            self._publish_invalidation("key", key)
 
     def invalidate_prefix(self, prefix: str):
+        # SCAN incremental + UNLINK (liberacao em background): nunca bloqueia o Redis como KEYS.
+        self._local.delete_prefix(prefix)
         if self._redis_client is not None:
-            keys = self._redis_client.keys(f"{prefix}*")
-            if keys:
-                self._redis_client.delete(*keys)
+            batch: list = []
+            for key in self._redis_client.scan_iter(match=f"{prefix}*", count=settings.CACHE_SCAN_BATCH_SIZE):
+                batch.append(key)
+                if len(batch) >= settings.CACHE_SCAN_BATCH_SIZE:
+                    self._redis_client.unlink(*batch)
+                    batch = []
+            if batch:
+                self._redis_client.unlink(*batch)
+            self._publish_invalidation("prefix", prefix)
+
+    def namespace_key(self, namespace: str, key) -> str:
+        return f"{namespace}:v{self._namespace_version(namespace)}:{key}"
+
+    def invalidate_namespace(self, namespace: str) -> None:
+        # O(1): troca a versao do namespace; leituras seguintes caem em chaves novas.
+        version_key = f"cache:ns:{namespace}"
+        if self._redis_client is not None:
+            version = int(self._redis_client.incr(version_key))
+            self._local.set(version_key, version, settings.CACHE_L1_TTL_SECONDS)
+            self._local.delete_prefix(f"{namespace}:")
+            self._publish_invalidation("namespace", namespace)
             return
 
         with self._lock:
-            keys = [k for k in self._data if k.startswith(prefix)]
-            for key in keys:
-                self._data.pop(key, None)
+            self._namespace_versions[namespace] = self._namespace_versions.get(namespace, 0) + 1
+        self._local.delete_prefix(f"{namespace}:")
+
+    def _namespace_version(self, namespace: str) -> int:
+        if self._redis_client is None:
+            return self._namespace_versions.get(namespace, 0)
+
+        version_key = f"cache:ns:{namespace}"
+        version = self._local.get(version_key)
+        if version is None:
+            raw = self._redis_client.get(version_key)
+            version = int(raw) if raw is not None else 0
+            self._local.set(version_key, version, settings.CACHE_L1_TTL_SECONDS)
+        return version
+
+    def stats(self) -> dict:
+        return {"entries": len(self._local), "bytes": self._local.size_bytes}
+
+    def sweep_expired(self) -> int:
+        return self._local.sweep()
+
+    def start_sweeper(self, interval_seconds: float | None = None) -> None:
+        # Expiracao ativa: chaves por usuario que nunca mais sao lidas tambem saem da memoria.
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        interval = interval_seconds or settings.CACHE_SWEEP_INTERVAL_SECONDS
+        self._sweeper_stop.clear()
+
+        def sweep_loop() -> None:
+            while not self._sweeper_stop.wait(interval):
+                try:
+                    self._local.sweep()
+                except Exception:
+                    logger.exception("cache.sweeper.failed")
+
+        self._sweeper = threading.Thread(target=sweep_loop, name="cache-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        self._sweeper_stop.set()
+        if self._sweeper is not None:
+            self._sweeper.join(timeout=5)
+            self._sweeper = None
+
+    def _publish_invalidation(self, kind: str, target: str) -> None:
+        message = json.dumps({"origin": self._instance_id, "kind": kind, "target": target})
+        try:
+            self._redis_client.publish(settings.CACHE_INVALIDATION_CHANNEL, message)
+        except Exception:
+            logger.warning("cache.invalidation.publish.failed", extra={"kind": kind, "target": target})
+
+    def _handle_invalidation(self, raw) -> None:
+        try:
+            message = json.loads(raw.decode("utf-8") if isinstance(raw, bytes) else raw)
+        except Exception:
+            return
+        if message.get("origin") == self._instance_id:
+            return
+        if message.get("kind") == "prefix":
+            self._local.delete_prefix(message.get("target", ""))
+        elif message.get("kind") == "namespace":
+            namespace = message.get("target", "")
+            self._local.delete(f"cache:ns:{namespace}")
+            self._local.delete_prefix(f"{namespace}:")
+        else:
+            self._local.delete(message.get("target", ""))
+
+    def _start_invalidation_listener(self) -> None:
+        def listen() -> None:
+            while True:
+                try:
+                    pubsub = self._redis_client.pubsub(ignore_subscribe_messages=True)
+                    pubsub.subscribe(settings.CACHE_INVALIDATION_CHANNEL)
+                    for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            self._handle_invalidation(message.get("data"))
+                except Exception:
+                    # Mensagens podem ter sido perdidas durante a queda: descarta o L1 inteiro.
+                    logger.warning("cache.invalidation.listener.reconnecting")
+                    self._local.clear()
+                    time.sleep(1)
+
+        self._subscriber = threading.Thread(target=listen, name="cache-invalidation", daemon=True)
+        self._subscriber.start()
 
 
 cache_store = CacheStore()
+CACHE_ENTRIES.set_function(lambda: cache_store.stats()["entries"])
+CACHE_BYTES.set_function(lambda: cache_store.stats()["bytes"])
 
 
 
@@ -0,0 +1,213 @@
+﻿# Arquivo: backend/backend\app\core\cache_codecs.py
+# Camada: Module
+# Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
+# Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
+
+"""Serializacao dos valores do cache (L2/Redis).
+
+Cada valor gravado leva um cabecalho de 2 bytes: id do codec e id da
+compressao. A leitura usa o cabecalho, nao a configuracao atual, entao trocar
+CACHE_CODEC/CACHE_COMPRESSION entre deploys nao invalida o que ja esta no Redis.
+datetime/date viajam marcados e voltam como datetime/date (o json puro nem
+conseguia gravar o aired_from da Jikan).
+"""
+
+import json
+import zlib
+from datetime import date, datetime
+
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except Exception:  # pragma: no cover
+    msgpack = None
+
+try:
+    import zstandard
+except Exception:  # pragma: no cover
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except Exception:  # pragma: no cover
+    lz4_frame = None
+
+_DATETIME_TAG = "__dt__"
+_DATE_TAG = "__d__"
+_MSGPACK_DATETIME_EXT = 1
+_MSGPACK_DATE_EXT = 2
+
+
+def _tag_temporal(value):
+    if isinstance(value, datetime):
+        return {_DATETIME_TAG: value.isoformat()}
+    if isinstance(value, date):
+        return {_DATE_TAG: value.isoformat()}
+    raise TypeError(f"Object of type {type(value).__name__} is not cache serializable")
+
+
+def _untag_object(obj: dict):
+    if len(obj) == 1:
+        if _DATETIME_TAG in obj:
+            return datetime.fromisoformat(obj[_DATETIME_TAG])
+        if _DATE_TAG in obj:
+            return date.fromisoformat(obj[_DATE_TAG])
+    return obj
+
+
+def _untag_tree(value):
+    # orjson nao tem object_hook: a restauracao dos datetimes percorre a estrutura
+    # (in-place, descendo so em containers, para nao pagar uma chamada por escalar).
+    if isinstance(value, dict):
+        restored = _untag_object(value)
+        if restored is not value:
+            return restored
+        for key, item in value.items():
+            if isinstance(item, (dict, list)):
+                value[key] = _untag_tree(item)
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            if isinstance(item, (dict, list)):
+                value[index] = _untag_tree(item)
+    return value
+
+
+class JsonCodec:
+    codec_id = 1
+    name = "json"
+
+    def dumps(self, value) -> bytes:
+        return json.dumps(value, default=_tag_temporal, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, payload: bytes):
+        return json.loads(payload.decode("utf-8"), object_hook=_untag_object)
+
+
+class OrjsonCodec:
+    codec_id = 2
+    name = "orjson"
+
+    def dumps(self, value) -> bytes:
+        # Chaves int (ex.: contagem por nota) viram str, como no json da stdlib.
+        return orjson.dumps(
+            value,
+            default=_tag_temporal,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
+
+    def loads(self, payload: bytes):
+        value = orjson.loads(payload)
+        # So percorre a estrutura quando ha datetime marcado (stats, por exemplo, nunca tem).
+        if _DATETIME_TAG.encode("ascii") in payload or _DATE_TAG.encode("ascii") in payload:
+            return _untag_tree(value)
+        return value
+
+
+class MsgpackCodec:
+    codec_id = 3
+    name = "msgpack"
+
+    @staticmethod
+    def _default(value):
+        if isinstance(value, datetime):
+            return msgpack.ExtType(_MSGPACK_DATETIME_EXT, value.isoformat().encode("ascii"))
+        if isinstance(value, date):
+            return msgpack.ExtType(_MSGPACK_DATE_EXT, value.isoformat().encode("ascii"))
+        raise TypeError(f"Object of type {type(value).__name__} is not cache serializable")
+
+    @staticmethod
+    def _ext_hook(code: int, data: bytes):
+        if code == _MSGPACK_DATETIME_EXT:
+            return datetime.fromisoformat(data.decode("ascii"))
+        if code == _MSGPACK_DATE_EXT:
+            return date.fromisoformat(data.decode("ascii"))
+        return msgpack.ExtType(code, data)
+
+    def dumps(self, value) -> bytes:
+        return msgpack.packb(value, default=self._default, use_bin_type=True)
+
+    def loads(self, payload: bytes):
+        return msgpack.unpackb(payload, ext_hook=self._ext_hook, raw=False, strict_map_key=False)
+
+
+_NO_COMPRESSION = 0
+_ZLIB = 1
+_ZSTD = 2
+_LZ4 = 3
+
+
+def _compress(algorithm: int, payload: bytes) -> bytes:
+    if algorithm == _ZSTD:
+        return zstandard.ZstdCompressor(level=3).compress(payload)
+    if algorithm == _LZ4:
+        return lz4_frame.compress(payload)
+    return zlib.compress(payload, 6)
+
+
+def _decompress(algorithm: int, payload: bytes) -> bytes:
+    if algorithm == _NO_COMPRESSION:
+        return payload
+    if algorithm == _ZLIB:
+        return zlib.decompress(payload)
+    if algorithm == _ZSTD:
+        if zstandard is None:
+            raise ValueError("zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    if algorithm == _LZ4:
+        if lz4_frame is None:
+            raise ValueError("lz4 is not installed")
+        return lz4_frame.decompress(payload)
+    raise ValueError(f"Unknown compression id: {algorithm}")
+
+
+def available_codecs() -> dict:
+    codecs = {"json": JsonCodec()}
+    if orjson is not None:
+        codecs["orjson"] = OrjsonCodec()
+    if msgpack is not None:
+        codecs["msgpack"] = MsgpackCodec()
+    return codecs
+
+
+def _resolve_compression(name: str) -> int:
+    # Biblioteca ausente cai para zlib (stdlib) em vez de desligar a compressao.
+    name = (name or "none").lower()
+    if name == "none":
+        return _NO_COMPRESSION
+    if name == "zstd" and zstandard is not None:
+        return _ZSTD
+    if name == "lz4" and lz4_frame is not None:
+        return _LZ4
+    return _ZLIB
+
+
+class CacheSerializer:
+    def __init__(self, codec: str = "orjson", compression: str = "zstd", compression_threshold: int = 1024):
+        codecs = available_codecs()
+        self.codec = codecs.get(codec) or codecs.get("orjson") or codecs["json"]
+        self.compression = _resolve_compression(compression)
+        self.compression_threshold = max(0, compression_threshold)
+        self._decoders = {instance.codec_id: instance for instance in codecs.values()}
+
+    def dumps(self, value) -> bytes:
+        payload = self.codec.dumps(value)
+        algorithm = _NO_COMPRESSION
+        if self.compression != _NO_COMPRESSION and len(payload) >= self.compression_threshold:
+            compressed = _compress(self.compression, payload)
+            if len(compressed) < len(payload):
+                payload, algorithm = compressed, self.compression
+        return bytes((self.codec.codec_id, algorithm)) + payload
+
+    def loads(self, raw: bytes):
+        if len(raw) < 2 or raw[0] not in self._decoders:
+            # Valor legado (json puro, sem cabecalho) gravado antes dos codecs.
+            return json.loads(raw.decode("utf-8"))
+        return self._decoders[raw[0]].loads(_decompress(raw[1], raw[2:]))
+
+
+
+
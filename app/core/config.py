@@ -12,6 +12,11 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "change-me-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PASSWORD_PBKDF2_ROUNDS: int = 29000
+    PASSWORD_HASH_WORKERS: int = 0
+    PASSWORD_HASH_USE_PROCESSES: bool = False
+    PASSWORD_HASH_MAX_PENDING: int = 64
     AUTO_CREATE_TABLES: bool = True
     ENVIRONMENT: str = "development"
     LOG_LEVEL: str = "INFO"
@@ -23,12 +28,41 @@ class Settings(BaseSettings):
     JIKAN_BASE_URL: str = "https://api.jikan.moe/v4"
     EXTERNAL_API_TIMEOUT_SECONDS: int = 20
     EXTERNAL_CACHE_TTL_SECONDS: int = 3600
+    EXTERNAL_CACHE_STALE_SECONDS: int = 600
     ENABLE_ANIME_SYNC_JOB: bool = False
     ANIME_SYNC_INTERVAL_MINUTES: int = 60
     EXTERNAL_API_MAX_RETRIES: int = 3
     EXTERNAL_API_BACKOFF_SECONDS: float = 0.5
+    EXTERNAL_API_HTTP2: bool = True
+    EXTERNAL_API_MAX_CONNECTIONS: int = 10
+    EXTERNAL_API_MAX_KEEPALIVE_CONNECTIONS: int = 5
+    EXTERNAL_API_KEEPALIVE_SECONDS: float = 30.0
+    JIKAN_RATE_LIMIT_ENABLED: bool = True
+    JIKAN_RATE_LIMIT_PER_SECOND: int = 3
+    JIKAN_RATE_LIMIT_PER_MINUTE: int = 60
+    JIKAN_RATE_LIMIT_BURST: int = 1
+    CATALOG_IMPORT_JOB_STALE_SECONDS: int = 300
+    CACHE_L1_MAX_ENTRIES: int = 2048
+    CACHE_L1_TTL_SECONDS: int = 5
+    CACHE_L1_MAX_BYTES: int = 64 * 1024 * 1024
+    CACHE_SWEEP_INTERVAL_SECONDS: int = 30
+    CACHE_SCAN_BATCH_SIZE: int = 500
+    CACHE_LOCK_TIMEOUT_SECONDS: float = 10.0
+    CACHE_CODEC: str = "orjson"
+    CACHE_COMPRESSION: str = "zstd"
+    CACHE_COMPRESSION_THRESHOLD_BYTES: int = 1024
+    CACHE_INVALIDATION_CHANNEL: str = "cache:invalidate"
     ENABLE_RUNTIME_MIGRATIONS: bool = False
     REQUIRE_ALEMBIC_IN_PRODUCTION: bool = True
+    RECOMMENDATION_MATRIX_TTL_SECONDS: int = 300
+    TIMELINE_FANOUT_MAX_FOLLOWERS: int = 1000
+    TIMELINE_FOLLOW_BACKFILL_LIMIT: int = 50
+    OUTBOX_RELAY_ENABLED: bool = True
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_MAX_ATTEMPTS: int = 10
+    OUTBOX_CLAIM_TIMEOUT_SECONDS: int = 300
+    OUTBOX_RETENTION_SECONDS: int = 86400
 
     model_config = ConfigDict(env_file=".env", extra="ignore")
 
@@ -8,6 +8,18 @@ from logging import Logger
 from sqlalchemy import inspect, text
 from sqlalchemy.engine import Engine
 
+ANIME_STATS_BACKFILL_SQL = """
+INSERT INTO anime_stats (anime_id, watcher_count, score_sum, score_count, average_score, updated_at)
+SELECT anime_id,
+       COUNT(id),
+       COALESCE(SUM(score), 0),
+       COUNT(score),
+       CASE WHEN COUNT(score) > 0 THEN CAST(SUM(score) AS FLOAT) / COUNT(score) END,
+       CURRENT_TIMESTAMP
+FROM user_animes
+GROUP BY anime_id
+"""
+
 
 def apply_runtime_migrations(engine: Engine, logger: Logger) -> None:
     inspector = inspect(engine)
@@ -63,6 +75,49 @@ def apply_runtime_migrations(engine: Engine, logger: Logger) -> None:
             if "ix_animes_last_synced_at" not in anime_indexes:
                 connection.execute(text("CREATE INDEX IF NOT EXISTS ix_animes_last_synced_at ON animes (last_synced_at)"))
                 logger.info("migration.applied", extra={"migration": "animes.ix_last_synced_at.added"})
+            if "ix_animes_title_keyset" not in anime_indexes:
+                connection.execute(
+                    text("CREATE INDEX IF NOT EXISTS ix_animes_title_keyset ON animes (coalesce(title, ''), id)")
+                )
+                logger.info("migration.applied", extra={"migration": "animes.ix_title_keyset.added"})
+            if "ix_animes_members_keyset" not in anime_indexes:
+                connection.execute(
+                    text("CREATE INDEX IF NOT EXISTS ix_animes_members_keyset ON animes (coalesce(members, -1), id)")
+                )
+                logger.info("migration.applied", extra={"migration": "animes.ix_members_keyset.added"})
+
+    if inspector.has_table("anime_stats") and inspector.has_table("user_animes"):
+        with engine.begin() as connection:
+            stats_empty = connection.execute(text("SELECT 1 FROM anime_stats LIMIT 1")).first() is None
+            entries_exist = connection.execute(text("SELECT 1 FROM user_animes LIMIT 1")).first() is not None
+            if stats_empty and entries_exist:
+                connection.execute(text(ANIME_STATS_BACKFILL_SQL))
+                logger.info("migration.applied", extra={"migration": "anime_stats.backfilled"})
+
+    if inspector.has_table("activities"):
+        activity_columns = {column["name"] for column in inspector.get_columns("activities")}
+        with engine.begin() as connection:
+            if "fanned_out" not in activity_columns:
+                # Atividades antigas ficam fora do fan-out e continuam aparecendo pelo pull.
+                connection.execute(text("ALTER TABLE activities ADD COLUMN fanned_out BOOLEAN NOT NULL DEFAULT FALSE"))
+                logger.info("migration.applied", extra={"migration": "activities.fanned_out.added"})
+            connection.execute(
+                text("CREATE INDEX IF NOT EXISTS ix_activities_pull ON activities (fanned_out, user_id, created_at)")
+            )
+            connection.execute(
+                text("CREATE INDEX IF NOT EXISTS ix_activities_user_keyset ON activities (user_id, created_at, id)")
+            )
+            connection.execute(text("DROP INDEX IF EXISTS ix_activities_user_created"))
+
+    if inspector.has_table("outbox_events"):
+        outbox_columns = {column["name"] for column in inspector.get_columns("outbox_events")}
+        with engine.begin() as connection:
+            if "claimed_by" not in outbox_columns:
+                connection.execute(text("ALTER TABLE outbox_events ADD COLUMN claimed_by VARCHAR(32)"))
+                logger.info("migration.applied", extra={"migration": "outbox_events.claimed_by.added"})
+            if "claimed_until" not in outbox_columns:
+                connection.execute(text("ALTER TABLE outbox_events ADD COLUMN claimed_until TIMESTAMP"))
+                logger.info("migration.applied", extra={"migration": "outbox_events.claimed_until.added"})
 
 
 
@@ -0,0 +1,111 @@
+﻿# Arquivo: backend/backend\app\core\password_hashing.py
+# Camada: Module
+# Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
+# Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
+
+"""Hash/verificacao de senha num pool dedicado e limitado.
+
+pbkdf2/bcrypt sao CPU puro: rodando no threadpool das rotas, um pico de logins
+ocupa as threads que atenderiam o resto da API. Aqui o trabalho vai para um
+executor proprio (threads por padrao, porque o hashlib/bcrypt soltam o GIL;
+processos com PASSWORD_HASH_USE_PROCESSES) e a fila tem teto: acima de
+PASSWORD_HASH_MAX_PENDING a requisicao falha rapido com 503 + Retry-After em
+vez de acumular latencia.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from fastapi import HTTPException
+from prometheus_client import Counter, Gauge
+
+from app.core.config import settings
+from app.core.security import pwd_context
+
+logger = logging.getLogger(__name__)
+
+PASSWORD_HASH_PENDING = Gauge("anime_manager_password_hash_pending", "Password hash jobs queued or running")
+PASSWORD_HASH_REJECTED = Counter(
+    "anime_manager_password_hash_rejected_total",
+    "Password hash jobs rejected because the pool was saturated",
+)
+
+
+# Funcoes de modulo (e nao metodos) para serem serializaveis no ProcessPoolExecutor.
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+class PasswordHasher:
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        use_processes: bool | None = None,
+        max_pending: int | None = None,
+    ):
+        self.max_workers = max_workers or settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+        self.use_processes = settings.PASSWORD_HASH_USE_PROCESSES if use_processes is None else use_processes
+        self.max_pending = settings.PASSWORD_HASH_MAX_PENDING if max_pending is None else max_pending
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.use_processes:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="password-hash")
+            return self._executor
+
+    async def _run(self, func, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                PASSWORD_HASH_REJECTED.inc()
+                logger.warning("password_hash.pool.saturated", extra={"pending": self._pending})
+                raise HTTPException(
+                    status_code=503,
+                    detail="Authentication is busy, try again shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+            PASSWORD_HASH_PENDING.inc()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                PASSWORD_HASH_PENDING.dec()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> tuple[bool, str | None]:
+        """(valido, novo_hash): novo_hash vem quando o hash salvo usa parametros antigos."""
+        return await self._run(_verify_and_update, password, hashed_password)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+password_hasher = PasswordHasher()
+
+
+
+
@@ -3,11 +3,24 @@
 # Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
 # Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
 
+"""Rate limit por janela deslizante (log de requisicoes).
+
+Redis e memoria aplicam a mesma regra: uma requisicao passa se ha menos de
+`limit` aceitas nos ultimos `window_seconds`; recusadas nao entram no log.
+No Redis o log e um ZSET e a checagem inteira (limpa, conta, grava, expira)
+e um unico script Lua via EVALSHA: um round trip, atomico, e a chave sempre
+sai com PEXPIRE. Sem janelas fixas, nao ha rajada de 2x na virada do minuto.
+"""
+
+import logging
+import math
 import threading
 import time
+import uuid
 from collections import defaultdict, deque
+from dataclasses import dataclass
 
-from fastapi import HTTPException, Request, status
+from fastapi import HTTPException, Request, Response, status
 
 from app.core.config import settings
 
@@ -16,13 +29,62 @@ try:
 except Exception:  # pragma: no cover
     redis = None
 
+logger = logging.getLogger(__name__)
+
+# KEYS[1]: chave do cliente; ARGV: limite, janela (ms), membro unico.
+# Usa o relogio do Redis para todos os workers medirem a mesma janela.
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+local allowed = 0
+if count < limit then
+    redis.call('ZADD', key, now, ARGV[3])
+    redis.call('PEXPIRE', key, window)
+    count = count + 1
+    allowed = 1
+end
+
+local reset_ms = 0
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+if oldest[2] then
+    reset_ms = tonumber(oldest[2]) + window - now
+end
+return {allowed, count, reset_ms}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_seconds: float
+
+    def headers(self) -> dict[str, str]:
+        # Reset em segundos ate liberar a proxima vaga (delta, como no draft RateLimit).
+        reset = str(max(0, math.ceil(self.reset_seconds)))
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": reset,
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.reset_seconds)))
+        return headers
+
 
 class InMemoryRateLimiter:
     def __init__(self):
         self._hits: dict[str, deque[float]] = defaultdict(deque)
         self._lock = threading.Lock()
 
-    def check(self, key: str, limit: int, window_seconds: int) -> None:
+    def hit(self, key: str, limit: int, window_seconds: int) -> RateLimitResult:
         now = time.time()
         cutoff = now - window_seconds
         with self._lock:
@@ -30,14 +92,26 @@ class InMemoryRateLimiter:
             while queue and queue[0] <= cutoff:
                 queue.popleft()
 
-            if len(queue) >= limit:
-                retry_after = int(max(1, window_seconds - (now - queue[0])))
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail="Rate limit exceeded",
-                    headers={"Retry-After": str(retry_after)},
-                )
-            queue.append(now)
+            allowed = len(queue) < limit
+            if allowed:
+                queue.append(now)
+            reset_seconds = (queue[0] + window_seconds - now) if queue else 0.0
+            return RateLimitResult(allowed, limit, max(0, limit - len(queue)), reset_seconds)
+
+    def check(self, key: str, limit: int, window_seconds: int) -> None:
+        result = self.hit(key, limit, window_seconds)
+        if not result.allowed:
+            raise _rate_limit_exceeded(result)
+
+
+class RedisRateLimiter:
+    def __init__(self, client):
+        self._script = client.register_script(SLIDING_WINDOW_SCRIPT)
+
+    def hit(self, key: str, limit: int, window_seconds: int) -> RateLimitResult:
+        # Script.__call__ usa EVALSHA e so reenvia o corpo (EVAL) se o Redis responder NOSCRIPT.
+        allowed, count, reset_ms = self._script(keys=[key], args=[limit, window_seconds * 1000, uuid.uuid4().hex])
+        return RateLimitResult(bool(allowed), limit, max(0, limit - int(count)), int(reset_ms) / 1000)
 
 
 rate_limiter = InMemoryRateLimiter()
@@ -48,6 +122,15 @@ if settings.REDIS_URL and redis is not None:
         redis_client.ping()
     except Exception:
         redis_client = None
+redis_rate_limiter = RedisRateLimiter(redis_client) if redis_client is not None else None
+
+
+def _rate_limit_exceeded(result: RateLimitResult) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Rate limit exceeded",
+        headers=result.headers(),
+    )
 
 
 def _client_ip(request: Request) -> str:
@@ -57,26 +140,23 @@ def _client_ip(request: Request) -> str:
     return request.client.host if request.client else "unknown"
 
 
-def limit_requests(scope: str, limit_per_minute: int):
-    def dependency(request: Request):
-        ip = _client_ip(request)
-        current_minute = int(time.time() // 60)
-        key = f"{scope}:{ip}:{current_minute}"
-
-        if redis_client is not None:
-            count = redis_client.incr(key)
-            if count == 1:
-                redis_client.expire(key, 60)
-            if count > limit_per_minute:
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail="Rate limit exceeded",
-                    headers={"Retry-After": "60"},
-                )
-            return
-
-        local_key = f"{scope}:{ip}"
-        rate_limiter.check(local_key, limit_per_minute, 60)
+def limit_requests(scope: str, limit_per_minute: int, window_seconds: int = 60):
+    def dependency(request: Request, response: Response):
+        key = f"{scope}:{_client_ip(request)}"
+
+        result = None
+        if redis_rate_limiter is not None:
+            try:
+                result = redis_rate_limiter.hit(key, limit_per_minute, window_seconds)
+            except Exception:
+                # Redis fora do ar: mesma regra, aplicada por worker.
+                logger.warning("rate_limit.redis.unavailable", extra={"scope": scope})
+        if result is None:
+            result = rate_limiter.hit(key, limit_per_minute, window_seconds)
+
+        if not result.allowed:
+            raise _rate_limit_exceeded(result)
+        response.headers.update(result.headers())
 
     return dependency
 
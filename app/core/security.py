@@ -3,6 +3,7 @@
 # Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
 # Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
 
+import uuid
 from datetime import datetime, timedelta
 
 import jwt
@@ -12,7 +13,13 @@ from .config import settings
 
 # New hashes use pbkdf2_sha256 (no 72-byte bcrypt ceiling).
 # Keep bcrypt for verifying existing users created before migration.
-pwd_context = CryptContext(schemes=["pbkdf2_sha256", "bcrypt"], deprecated="auto")
+# Hashes below PASSWORD_PBKDF2_ROUNDS (or still bcrypt) are flagged for rehash on login.
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256", "bcrypt"],
+    deprecated="auto",
+    pbkdf2_sha256__default_rounds=settings.PASSWORD_PBKDF2_ROUNDS,
+    pbkdf2_sha256__min_rounds=settings.PASSWORD_PBKDF2_ROUNDS,
+)
 
 
 def hash_password(password: str):
@@ -25,10 +32,13 @@ def verify_password(plain_password, hashed_password):
 
 def create_access_token(data: dict):
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    issued_at = datetime.utcnow()
+    expire = issued_at + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update(
         {
             "exp": expire,
+            "iat": issued_at,
+            "jti": uuid.uuid4().hex,
             "iss": settings.JWT_ISSUER,
             "aud": settings.JWT_AUDIENCE,
         }
@@ -7,29 +7,35 @@ from sqlalchemy.orm import Session
 
 from app import models
 from app.events.bus import event_bus
+from app.services.timeline_service import TimelineService
 
 _registered = False
 
 
-def _persist_activity(payload: dict) -> None:
-    db: Session = payload["db"]
-    activity = models.Activity(
-        user_id=payload["user_id"],
-        activity_type=payload["activity_type"],
-        target_type=payload["target_type"],
-        target_id=payload["target_id"],
-        message=payload["message"],
-    )
-    db.add(activity)
-    db.commit()
-    db.refresh(activity)
+def _persist_activities(payloads: list[dict]) -> None:
+    # Roda na sessao de quem despacha (relay do outbox): so faz flush. Commit e rollback
+    # sao do dono da sessao, junto com a marca de publicado dos eventos.
+    db: Session = payloads[0]["db"]
+    timeline_service = TimelineService()
+    for payload in payloads:
+        activity = models.Activity(
+            user_id=payload["user_id"],
+            activity_type=payload["activity_type"],
+            target_type=payload["target_type"],
+            target_id=payload["target_id"],
+            message=payload["message"],
+        )
+        db.add(activity)
+        db.flush()
+        # Fan-out no mesmo commit: a atividade nunca existe sem as entradas de timeline.
+        timeline_service.fan_out(db, activity)
 
 
 def register_activity_handlers() -> None:
     global _registered
     if _registered:
         return
-    event_bus.subscribe("activity.created", _persist_activity)
+    event_bus.subscribe_batch("activity.created", _persist_activities)
     _registered = True
 
 
@@ -8,15 +8,33 @@ from typing import Callable
 
 
 class EventBus:
+    """Barramento de eventos em processo, sincrono.
+
+    O caminho assincrono dos eventos de dominio e o outbox (app.events.outbox):
+    o relay le os eventos commitados e chama dispatch com o lote de cada nome.
+    Handlers de lote (subscribe_batch) recebem todos os eventos do mesmo nome
+    de uma vez.
+    """
+
     def __init__(self):
         self._handlers: dict[str, list[Callable[[dict], None]]] = defaultdict(list)
+        self._batch_handlers: dict[str, list[Callable[[list[dict]], None]]] = defaultdict(list)
 
     def subscribe(self, event_name: str, handler: Callable[[dict], None]) -> None:
         self._handlers[event_name].append(handler)
 
+    def subscribe_batch(self, event_name: str, handler: Callable[[list[dict]], None]) -> None:
+        self._batch_handlers[event_name].append(handler)
+
     def publish(self, event_name: str, payload: dict) -> None:
+        self.dispatch(event_name, [payload])
+
+    def dispatch(self, event_name: str, payloads: list[dict]) -> None:
+        for batch_handler in self._batch_handlers.get(event_name, []):
+            batch_handler(payloads)
         for handler in self._handlers.get(event_name, []):
-            handler(payload)
+            for payload in payloads:
+                handler(payload)
 
 
 event_bus = EventBus()
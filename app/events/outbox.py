@@ -0,0 +1,222 @@
+﻿# Arquivo: backend/backend\app\events\outbox.py
+# Camada: Module
+# Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
+# Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
+
+"""Outbox transacional dos eventos de dominio.
+
+enqueue_event grava o evento na sessao do chamador, sem commit: ele entra no
+mesmo commit da review/comment/follow/user_anime, entao nao existe linha de
+dominio sem o seu evento. O OutboxRelay le os pendentes em lotes, entrega aos
+handlers do event_bus passando a propria sessao (efeitos no banco e a marca de
+publicado saem no mesmo commit) e tenta de novo o que falhar, ate
+OUTBOX_MAX_ATTEMPTS.
+
+Cada grupo e reivindicado com um UPDATE compare-and-set (lease em
+claimed_by/claimed_until) antes da entrega, entao varios relays, em qualquer
+dialeto, nunca entregam o mesmo evento ao mesmo tempo. Lease vencida (relay
+que morreu no meio) volta a ficar disponivel.
+"""
+
+import json
+import logging
+import threading
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.database import SessionLocal
+from app.events.bus import event_bus
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_event(db: Session, event_name: str, payload: dict) -> models.OutboxEvent:
+    event = models.OutboxEvent(event_name=event_name, payload=json.dumps(payload, default=str), attempts=0)
+    db.add(event)
+    return event
+
+
+class OutboxRelay:
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+        self._worker: threading.Thread | None = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    @property
+    def is_running(self) -> bool:
+        return self._worker is not None and self._worker.is_alive()
+
+    def notify(self, db: Session) -> None:
+        """Chamado apos o commit do dominio: acorda o worker ou, sem worker, drena ali mesmo."""
+        if self.is_running:
+            self._wake.set()
+            return
+        try:
+            self.drain(db)
+        except Exception:
+            db.rollback()
+            logger.exception("outbox.inline_drain.failed")
+
+    def drain(self, db: Session, batch_size: int | None = None) -> int:
+        candidates = (
+            self._claimable(db, datetime.utcnow())
+            .with_entities(models.OutboxEvent.id, models.OutboxEvent.event_name)
+            .order_by(models.OutboxEvent.id)
+            .limit(batch_size or settings.OUTBOX_BATCH_SIZE)
+            .all()
+        )
+        db.commit()
+        if not candidates:
+            return 0
+
+        grouped: dict[str, list[int]] = defaultdict(list)
+        for row_id, event_name in candidates:
+            grouped[event_name].append(row_id)
+
+        published = 0
+        for event_name, row_ids in grouped.items():
+            rows = self._claim(db, row_ids)
+            if not rows:
+                continue
+            if self._publish(db, event_name, rows, record_failure=len(rows) == 1):
+                published += len(rows)
+                continue
+            if len(rows) == 1:
+                continue
+            # Lote falhou: entrega um a um para um evento envenenado nao travar os outros.
+            # A tentativa conta aqui, uma por evento, e nao no lote.
+            for row_id in [row.id for row in rows]:
+                single = self._claim(db, [row_id])
+                if single and self._publish(db, event_name, single, record_failure=True):
+                    published += 1
+        return published
+
+    def _pending(self, db: Session):
+        return db.query(models.OutboxEvent).filter(
+            models.OutboxEvent.published_at.is_(None),
+            models.OutboxEvent.attempts < settings.OUTBOX_MAX_ATTEMPTS,
+        )
+
+    def _claimable(self, db: Session, now: datetime):
+        return self._pending(db).filter(
+            or_(models.OutboxEvent.claimed_until.is_(None), models.OutboxEvent.claimed_until < now)
+        )
+
+    def _claim(self, db: Session, row_ids: list[int]) -> list[models.OutboxEvent]:
+        # Compare-and-set: o UPDATE so pega linhas ainda pendentes e sem lease valida, entao
+        # dois relays disputando o mesmo grupo nunca ficam ambos com a mesma linha.
+        now = datetime.utcnow()
+        token = uuid.uuid4().hex
+        claimed = (
+            self._claimable(db, now)
+            .filter(models.OutboxEvent.id.in_(row_ids))
+            .update(
+                {
+                    models.OutboxEvent.claimed_by: token,
+                    models.OutboxEvent.claimed_until: now + timedelta(seconds=settings.OUTBOX_CLAIM_TIMEOUT_SECONDS),
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        if not claimed:
+            return []
+        return (
+            db.query(models.OutboxEvent)
+            .filter(models.OutboxEvent.claimed_by == token)
+            .order_by(models.OutboxEvent.id)
+            .all()
+        )
+
+    def _publish(self, db: Session, event_name: str, rows: list[models.OutboxEvent], record_failure: bool) -> bool:
+        # Uma entrega, uma tentativa: attempts sobe so no UPDATE final (sucesso ou falha).
+        row_ids = [row.id for row in rows]
+        payloads = [{**json.loads(row.payload), "db": db} for row in rows]
+        try:
+            event_bus.dispatch(event_name, payloads)
+            db.query(models.OutboxEvent).filter(models.OutboxEvent.id.in_(row_ids)).update(
+                {
+                    models.OutboxEvent.published_at: datetime.utcnow(),
+                    models.OutboxEvent.attempts: models.OutboxEvent.attempts + 1,
+                    models.OutboxEvent.claimed_by: None,
+                    models.OutboxEvent.claimed_until: None,
+                },
+                synchronize_session=False,
+            )
+            db.commit()
+            return True
+        except Exception as exc:
+            db.rollback()
+            logger.exception("outbox.publish.failed", extra={"event": event_name, "size": len(row_ids)})
+            # Solta a lease: o evento volta no retry individual ou no proximo drain.
+            released = {models.OutboxEvent.claimed_by: None, models.OutboxEvent.claimed_until: None}
+            if record_failure:
+                released[models.OutboxEvent.attempts] = models.OutboxEvent.attempts + 1
+                released[models.OutboxEvent.last_error] = str(exc)[:1000]
+            db.query(models.OutboxEvent).filter(models.OutboxEvent.id.in_(row_ids)).update(
+                released,
+                synchronize_session=False,
+            )
+            db.commit()
+            return False
+
+    def purge_published(self, db: Session) -> int:
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.OUTBOX_RETENTION_SECONDS)
+        deleted = (
+            db.query(models.OutboxEvent)
+            .filter(models.OutboxEvent.published_at.isnot(None), models.OutboxEvent.published_at < cutoff)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return deleted
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        self._stop.clear()
+
+        def relay_loop() -> None:
+            while not self._stop.is_set():
+                self._wake.wait(settings.OUTBOX_POLL_INTERVAL_SECONDS)
+                self._wake.clear()
+                self._drain_all()
+
+        self._worker = threading.Thread(target=relay_loop, name="outbox-relay", daemon=True)
+        self._worker.start()
+
+    def stop(self) -> None:
+        if self._worker is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._worker.join(timeout=10)
+        self._worker = None
+        # Ultima drenagem: o que foi commitado ate aqui nao espera o proximo processo.
+        self._drain_all()
+
+    def _drain_all(self) -> None:
+        db = self.session_factory()
+        try:
+            while self.drain(db) > 0:
+                pass
+            self.purge_published(db)
+        except Exception:
+            db.rollback()
+            logger.exception("outbox.relay.failed")
+        finally:
+            db.close()
+
+
+outbox_relay = OutboxRelay()
+
+
+
+
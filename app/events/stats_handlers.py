@@ -0,0 +1,33 @@
+﻿# Arquivo: backend/backend\app\events\stats_handlers.py
+# Camada: Module
+# Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
+# Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
+
+from sqlalchemy.orm import Session
+
+from app.events.bus import event_bus
+from app.services.stats_service import StatsService
+
+_registered = False
+
+
+def _refresh_stats_caches(payloads: list[dict]) -> None:
+    # Roda no relay do outbox, fora da requisicao: escritas do mesmo usuario no lote viram
+    # um unico recalculo.
+    db: Session = payloads[0]["db"]
+    service = StatsService()
+    for user_id in dict.fromkeys(payload["user_id"] for payload in payloads):
+        service.recompute_cached_user_stats(db, user_id)
+    service.mark_global_stats_dirty()
+
+
+def register_stats_handlers() -> None:
+    global _registered
+    if _registered:
+        return
+    event_bus.subscribe_batch("user_anime.changed", _refresh_stats_caches)
+    _registered = True
+
+
+
+
@@ -3,38 +3,124 @@
 # Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
 # Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
 
+import asyncio
+import threading
 import httpx
 import time
 from datetime import datetime
+from typing import Callable
 
 from app.core.cache import cache_store
 from app.core.config import settings
+from app.external.rate_governor import RateGovernor, jikan_rate_governor
 
+try:
+    import h2  # noqa: F401
+except Exception:  # pragma: no cover
+    h2 = None
 
-class JikanAnimeClient:
-    def __init__(self):
+_shared_http_client: httpx.Client | None = None
+_shared_http_client_lock = threading.Lock()
+
+
+def _connection_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.EXTERNAL_API_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.EXTERNAL_API_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.EXTERNAL_API_KEEPALIVE_SECONDS,
+    )
+
+
+def _http2_enabled() -> bool:
+    return settings.EXTERNAL_API_HTTP2 and h2 is not None
+
+
+def get_shared_http_client() -> httpx.Client:
+    # Pool sincrono unico por processo: reaproveita conexoes TCP/TLS entre chamadas.
+    global _shared_http_client
+    with _shared_http_client_lock:
+        if _shared_http_client is None or _shared_http_client.is_closed:
+            _shared_http_client = httpx.Client(
+                timeout=settings.EXTERNAL_API_TIMEOUT_SECONDS,
+                limits=_connection_limits(),
+                http2=_http2_enabled(),
+            )
+        return _shared_http_client
+
+
+def close_shared_http_client() -> None:
+    global _shared_http_client
+    with _shared_http_client_lock:
+        if _shared_http_client is not None:
+            _shared_http_client.close()
+            _shared_http_client = None
+
+
+class _JikanClientBase:
+    def __init__(self, rate_governor: RateGovernor | None = None):
         # ConfiguraÃ§Ã£o centralizada via variÃ¡veis de ambiente.
         self.base_url = settings.JIKAN_BASE_URL.rstrip("/")
         self.timeout = settings.EXTERNAL_API_TIMEOUT_SECONDS
         self.cache_ttl = settings.EXTERNAL_CACHE_TTL_SECONDS
         self.max_retries = settings.EXTERNAL_API_MAX_RETRIES
         self.backoff_seconds = settings.EXTERNAL_API_BACKOFF_SECONDS
+        # Governador proativo (3 req/s, 60 req/min): evita o 429 em vez de reagir a ele.
+        self.rate_governor = rate_governor or jikan_rate_governor
 
-    def fetch_anime(self, mal_id: int) -> dict:
+    # Cada request externo e descrito por (cache_key, url, mapper); o transporte
+    # (sync ou async) fica nas subclasses.
+    def _anime_request(self, mal_id: int) -> tuple[str, str, Callable[[dict], dict]]:
         # Detalhes completos de um anime por MAL ID (rota /anime/{id}/full).
-        cache_key = f"external:jikan:anime:{mal_id}"
-        cached = cache_store.get(cache_key)
-        if cached is not None:
-            return cached
+        return f"external:jikan:anime:{mal_id}", f"{self.base_url}/anime/{mal_id}/full", self._map_anime_payload
 
-        url = f"{self.base_url}/anime/{mal_id}/full"
-        payload = self._get_with_retry(url)
+    def _top_request(self, limit: int) -> tuple[str, str, Callable[[dict], list[dict]]]:
+        # Ranking de popularidade geral para vitrine/recomendaÃ§Ã£o.
+        return (
+            f"external:jikan:top:{limit}",
+            f"{self.base_url}/top/anime?limit={max(1, min(limit, 50))}&sfw=true",
+            self._map_catalog_payload,
+        )
+
+    def _current_season_request(self, limit: int) -> tuple[str, str, Callable[[dict], list[dict]]]:
+        # Temporada atual para captar tÃ­tulos em destaque e lanÃ§amentos correntes.
+        return (
+            f"external:jikan:season-now:{limit}",
+            f"{self.base_url}/seasons/now?limit={max(1, min(limit, 50))}&sfw=true",
+            self._map_catalog_payload,
+        )
 
+    def _upcoming_request(self, limit: int) -> tuple[str, str, Callable[[dict], list[dict]]]:
+        # PrÃ³ximos lanÃ§amentos para feed de notÃ­cias.
+        return (
+            f"external:jikan:upcoming:{limit}",
+            f"{self.base_url}/seasons/upcoming?limit={max(1, min(limit, 50))}&sfw=true",
+            self._map_catalog_payload,
+        )
+
+    def _season_page_url(self, year: int, season: str, page: int) -> str:
+        return f"{self.base_url}/seasons/{year}/{season.lower().strip()}?page={page}&sfw=true"
+
+    def _season_page_request(self, year: int, season: str, page: int) -> tuple[str, str, Callable[[dict], dict]]:
+        # Uma pagina isolada; last_page permite disparar as demais paginas em paralelo.
+        return (
+            f"external:jikan:season-page:{year}:{season}:{page}",
+            self._season_page_url(year, season, page),
+            lambda payload: self._map_season_page(payload, page),
+        )
+
+    def _map_season_page(self, payload: dict, page: int) -> dict:
+        pagination = payload.get("pagination") or {}
+        last_page = pagination.get("last_visible_page")
+        if not isinstance(last_page, int):
+            last_page = page + 1 if pagination.get("has_next_page", False) else page
+        return {"items": self._map_catalog_payload(payload), "last_page": max(page, last_page)}
+
+    def _map_anime_payload(self, payload: dict) -> dict:
         data = payload.get("data")
         if not data:
             raise ValueError("External anime data not found")
 
-        mapped = {
+        return {
             "mal_id": data.get("mal_id"),
             "title": data.get("title") or "Unknown title",
             "genre": ", ".join([g.get("name") for g in (data.get("genres") or []) if g.get("name")]) or "Unknown",
@@ -45,67 +131,9 @@ class JikanAnimeClient:
             "image_url": ((data.get("images") or {}).get("jpg") or {}).get("image_url"),
             "synopsis": data.get("synopsis"),
         }
-        cache_store.set(cache_key, mapped, ttl_seconds=self.cache_ttl)
-        return mapped
-
-    def fetch_top_anime(self, limit: int = 25) -> list[dict]:
-        # Ranking de popularidade geral para vitrine/recomendaÃ§Ã£o.
-        cache_key = f"external:jikan:top:{limit}"
-        cached = cache_store.get(cache_key)
-        if cached is not None:
-            return cached
 
-        payload = self._get_with_retry(f"{self.base_url}/top/anime?limit={max(1, min(limit, 50))}&sfw=true")
-        mapped = [self._map_catalog_item(item) for item in (payload.get("data") or [])]
-        cache_store.set(cache_key, mapped, ttl_seconds=self.cache_ttl)
-        return mapped
-
-    def fetch_current_season(self, limit: int = 25) -> list[dict]:
-        # Temporada atual para captar tÃ­tulos em destaque e lanÃ§amentos correntes.
-        cache_key = f"external:jikan:season-now:{limit}"
-        cached = cache_store.get(cache_key)
-        if cached is not None:
-            return cached
-
-        payload = self._get_with_retry(f"{self.base_url}/seasons/now?limit={max(1, min(limit, 50))}&sfw=true")
-        mapped = [self._map_catalog_item(item) for item in (payload.get("data") or [])]
-        cache_store.set(cache_key, mapped, ttl_seconds=self.cache_ttl)
-        return mapped
-
-    def fetch_upcoming(self, limit: int = 20) -> list[dict]:
-        # PrÃ³ximos lanÃ§amentos para feed de notÃ­cias.
-        cache_key = f"external:jikan:upcoming:{limit}"
-        cached = cache_store.get(cache_key)
-        if cached is not None:
-            return cached
-
-        payload = self._get_with_retry(f"{self.base_url}/seasons/upcoming?limit={max(1, min(limit, 50))}&sfw=true")
-        mapped = [self._map_catalog_item(item) for item in (payload.get("data") or [])]
-        cache_store.set(cache_key, mapped, ttl_seconds=self.cache_ttl)
-        return mapped
-
-    def fetch_season_catalog(self, year: int, season: str, pages: int = 1) -> list[dict]:
-        # IngestÃ£o por temporada/ano para importaÃ§Ã£o de catÃ¡logos histÃ³ricos.
-        safe_pages = max(1, min(pages, 10))
-        cache_key = f"external:jikan:season:{year}:{season}:{safe_pages}"
-        cached = cache_store.get(cache_key)
-        if cached is not None:
-            return cached
-
-        items: list[dict] = []
-        normalized_season = season.lower().strip()
-        for page in range(1, safe_pages + 1):
-            payload = self._get_with_retry(
-                f"{self.base_url}/seasons/{year}/{normalized_season}?page={page}&sfw=true"
-            )
-            page_items = [self._map_catalog_item(item) for item in (payload.get("data") or [])]
-            items.extend(page_items)
-            pagination = payload.get("pagination") or {}
-            if not pagination.get("has_next_page", False):
-                break
-
-        cache_store.set(cache_key, items, ttl_seconds=self.cache_ttl)
-        return items
+    def _map_catalog_payload(self, payload: dict) -> list[dict]:
+        return [self._map_catalog_item(item) for item in (payload.get("data") or [])]
 
     def _map_catalog_item(self, data: dict) -> dict:
         return {
@@ -122,25 +150,20 @@ class JikanAnimeClient:
             "url": data.get("url"),
         }
 
-    def _get_with_retry(self, url: str) -> dict:
-        with httpx.Client(timeout=self.timeout) as client:
-            attempt = 0
-            while True:
-                attempt += 1
-                response = client.get(url)
-                if response.status_code < 400:
-                    return response.json()
-
-                retryable = response.status_code == 429 or 500 <= response.status_code < 600
-                if not retryable or attempt > self.max_retries:
-                    response.raise_for_status()
-
-                retry_after = response.headers.get("Retry-After")
-                if retry_after and retry_after.isdigit():
-                    sleep_seconds = int(retry_after)
-                else:
-                    sleep_seconds = self.backoff_seconds * (2 ** (attempt - 1))
-                time.sleep(max(0, sleep_seconds))
+    def _retry_delay(self, response, attempt: int) -> float | None:
+        # None => nao tenta de novo (erro definitivo ou tentativas esgotadas).
+        retryable = response.status_code == 429 or 500 <= response.status_code < 600
+        if not retryable or attempt > self.max_retries:
+            return None
+
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            delay = max(0, int(retry_after))
+        else:
+            delay = max(0, self.backoff_seconds * (2 ** (attempt - 1)))
+        if response.status_code == 429 and self.rate_governor is not None:
+            self.rate_governor.pause(delay)
+        return delay
 
     @staticmethod
     def _normalize_score(score: float | int | None) -> int | None:
@@ -166,3 +189,157 @@ class JikanAnimeClient:
         except Exception:
             return None
 
+
+class JikanAnimeClient(_JikanClientBase):
+    """Client sincrono (scripts, services chamados em handlers sync via threadpool)."""
+
+    def fetch_anime(self, mal_id: int) -> dict:
+        return self._fetch_cached(*self._anime_request(mal_id))
+
+    def fetch_top_anime(self, limit: int = 25) -> list[dict]:
+        return self._fetch_cached(*self._top_request(limit))
+
+    def fetch_current_season(self, limit: int = 25) -> list[dict]:
+        return self._fetch_cached(*self._current_season_request(limit))
+
+    def fetch_upcoming(self, limit: int = 20) -> list[dict]:
+        return self._fetch_cached(*self._upcoming_request(limit))
+
+    def fetch_season_page(self, year: int, season: str, page: int = 1) -> dict:
+        return self._fetch_cached(*self._season_page_request(year, season, page))
+
+    def fetch_season_catalog(self, year: int, season: str, pages: int = 1) -> list[dict]:
+        # IngestÃ£o por temporada/ano para importaÃ§Ã£o de catÃ¡logos histÃ³ricos.
+        safe_pages = max(1, min(pages, 10))
+        cache_key = f"external:jikan:season:{year}:{season}:{safe_pages}"
+        cached = cache_store.get(cache_key)
+        if cached is not None:
+            return cached
+
+        items: list[dict] = []
+        for page in range(1, safe_pages + 1):
+            payload = self._get_with_retry(self._season_page_url(year, season, page))
+            items.extend(self._map_catalog_payload(payload))
+            pagination = payload.get("pagination") or {}
+            if not pagination.get("has_next_page", False):
+                break
+
+        cache_store.set(cache_key, items, ttl_seconds=self.cache_ttl)
+        return items
+
+    def _fetch_cached(self, cache_key: str, url: str, mapper: Callable[[dict], object]):
+        # Single-flight: varios requests com a mesma chave vencida geram uma unica chamada a Jikan.
+        return cache_store.get_or_compute(
+            cache_key,
+            lambda: mapper(self._get_with_retry(url)),
+            ttl_seconds=self.cache_ttl,
+            stale_seconds=settings.EXTERNAL_CACHE_STALE_SECONDS,
+        )
+
+    def _get_with_retry(self, url: str) -> dict:
+        client = get_shared_http_client()
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.rate_governor is not None:
+                self.rate_governor.acquire()
+            response = client.get(url)
+            if response.status_code < 400:
+                return response.json()
+
+            sleep_seconds = self._retry_delay(response, attempt)
+            if sleep_seconds is None:
+                response.raise_for_status()
+            time.sleep(sleep_seconds)
+
+
+class AsyncJikanAnimeClient(_JikanClientBase):
+    """Client assincrono com pool httpx.AsyncClient de vida longa (criado no lifespan)."""
+
+    def __init__(self, http_client: httpx.AsyncClient | None = None, rate_governor: RateGovernor | None = None):
+        super().__init__(rate_governor=rate_governor)
+        self._http_client = http_client
+        self._owns_http_client = http_client is None
+
+    async def __aenter__(self) -> "AsyncJikanAnimeClient":
+        return self
+
+    async def __aexit__(self, *_exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._http_client is not None and self._owns_http_client:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    async def fetch_anime(self, mal_id: int) -> dict:
+        return await self._fetch_cached(*self._anime_request(mal_id))
+
+    async def fetch_top_anime(self, limit: int = 25) -> list[dict]:
+        return await self._fetch_cached(*self._top_request(limit))
+
+    async def fetch_current_season(self, limit: int = 25) -> list[dict]:
+        return await self._fetch_cached(*self._current_season_request(limit))
+
+    async def fetch_upcoming(self, limit: int = 20) -> list[dict]:
+        return await self._fetch_cached(*self._upcoming_request(limit))
+
+    async def fetch_season_page(self, year: int, season: str, page: int = 1) -> dict:
+        return await self._fetch_cached(*self._season_page_request(year, season, page))
+
+    async def fetch_season_catalog(self, year: int, season: str, pages: int = 1) -> list[dict]:
+        safe_pages = max(1, min(pages, 10))
+        cache_key = f"external:jikan:season:{year}:{season}:{safe_pages}"
+        cached = cache_store.get(cache_key)
+        if cached is not None:
+            return cached
+
+        items: list[dict] = []
+        for page in range(1, safe_pages + 1):
+            payload = await self._get_with_retry(self._season_page_url(year, season, page))
+            items.extend(self._map_catalog_payload(payload))
+            pagination = payload.get("pagination") or {}
+            if not pagination.get("has_next_page", False):
+                break
+
+        cache_store.set(cache_key, items, ttl_seconds=self.cache_ttl)
+        return items
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=_connection_limits(),
+                http2=_http2_enabled(),
+            )
+            self._owns_http_client = True
+        return self._http_client
+
+    async def _fetch_cached(self, cache_key: str, url: str, mapper: Callable[[dict], object]):
+        cached = cache_store.get(cache_key)
+        if cached is not None:
+            return cached
+
+        mapped = mapper(await self._get_with_retry(url))
+        cache_store.set(cache_key, mapped, ttl_seconds=self.cache_ttl)
+        return mapped
+
+    async def _get_with_retry(self, url: str) -> dict:
+        client = self._client()
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.rate_governor is not None:
+                await self.rate_governor.acquire_async()
+            response = await client.get(url)
+            if response.status_code < 400:
+                return response.json()
+
+            sleep_seconds = self._retry_delay(response, attempt)
+            if sleep_seconds is None:
+                response.raise_for_status()
+            await asyncio.sleep(sleep_seconds)
+
+
+
+
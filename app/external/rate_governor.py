@@ -0,0 +1,219 @@
+﻿# Arquivo: backend/backend\app\external\rate_governor.py
+# Camada: Module
+# Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
+# Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
+
+"""Governador de taxa do lado do cliente para APIs externas (token bucket).
+
+Cada limite "N requisicoes por janela W" vira um bucket com capacidade
+`burst` e reposicao (N - burst) / W tokens/s. Assim, em qualquer janela
+deslizante de W segundos passam no maximo burst + (N - burst) = N chamadas,
+e o 429 do servidor nunca e atingido. Varios buckets sao consumidos de forma
+atomica: uma chamada so sai quando todos tem token.
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from app.core.config import settings
+
+try:
+    import redis
+except Exception:  # pragma: no cover
+    redis = None
+
+_TOKEN_EPSILON = 1e-6
+# Redis fora do ar nao pode travar o import nem cada chamada a Jikan.
+_REDIS_TIMEOUT_SECONDS = 0.5
+
+
+@dataclass
+class TokenBucket:
+    rate: float
+    capacity: float
+    tokens: float = 0.0
+    updated_at: float | None = None
+
+    @classmethod
+    def for_limit(cls, limit: int, window_seconds: float, burst: int = 1) -> "TokenBucket":
+        burst = max(1, min(burst, limit - 1))
+        rate = max(limit - burst, 1) / window_seconds
+        return cls(rate=rate, capacity=float(burst), tokens=float(burst))
+
+    def refill(self, now: float) -> None:
+        if self.updated_at is not None and now > self.updated_at:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now if self.updated_at is None else max(now, self.updated_at)
+
+    def wait_time(self) -> float:
+        # Tolerancia evita esperas menores que a resolucao do relogio (loop infinito por arredondamento).
+        if self.tokens >= 1.0 - _TOKEN_EPSILON:
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+
+class RateGovernor:
+    """Buckets em memoria (um processo). acquire/acquire_async bloqueiam ate haver token."""
+
+    def __init__(
+        self,
+        buckets: list[TokenBucket],
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.buckets = buckets
+        self._clock = clock
+        self._sleep = sleep
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """Consome um token de cada bucket; retorna 0.0 ou quantos segundos esperar."""
+        with self._lock:
+            now = self._clock()
+            if now < self._paused_until:
+                return self._paused_until - now
+            for bucket in self.buckets:
+                bucket.refill(now)
+            wait = max((bucket.wait_time() for bucket in self.buckets), default=0.0)
+            if wait > 0:
+                return wait
+            for bucket in self.buckets:
+                bucket.tokens = max(0.0, bucket.tokens - 1.0)
+            return 0.0
+
+    def acquire(self) -> None:
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return
+            self._sleep(wait)
+
+    async def acquire_async(self) -> None:
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        # Retry-After do servidor vale para todos os chamadores deste processo, nao so para
+        # quem recebeu o 429. RedisRateGovernor estende a pausa aos outros workers.
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + max(0.0, seconds))
+
+
+# Mesma logica em Lua para compartilhar os buckets entre workers. KEYS[1] = chave de
+# pausa (Retry-After), KEYS[2..] = um hash por bucket; ARGV = pares (rate, capacity).
+# Retorna 0 ou a espera em microssegundos.
+_REDIS_ACQUIRE_SCRIPT = """
+local paused = redis.call('PTTL', KEYS[1])
+if paused > 0 then
+    return paused * 1000
+end
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local wait = 0
+local states = {}
+local buckets = {}
+for i = 2, #KEYS do
+    buckets[i - 1] = KEYS[i]
+end
+for i, key in ipairs(buckets) do
+    local rate = tonumber(ARGV[i * 2 - 1])
+    local capacity = tonumber(ARGV[i * 2])
+    local state = redis.call('HMGET', key, 'tokens', 'updated_at')
+    local tokens = tonumber(state[1]) or capacity
+    local updated_at = tonumber(state[2]) or now
+    if now > updated_at then
+        tokens = math.min(capacity, tokens + (now - updated_at) * rate)
+        updated_at = now
+    end
+    states[i] = {tokens, updated_at, math.ceil(capacity / rate) + 1}
+    if tokens < 1 then
+        wait = math.max(wait, (1 - tokens) / rate)
+    end
+end
+if wait > 0 then
+    return math.ceil(wait * 1000000)
+end
+for i, key in ipairs(buckets) do
+    redis.call('HSET', key, 'tokens', states[i][1] - 1, 'updated_at', states[i][2])
+    redis.call('EXPIRE', key, states[i][3])
+end
+return 0
+"""
+
+# So estende a pausa: um Retry-After menor nao encurta a pausa vigente.
+_REDIS_PAUSE_SCRIPT = """
+if redis.call('PTTL', KEYS[1]) < tonumber(ARGV[1]) then
+    redis.call('SET', KEYS[1], 1, 'PX', ARGV[1])
+end
+return 0
+"""
+
+
+class RedisRateGovernor(RateGovernor):
+    """Buckets compartilhados no Redis; cai para o bucket local se o Redis falhar."""
+
+    def __init__(self, redis_client, prefix: str, buckets: list[TokenBucket], **kwargs):
+        super().__init__(buckets, **kwargs)
+        self._redis = redis_client
+        self._pause_key = f"{prefix}:paused_until"
+        self._keys = [self._pause_key] + [f"{prefix}:{index}" for index in range(len(buckets))]
+        self._args = [value for bucket in buckets for value in (bucket.rate, bucket.capacity)]
+        self._script = redis_client.register_script(_REDIS_ACQUIRE_SCRIPT)
+        self._pause_script = redis_client.register_script(_REDIS_PAUSE_SCRIPT)
+
+    def try_acquire(self) -> float:
+        with self._lock:
+            paused = self._paused_until - self._clock()
+        if paused > 0:
+            return paused
+        try:
+            wait_us = int(self._script(keys=self._keys, args=self._args))
+        except Exception:
+            return super().try_acquire()
+        return wait_us / 1_000_000
+
+    def pause(self, seconds: float) -> None:
+        # Pausa local vale ja (e cobre o fallback sem Redis); a chave no Redis pausa os demais workers.
+        super().pause(seconds)
+        milliseconds = int(max(0.0, seconds) * 1000)
+        if milliseconds <= 0:
+            return
+        try:
+            self._pause_script(keys=[self._pause_key], args=[milliseconds])
+        except Exception:
+            pass
+
+
+def build_jikan_rate_governor() -> RateGovernor | None:
+    if not settings.JIKAN_RATE_LIMIT_ENABLED:
+        return None
+    buckets = [
+        TokenBucket.for_limit(settings.JIKAN_RATE_LIMIT_PER_SECOND, 1.0, burst=settings.JIKAN_RATE_LIMIT_BURST),
+        TokenBucket.for_limit(settings.JIKAN_RATE_LIMIT_PER_MINUTE, 60.0, burst=settings.JIKAN_RATE_LIMIT_BURST),
+    ]
+    if settings.REDIS_URL and redis is not None:
+        try:
+            redis_client = redis.Redis.from_url(
+                settings.REDIS_URL,
+                socket_connect_timeout=_REDIS_TIMEOUT_SECONDS,
+                socket_timeout=_REDIS_TIMEOUT_SECONDS,
+            )
+            redis_client.ping()
+            return RedisRateGovernor(redis_client, "ratelimit:jikan", buckets)
+        except Exception:
+            pass
+    return RateGovernor(buckets)
+
+
+jikan_rate_governor = build_jikan_rate_governor()
+
+
+
+
@@ -8,36 +8,50 @@ import logging
 
 from app.core.config import settings
 from app.database import SessionLocal
+from app.external.anime_client import AsyncJikanAnimeClient
 from app.services.ai_service import AIService
 from app.services.anime_import_service import AnimeImportService
 
 logger = logging.getLogger(__name__)
 
 
-async def anime_sync_loop() -> None:
+def _persist_sync_cycle(trending_items: list[dict]) -> dict:
+    # Trabalho de banco (sincrono) roda fora do event loop via asyncio.to_thread.
+    db = SessionLocal()
+    try:
+        synced = AnimeImportService().sync_catalog(db, limit=200)
+        ai_service = AIService()
+        ai_updated = ai_service.upsert_catalog_items(db, trending_items)
+        status_updates = ai_service.auto_update_statuses_all_users(db)
+        return {
+            "synced_count": synced,
+            "ai_catalog_updated": ai_updated,
+            "auto_status_updated": status_updates.updated_count,
+        }
+    finally:
+        db.close()
+
+
+async def anime_sync_loop(client: AsyncJikanAnimeClient | None = None) -> None:
     interval_seconds = max(1, settings.ANIME_SYNC_INTERVAL_MINUTES) * 60
-    service = AnimeImportService()
-    ai_service = AIService()
-    while True:
-        db = SessionLocal()
-        try:
-            synced = service.sync_catalog(db, limit=200)
-            ai_updated = ai_service.ingest_trending_catalog(db, limit=40)
-            status_updates = ai_service.auto_update_statuses_all_users(db)
-            logger.info(
-                "sync.catalog.completed",
-                extra={
-                    "synced_count": synced,
-                    "ai_catalog_updated": ai_updated,
-                    "auto_status_updated": status_updates.updated_count,
-                },
-            )
-        except Exception:
-            logger.exception("sync.catalog.failed")
-        finally:
-            db.close()
-
-        await asyncio.sleep(interval_seconds)
+    owns_client = client is None
+    client = client or AsyncJikanAnimeClient()
+    try:
+        while True:
+            try:
+                top, season = await asyncio.gather(
+                    client.fetch_top_anime(limit=40),
+                    client.fetch_current_season(limit=40),
+                )
+                summary = await asyncio.to_thread(_persist_sync_cycle, top + season)
+                logger.info("sync.catalog.completed", extra=summary)
+            except Exception:
+                logger.exception("sync.catalog.failed")
+
+            await asyncio.sleep(interval_seconds)
+    finally:
+        if owns_client:
+            await client.aclose()
 
 
 
@@ -17,11 +17,16 @@ from sqlalchemy import inspect
 from sqlalchemy.exc import OperationalError
 
 from . import models
+from .core.cache import cache_store
 from .core.config import settings
 from .core.db_migrations import apply_runtime_migrations
 from .core.logging import configure_logging
+from .core.password_hashing import password_hasher
 from .database import engine
 from .events.activity_handlers import register_activity_handlers
+from .events.outbox import outbox_relay
+from .events.stats_handlers import register_stats_handlers
+from .external.anime_client import AsyncJikanAnimeClient, close_shared_http_client
 from .jobs.anime_sync_job import anime_sync_loop
 from .routers import admin, ai, animes, auth, social, stats, user_animes, users
 
@@ -50,9 +55,16 @@ origins = [
 
 
 @asynccontextmanager
-async def lifespan(_app: FastAPI):
+async def lifespan(app: FastAPI):
     sync_task = None
+    # Pool HTTP de vida longa para a Jikan: conexoes keep-alive/HTTP2 reaproveitadas.
+    app.state.jikan_client = AsyncJikanAnimeClient()
+    cache_store.start_sweeper()
     register_activity_handlers()
+    register_stats_handlers()
+    # O relay e o caminho assincrono dos eventos de dominio: tira fan-out e stats da requisicao.
+    if settings.OUTBOX_RELAY_ENABLED:
+        outbox_relay.start()
     if settings.REQUIRE_ALEMBIC_IN_PRODUCTION and settings.ENVIRONMENT.lower() == "production":
         inspector = inspect(engine)
         if not inspector.has_table("alembic_version"):
@@ -67,7 +79,7 @@ async def lifespan(_app: FastAPI):
         except Exception:
             logger.exception("unexpected startup error while creating tables")
     if settings.ENABLE_ANIME_SYNC_JOB:
-        sync_task = asyncio.create_task(anime_sync_loop())
+        sync_task = asyncio.create_task(anime_sync_loop(app.state.jikan_client))
     yield
     if sync_task:
         sync_task.cancel()
@@ -75,6 +87,12 @@ async def lifespan(_app: FastAPI):
             await sync_task
         except asyncio.CancelledError:
             logger.info("sync.catalog.task.cancelled")
+    # Flush: eventos ja commitados sao entregues antes de o processo sair.
+    outbox_relay.stop()
+    await app.state.jikan_client.aclose()
+    close_shared_http_client()
+    cache_store.stop_sweeper()
+    password_hasher.shutdown()
 
 
 app = FastAPI(
@@ -10,12 +10,15 @@ from sqlalchemy import (
     Column,
     Date,
     DateTime,
+    Float,
     ForeignKey,
     Index,
     Integer,
     String,
     Text,
     UniqueConstraint,
+    false,
+    func,
 )
 from sqlalchemy.orm import relationship
 from .database import Base
@@ -37,6 +40,29 @@ class Anime(Base):
     last_synced_at = Column(DateTime, nullable=True, index=True)
     user_entries = relationship("UserAnime", back_populates="anime", cascade="all, delete-orphan")
     reviews = relationship("Review", back_populates="anime", cascade="all, delete-orphan")
+    stats = relationship("AnimeStats", uselist=False, cascade="all, delete-orphan")
+
+
+# Indices de keyset para GET /animes (mesmas expressoes de ordenacao do AnimeRepository).
+Index("ix_animes_title_keyset", func.coalesce(Anime.title, ""), Anime.id)
+Index("ix_animes_members_keyset", func.coalesce(Anime.members, -1), Anime.id)
+
+
+class AnimeStats(Base):
+    # Agregado materializado de user_animes por anime, mantido por delta a cada escrita.
+    __tablename__ = "anime_stats"
+    __table_args__ = (
+        Index("ix_anime_stats_average_score", "average_score", "anime_id"),
+        Index("ix_anime_stats_watcher_count", "watcher_count", "anime_id"),
+    )
+
+    anime_id = Column(Integer, ForeignKey("animes.id"), primary_key=True)
+    watcher_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Integer, nullable=False, default=0)
+    score_count = Column(Integer, nullable=False, default=0)
+    average_score = Column(Float, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
 
 class User(Base):
     __tablename__ = "users"
@@ -118,7 +144,8 @@ class Follow(Base):
 class Activity(Base):
     __tablename__ = "activities"
     __table_args__ = (
-        Index("ix_activities_user_created", "user_id", "created_at"),
+        Index("ix_activities_user_keyset", "user_id", "created_at", "id"),
+        Index("ix_activities_pull", "fanned_out", "user_id", "created_at"),
     )
 
     id = Column(Integer, primary_key=True, index=True)
@@ -128,9 +155,86 @@ class Activity(Base):
     target_id = Column(Integer, nullable=False)
     message = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    # False: autor acima do limite de fan-out (ou atividade anterior as timelines); lida por pull.
+    fanned_out = Column(Boolean, nullable=False, default=False, server_default=false())
 
     user = relationship("User", back_populates="activities")
 
 
+class TimelineEntry(Base):
+    # Home timeline materializada: uma linha por (seguidor, atividade) gravada no fan-out.
+    __tablename__ = "timeline_entries"
+    __table_args__ = (
+        UniqueConstraint("owner_id", "activity_id", name="uq_timeline_owner_activity"),
+        Index("ix_timeline_entries_owner_created", "owner_id", "created_at", "activity_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    activity_id = Column(Integer, ForeignKey("activities.id"), nullable=False, index=True)
+    created_at = Column(DateTime, nullable=False)
+
+
+class CatalogImportJob(Base):
+    __tablename__ = "catalog_import_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String, nullable=False, default="pending", index=True)
+    start_year = Column(Integer, nullable=False)
+    end_year = Column(Integer, nullable=False)
+    seasons = Column(String, nullable=False)
+    pages_per_season = Column(Integer, nullable=False, default=1)
+    inserted_or_updated = Column(Integer, nullable=False, default=0)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    segments = relationship("CatalogImportSegment", back_populates="job", cascade="all, delete-orphan")
+
+
+class CatalogImportSegment(Base):
+    # Checkpoint por (ano, temporada, pagina): segmento concluido nunca e refeito.
+    __tablename__ = "catalog_import_segments"
+    __table_args__ = (
+        UniqueConstraint("job_id", "year", "season", "page", name="uq_catalog_import_segment"),
+        Index("ix_catalog_import_segments_job_status", "job_id", "status"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("catalog_import_jobs.id"), nullable=False)
+    year = Column(Integer, nullable=False)
+    season = Column(String, nullable=False)
+    page = Column(Integer, nullable=False)
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    items_fetched = Column(Integer, nullable=False, default=0)
+    inserted_or_updated = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+
+    job = relationship("CatalogImportJob", back_populates="segments")
+
+
+class OutboxEvent(Base):
+    # Outbox transacional: gravado no mesmo commit da linha de dominio, publicado depois pelo relay.
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        Index("ix_outbox_events_pending", "published_at", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_name = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    published_at = Column(DateTime, nullable=True)
+    # Lease do relay que esta entregando o evento; vencida, outro relay pode reivindicar.
+    claimed_by = Column(String(32), nullable=True)
+    claimed_until = Column(DateTime, nullable=True)
+
+
 
 
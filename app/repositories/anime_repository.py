@@ -0,0 +1,192 @@
+﻿# Arquivo: backend/backend\app\repositories\anime_repository.py
+# Camada: Module
+# Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
+# Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
+
+from datetime import datetime, timezone
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app import models
+from app.repositories.base_repository import BaseRepository
+
+ANIME_FIELDS = (
+    "id",
+    "title",
+    "genre",
+    "episodes",
+    "mal_id",
+    "external_score",
+    "members",
+    "external_status",
+    "image_url",
+    "synopsis",
+    "last_synced_at",
+)
+ANIME_SORT_FIELDS = ("id", "title", "members")
+CATALOG_SYNC_FIELDS = (
+    "title",
+    "genre",
+    "episodes",
+    "external_score",
+    "members",
+    "external_status",
+    "image_url",
+    "synopsis",
+)
+
+
+def catalog_row(item: dict, synced_at: datetime) -> dict:
+    return {
+        "mal_id": item["mal_id"],
+        "title": item.get("title") or "Unknown title",
+        "genre": item.get("genre") or "Unknown",
+        "episodes": item.get("episodes") or 0,
+        "external_score": item.get("external_score"),
+        "members": item.get("members"),
+        "external_status": item.get("external_status"),
+        "image_url": item.get("image_url"),
+        "synopsis": item.get("synopsis"),
+        "last_synced_at": synced_at,
+    }
+
+
+def escape_like(value: str) -> str:
+    # Filtro de texto e literal: % e _ do usuario nao viram curinga do LIKE.
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def anime_sort_expression(sort: str):
+    # Mesmas expressoes dos indices ix_animes_*_keyset (NULL vira sentinela ordenavel).
+    if sort == "title":
+        return func.coalesce(models.Anime.title, "")
+    if sort == "members":
+        return func.coalesce(models.Anime.members, -1)
+    return models.Anime.id
+
+
+class AnimeRepository(BaseRepository[models.Anime]):
+    def __init__(self):
+        super().__init__(models.Anime)
+
+    def list_page(
+        self,
+        db: Session,
+        fields: tuple[str, ...] = ANIME_FIELDS,
+        limit: int = 50,
+        sort: str = "id",
+        descending: bool = False,
+        after: tuple | None = None,
+        genre: str | None = None,
+        external_status: str | None = None,
+        min_score: int | None = None,
+        max_score: int | None = None,
+    ):
+        sort_key = anime_sort_expression(sort)
+        columns = [getattr(models.Anime, field) for field in fields]
+        query = db.query(*columns, sort_key.label("sort_key"))
+
+        if genre:
+            query = query.filter(models.Anime.genre.ilike(f"%{escape_like(genre.strip())}%", escape="\\"))
+        if external_status:
+            query = query.filter(models.Anime.external_status == external_status)
+        if min_score is not None:
+            query = query.filter(models.Anime.external_score >= min_score)
+        if max_score is not None:
+            query = query.filter(models.Anime.external_score <= max_score)
+
+        if after is not None:
+            last_key, last_id = after
+            if sort == "id":
+                query = query.filter(models.Anime.id < last_id if descending else models.Anime.id > last_id)
+            elif descending:
+                query = query.filter(
+                    or_(sort_key < last_key, and_(sort_key == last_key, models.Anime.id < last_id))
+                )
+            else:
+                query = query.filter(
+                    or_(sort_key > last_key, and_(sort_key == last_key, models.Anime.id > last_id))
+                )
+
+        if sort == "id":
+            order_by = [models.Anime.id.desc() if descending else models.Anime.id.asc()]
+        elif descending:
+            order_by = [sort_key.desc(), models.Anime.id.desc()]
+        else:
+            order_by = [sort_key.asc(), models.Anime.id.asc()]
+
+        # Busca limit + 1 para saber se existe proxima pagina sem COUNT(*).
+        return query.order_by(*order_by).limit(limit + 1).all()
+
+    def stream_partitions(self, db: Session, fields: tuple[str, ...] = ANIME_FIELDS, batch_size: int = 1000):
+        # Cursor no servidor (stream_results) + yield_per: memoria constante por lote.
+        columns = [getattr(models.Anime, field) for field in fields]
+        statement = (
+            select(*columns)
+            .order_by(models.Anime.id.asc())
+            .execution_options(stream_results=True, yield_per=batch_size)
+        )
+        return db.execute(statement).partitions()
+
+    def bulk_upsert_catalog(
+        self,
+        db: Session,
+        items: list[dict],
+        batch_size: int = 500,
+        touch_unchanged: bool = False,
+    ) -> int:
+        """Upsert por mal_id em lotes; retorna quantas linhas foram de fato escritas.
+
+        Itens sem mal_id sao ignorados e duplicados no mesmo lote ficam com a
+        ultima ocorrencia. Com touch_unchanged=False, linhas cujo payload nao
+        mudou nao sao reescritas (nem last_synced_at). O commit fica com o chamador.
+        """
+        synced_at = datetime.now(timezone.utc)
+        rows_by_mal_id: dict[int, dict] = {}
+        for item in items:
+            if item.get("mal_id"):
+                rows_by_mal_id[item["mal_id"]] = catalog_row(item, synced_at)
+        rows = list(rows_by_mal_id.values())
+        if not rows:
+            return 0
+
+        dialect_name = db.get_bind().dialect.name
+        if dialect_name == "postgresql":
+            insert = postgresql.insert
+        elif dialect_name == "sqlite":
+            insert = sqlite.insert
+        else:
+            return self._upsert_catalog_rows_orm(db, rows)
+
+        written = 0
+        for start in range(0, len(rows), max(1, batch_size)):
+            statement = insert(models.Anime).values(rows[start : start + batch_size])
+            excluded = statement.excluded
+            changed = or_(
+                *[getattr(models.Anime, field).is_distinct_from(excluded[field]) for field in CATALOG_SYNC_FIELDS]
+            )
+            statement = statement.on_conflict_do_update(
+                index_elements=[models.Anime.mal_id],
+                set_={field: excluded[field] for field in (*CATALOG_SYNC_FIELDS, "last_synced_at")},
+                where=None if touch_unchanged else changed,
+            ).returning(models.Anime.id)
+            written += len(db.execute(statement).fetchall())
+        return written
+
+    def _upsert_catalog_rows_orm(self, db: Session, rows: list[dict]) -> int:
+        written = 0
+        for row in rows:
+            anime = db.query(models.Anime).filter(models.Anime.mal_id == row["mal_id"]).first()
+            if anime is None:
+                anime = models.Anime(mal_id=row["mal_id"])
+                db.add(anime)
+            for field in (*CATALOG_SYNC_FIELDS, "last_synced_at"):
+                setattr(anime, field, row[field])
+            written += 1
+        return written
+
+
+
+
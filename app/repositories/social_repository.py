@@ -3,10 +3,13 @@
 # Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
 # Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
 
+from datetime import datetime
+
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app import models
+from app.repositories.timeline_repository import activity_before
 
 
 class SocialRepository:
@@ -47,33 +50,25 @@ class SocialRepository:
             .first()
         )
 
-    def get_following_ids(self, db: Session, user_id: int):
-        rows = db.query(models.Follow.following_id).filter(models.Follow.follower_id == user_id).all()
-        return [row.following_id for row in rows]
-
     def create_activity(self, db: Session, activity: models.Activity):
         db.add(activity)
         db.commit()
         db.refresh(activity)
         return activity
 
-    def get_feed(self, db: Session, user_ids: list[int], limit: int = 20, offset: int = 0):
-        if not user_ids:
-            return []
-        return (
-            db.query(models.Activity)
-            .filter(models.Activity.user_id.in_(user_ids))
-            .order_by(models.Activity.created_at.desc())
-            .offset(offset)
-            .limit(limit)
-            .all()
-        )
-
-    def get_recent_activities_for_user(self, db: Session, user_id: int, limit: int = 10, offset: int = 0):
+    def get_recent_activities_for_user(
+        self,
+        db: Session,
+        user_id: int,
+        limit: int = 10,
+        offset: int = 0,
+        before: tuple[datetime, int] | None = None,
+    ):
+        query = db.query(models.Activity).filter(models.Activity.user_id == user_id)
+        if before is not None:
+            query = query.filter(activity_before(before))
         return (
-            db.query(models.Activity)
-            .filter(models.Activity.user_id == user_id)
-            .order_by(models.Activity.created_at.desc())
+            query.order_by(models.Activity.created_at.desc(), models.Activity.id.desc())
             .offset(offset)
             .limit(limit)
             .all()
@@ -3,39 +3,31 @@
 # Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
 # Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
 
-from sqlalchemy import case, desc, func
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, case, cast, delete, desc, func, insert, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
 from app import models
 
 
 class StatsRepository:
-    def get_user_average_score(self, db: Session, user_id: int):
-        value = (
-            db.query(func.avg(models.UserAnime.score))
-            .filter(
-                models.UserAnime.user_id == user_id,
-                models.UserAnime.score.isnot(None),
-            )
-            .scalar()
-        )
-        return float(value) if value is not None else None
-
-    def get_user_total_watched_episodes(self, db: Session, user_id: int):
-        return (
-            db.query(func.coalesce(func.sum(models.UserAnime.episodes_watched), 0))
-            .filter(models.UserAnime.user_id == user_id)
-            .scalar()
-        )
-
-    def get_user_total_completed(self, db: Session, user_id: int):
+    def get_user_summary(self, db: Session, user_id: int):
+        # Uma passada sobre as entradas do usuario; sem linha quando o usuario nao existe.
+        entries = models.UserAnime
         return (
-            db.query(func.count(models.UserAnime.id))
-            .filter(
-                models.UserAnime.user_id == user_id,
-                models.UserAnime.status == "completed",
+            db.query(
+                models.User.id.label("user_id"),
+                func.count(entries.id).label("entry_count"),
+                func.avg(entries.score).label("average_score"),
+                func.coalesce(func.sum(entries.episodes_watched), 0).label("total_watched_episodes"),
+                func.count(case((entries.status == "completed", entries.id))).label("total_completed"),
             )
-            .scalar()
+            .outerjoin(entries, entries.user_id == models.User.id)
+            .filter(models.User.id == user_id)
+            .group_by(models.User.id)
+            .first()
         )
 
     def get_user_personal_ranking(self, db: Session, user_id: int, limit: int = 10):
@@ -59,16 +51,16 @@ class StatsRepository:
         )
 
     def get_global_average_scores(self, db: Session, limit: int = 10):
+        # Top-N indexado sobre anime_stats, sem agregar user_animes inteiro.
         return (
             db.query(
                 models.Anime.id.label("anime_id"),
                 models.Anime.title.label("title"),
-                func.avg(models.UserAnime.score).label("value"),
+                models.AnimeStats.average_score.label("value"),
             )
-            .join(models.UserAnime, models.UserAnime.anime_id == models.Anime.id)
-            .filter(models.UserAnime.score.isnot(None))
-            .group_by(models.Anime.id, models.Anime.title)
-            .order_by(desc("value"))
+            .join(models.AnimeStats, models.AnimeStats.anime_id == models.Anime.id)
+            .filter(models.AnimeStats.score_count > 0)
+            .order_by(desc(models.AnimeStats.average_score), models.AnimeStats.anime_id)
             .limit(limit)
             .all()
         )
@@ -78,27 +70,108 @@ class StatsRepository:
             db.query(
                 models.Anime.id.label("anime_id"),
                 models.Anime.title.label("title"),
-                func.count(models.UserAnime.id).label("value"),
+                models.AnimeStats.watcher_count.label("value"),
             )
-            .join(models.UserAnime, models.UserAnime.anime_id == models.Anime.id)
-            .group_by(models.Anime.id, models.Anime.title)
-            .order_by(desc("value"))
+            .join(models.AnimeStats, models.AnimeStats.anime_id == models.Anime.id)
+            .filter(models.AnimeStats.watcher_count > 0)
+            .order_by(desc(models.AnimeStats.watcher_count), models.AnimeStats.anime_id)
             .first()
         )
 
     def get_global_best_rated(self, db: Session):
-        return (
-            db.query(
-                models.Anime.id.label("anime_id"),
-                models.Anime.title.label("title"),
-                func.avg(models.UserAnime.score).label("value"),
+        rows = self.get_global_average_scores(db, limit=1)
+        return rows[0] if rows else None
+
+    def apply_anime_stats_delta(
+        self,
+        db: Session,
+        anime_id: int,
+        watcher_delta: int = 0,
+        score_sum_delta: int = 0,
+        score_count_delta: int = 0,
+    ) -> None:
+        """Soma o delta de uma escrita em user_animes ao agregado do anime.
+
+        Roda na transacao do chamador (sem commit), para o agregado e a linha
+        de user_animes ficarem consistentes no mesmo commit.
+        """
+        if not (watcher_delta or score_sum_delta or score_count_delta):
+            return
+
+        dialect_name = db.get_bind().dialect.name
+        if dialect_name == "postgresql":
+            upsert = postgresql.insert
+        elif dialect_name == "sqlite":
+            upsert = sqlite.insert
+        else:
+            self._apply_anime_stats_delta_orm(db, anime_id, watcher_delta, score_sum_delta, score_count_delta)
+            return
+
+        stats = models.AnimeStats
+        now = datetime.utcnow()
+        statement = upsert(stats).values(
+            anime_id=anime_id,
+            watcher_count=watcher_delta,
+            score_sum=score_sum_delta,
+            score_count=score_count_delta,
+            average_score=(score_sum_delta / score_count_delta) if score_count_delta > 0 else None,
+            updated_at=now,
+        )
+        excluded = statement.excluded
+        new_sum = stats.score_sum + excluded.score_sum
+        new_count = stats.score_count + excluded.score_count
+        statement = statement.on_conflict_do_update(
+            index_elements=[stats.anime_id],
+            set_={
+                "watcher_count": stats.watcher_count + excluded.watcher_count,
+                "score_sum": new_sum,
+                "score_count": new_count,
+                "average_score": case((new_count > 0, cast(new_sum, Float) / new_count), else_=None),
+                "updated_at": now,
+            },
+        )
+        db.execute(statement)
+
+    def _apply_anime_stats_delta_orm(
+        self,
+        db: Session,
+        anime_id: int,
+        watcher_delta: int,
+        score_sum_delta: int,
+        score_count_delta: int,
+    ) -> None:
+        row = db.get(models.AnimeStats, anime_id, with_for_update=True)
+        if row is None:
+            row = models.AnimeStats(anime_id=anime_id, watcher_count=0, score_sum=0, score_count=0)
+            db.add(row)
+        row.watcher_count += watcher_delta
+        row.score_sum += score_sum_delta
+        row.score_count += score_count_delta
+        row.average_score = (row.score_sum / row.score_count) if row.score_count > 0 else None
+
+    def rebuild_anime_stats(self, db: Session) -> int:
+        """Recalcula anime_stats do zero a partir de user_animes (reparo de consistencia)."""
+        entries = models.UserAnime
+        score_sum = func.coalesce(func.sum(entries.score), 0)
+        score_count = func.count(entries.score)
+        source = select(
+            entries.anime_id,
+            func.count(entries.id),
+            score_sum,
+            score_count,
+            case((score_count > 0, cast(score_sum, Float) / score_count), else_=None),
+            literal(datetime.utcnow(), DateTime),
+        ).group_by(entries.anime_id)
+
+        db.execute(delete(models.AnimeStats))
+        result = db.execute(
+            insert(models.AnimeStats).from_select(
+                ["anime_id", "watcher_count", "score_sum", "score_count", "average_score", "updated_at"],
+                source,
             )
-            .join(models.UserAnime, models.UserAnime.anime_id == models.Anime.id)
-            .filter(models.UserAnime.score.isnot(None))
-            .group_by(models.Anime.id, models.Anime.title)
-            .order_by(desc("value"))
-            .first()
         )
+        db.commit()
+        return result.rowcount or 0
 
 
 
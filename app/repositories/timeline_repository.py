@@ -0,0 +1,107 @@
+﻿# Arquivo: backend/backend\app\repositories\timeline_repository.py
+# Camada: Module
+# Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
+# Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, and_, exists, func, insert, literal, or_, select
+from sqlalchemy.orm import Session
+
+from app import models
+
+
+def activity_before(before: tuple[datetime, int]):
+    # Keyset (created_at, id) decrescente, o mesmo par dos indices de atividade.
+    created_at, activity_id = before
+    return or_(
+        models.Activity.created_at < created_at,
+        and_(models.Activity.created_at == created_at, models.Activity.id < activity_id),
+    )
+
+
+class TimelineRepository:
+    def count_followers(self, db: Session, user_id: int) -> int:
+        return int(
+            db.query(func.count(models.Follow.id)).filter(models.Follow.following_id == user_id).scalar() or 0
+        )
+
+    def fan_out(self, db: Session, activity: models.Activity) -> int:
+        # Um unico INSERT ... SELECT sobre os seguidores, sem trazer ids para a aplicacao.
+        source = select(
+            models.Follow.follower_id,
+            literal(activity.id, Integer),
+            literal(activity.created_at, DateTime),
+        ).where(models.Follow.following_id == activity.user_id)
+        result = db.execute(
+            insert(models.TimelineEntry).from_select(["owner_id", "activity_id", "created_at"], source)
+        )
+        return result.rowcount or 0
+
+    def backfill_follow(self, db: Session, follower_id: int, following_id: int, limit: int) -> int:
+        recent = (
+            select(models.Activity.id, models.Activity.created_at)
+            .where(models.Activity.user_id == following_id, models.Activity.fanned_out.is_(True))
+            .order_by(models.Activity.created_at.desc(), models.Activity.id.desc())
+            .limit(limit)
+            .subquery()
+        )
+        already_there = exists().where(
+            models.TimelineEntry.owner_id == follower_id,
+            models.TimelineEntry.activity_id == recent.c.id,
+        )
+        source = select(literal(follower_id, Integer), recent.c.id, recent.c.created_at).where(~already_there)
+        result = db.execute(
+            insert(models.TimelineEntry).from_select(["owner_id", "activity_id", "created_at"], source)
+        )
+        return result.rowcount or 0
+
+    def get_pushed(
+        self,
+        db: Session,
+        owner_id: int,
+        limit: int,
+        before: tuple[datetime, int] | None = None,
+    ) -> list[models.Activity]:
+        entries = models.TimelineEntry
+        query = (
+            db.query(models.Activity)
+            .join(entries, entries.activity_id == models.Activity.id)
+            .filter(entries.owner_id == owner_id)
+        )
+        if before is not None:
+            created_at, activity_id = before
+            query = query.filter(
+                or_(entries.created_at < created_at, and_(entries.created_at == created_at, entries.activity_id < activity_id))
+            )
+        return (
+            query.order_by(models.TimelineEntry.created_at.desc(), models.TimelineEntry.activity_id.desc())
+            .limit(limit)
+            .all()
+        )
+
+    def get_pulled(
+        self,
+        db: Session,
+        owner_id: int,
+        limit: int,
+        before: tuple[datetime, int] | None = None,
+    ) -> list[models.Activity]:
+        # Caminho de pull: so atividades que nao passaram pelo fan-out (contas muito seguidas
+        # e historico anterior as timelines).
+        following = select(models.Follow.following_id).where(models.Follow.follower_id == owner_id)
+        query = db.query(models.Activity).filter(
+            models.Activity.fanned_out.is_(False),
+            models.Activity.user_id.in_(following),
+        )
+        if before is not None:
+            query = query.filter(activity_before(before))
+        return (
+            query.order_by(models.Activity.created_at.desc(), models.Activity.id.desc())
+            .limit(limit)
+            .all()
+        )
+
+
+
+
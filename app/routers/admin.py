@@ -8,8 +8,10 @@ from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 
 from app import models, schemas
+from app.core.cache import cache_store
 from app.core.permissions import require_roles
 from app.database import get_db
+from app.repositories.stats_repository import StatsRepository
 from app.services.anime_import_service import AnimeImportService
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
@@ -77,5 +79,15 @@ def sync_animes(
     return {"synced_count": synced_count}
 
 
+@router.post("/rebuild-anime-stats", summary="Rebuild the per-anime aggregate used by global stats")
+def rebuild_anime_stats(
+    _admin=Depends(require_roles("admin")),
+    db: Session = Depends(get_db),
+):
+    rebuilt_count = StatsRepository().rebuild_anime_stats(db)
+    cache_store.invalidate("stats:global")
+    return {"rebuilt_count": rebuilt_count}
+
+
 
 
@@ -5,7 +5,7 @@
 
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, Request, status
 from sqlalchemy.orm import Session
 
 from app import schemas
@@ -13,6 +13,7 @@ from app.core.auth import get_current_user
 from app.core.permissions import require_roles
 from app.database import get_db
 from app.services.ai_service import AIService
+from app.services.catalog_import_job_service import CatalogImportJobService
 
 router = APIRouter(prefix="/ai", tags=["AI"])
 
@@ -52,23 +53,83 @@ def refresh_catalog(
     response_model=schemas.CatalogImportRangeResult,
     summary="Import historical catalog by year range and season",
 )
-def import_catalog_range(
+async def import_catalog_range(
+    request: Request,
     start_year: int = Query(default=2000, ge=1960, le=2100),
     end_year: int = Query(default=datetime.now().year, ge=1960, le=2100),
     seasons: list[str] | None = Query(default=None),
     pages_per_season: int = Query(default=1, ge=1, le=10),
+    concurrency: int = Query(default=1, ge=1, le=16),
     _admin=Depends(require_roles("admin")),
     db: Session = Depends(get_db),
 ):
-    service = AIService()
-    return service.import_catalog_range(
+    # Fan-out no loop do servidor, com o pool Jikan compartilhado criado no lifespan.
+    service = AIService(async_client=request.app.state.jikan_client)
+    return await service.import_catalog_range_async(
         db=db,
         start_year=start_year,
         end_year=end_year,
         seasons=seasons,
         pages_per_season=pages_per_season,
+        concurrency=concurrency,
+    )
+
+
+
+@router.post(
+    "/import-jobs",
+    response_model=schemas.CatalogImportJobRead,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Start a resumable catalog backfill job",
+)
+def create_import_job(
+    background_tasks: BackgroundTasks,
+    start_year: int = Query(default=2000, ge=1960, le=2100),
+    end_year: int = Query(default=datetime.now().year, ge=1960, le=2100),
+    seasons: list[str] | None = Query(default=None),
+    pages_per_season: int = Query(default=1, ge=1, le=10),
+    admin=Depends(require_roles("admin")),
+    db: Session = Depends(get_db),
+):
+    service = CatalogImportJobService()
+    job = service.create_job(
+        db,
+        start_year=start_year,
+        end_year=end_year,
+        seasons=seasons,
+        pages_per_season=pages_per_season,
+        created_by=admin.id,
     )
+    background_tasks.add_task(service.run_job_in_background, db.get_bind(), job.id)
+    return service.to_read(db, job)
+
+
+@router.get("/import-jobs/{job_id}", response_model=schemas.CatalogImportJobRead, summary="Poll a catalog backfill job")
+def get_import_job(
+    job_id: int,
+    _admin=Depends(require_roles("admin")),
+    db: Session = Depends(get_db),
+):
+    service = CatalogImportJobService()
+    return service.to_read(db, service.get_job(db, job_id))
+
 
+@router.post(
+    "/import-jobs/{job_id}/resume",
+    response_model=schemas.CatalogImportJobRead,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Resume a catalog backfill job, retrying only failed segments",
+)
+def resume_import_job(
+    job_id: int,
+    background_tasks: BackgroundTasks,
+    _admin=Depends(require_roles("admin")),
+    db: Session = Depends(get_db),
+):
+    service = CatalogImportJobService()
+    job = service.prepare_resume(db, job_id)
+    background_tasks.add_task(service.run_job_in_background, db.get_bind(), job.id)
+    return service.to_read(db, job)
 
 @router.post("/auto-status", response_model=schemas.AutoStatusResult, summary="Auto-update user anime statuses")
 def auto_status(
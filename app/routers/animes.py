@@ -3,7 +3,10 @@
 # Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
 # Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy import text
 from sqlalchemy.exc import OperationalError, ProgrammingError
 from sqlalchemy.orm import Session
@@ -11,7 +14,10 @@ from .. import models, schemas
 from ..core.auth import get_current_user
 from ..core.permissions import require_roles
 from ..core.cache import cache_store
+from ..core.pagination import NEXT_CURSOR_HEADER
 from ..database import get_db
+from ..services.anime_catalog_service import AnimeCatalogService
+from ..services.stats_service import USER_STATS_NAMESPACE
 
 router = APIRouter(prefix="/animes", tags=["Animes"])
 
@@ -33,36 +39,48 @@ def _normalize_legacy_anime_row(row) -> dict:
     }
 
 
-def _legacy_read_animes(db: Session):
+def _legacy_read_animes(db: Session, limit: int, after_id: int | None = None, descending: bool = False):
+    direction = "DESC" if descending else "ASC"
+    keyset = ""
+    params: dict = {"limit": limit + 1}
+    if after_id is not None:
+        keyset = "WHERE id < :after_id" if descending else "WHERE id > :after_id"
+        params["after_id"] = after_id
     queries = [
         text(
-            """
+            f"""
             SELECT id, title, genre, episodes, mal_id, external_score, members, external_status, image_url, synopsis, last_synced_at
             FROM animes
-            ORDER BY id DESC
+            {keyset}
+            ORDER BY id {direction}
+            LIMIT :limit
             """
         ),
         text(
-            """
+            f"""
             SELECT id, title, genre, episodes, NULL AS mal_id, NULL AS external_score, NULL AS members,
                    NULL AS external_status, NULL AS image_url, NULL AS synopsis, NULL AS last_synced_at
             FROM animes
-            ORDER BY id DESC
+            {keyset}
+            ORDER BY id {direction}
+            LIMIT :limit
             """
         ),
         text(
-            """
+            f"""
             SELECT id, title, genre, episodes, NULL AS mal_id, NULL AS external_score, NULL AS members,
                    NULL AS external_status, NULL AS image_url, NULL AS synopsis, NULL AS last_synced_at
             FROM anime
-            ORDER BY id DESC
+            {keyset}
+            ORDER BY id {direction}
+            LIMIT :limit
             """
         ),
     ]
     last_exc: Exception | None = None
     for query in queries:
         try:
-            rows = db.execute(query).fetchall()
+            rows = db.execute(query, params).fetchall()
             return [_normalize_legacy_anime_row(row) for row in rows]
         except Exception as exc:
             db.rollback()
@@ -131,14 +149,71 @@ def create_anime(
 
 @router.get("/")
 def read_animes(
+    response: Response,
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = Query(default=None),
+    sort: Literal["id", "title", "members"] = Query(default="id"),
+    order: Literal["asc", "desc"] = Query(default="asc"),
+    fields: str | None = Query(default=None, description="Comma-separated sparse fieldset, e.g. id,title,genre"),
+    genre: str | None = Query(default=None),
+    external_status: str | None = Query(default=None),
+    min_score: int | None = Query(default=None, ge=0, le=10),
+    max_score: int | None = Query(default=None, ge=0, le=10),
     _current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
+    service = AnimeCatalogService()
     try:
-        return db.query(models.Anime).all()
+        items, next_cursor = service.list_catalog(
+            db,
+            limit=limit,
+            cursor=cursor,
+            sort=sort,
+            order=order,
+            fields=fields,
+            genre=genre,
+            external_status=external_status,
+            min_score=min_score,
+            max_score=max_score,
+        )
     except (OperationalError, ProgrammingError):
         db.rollback()
-        return _legacy_read_animes(db)
+        # Schema legado: apenas ordenacao por id, sem filtros.
+        selected_fields = service.parse_fields(fields)
+        after = service.parse_cursor(cursor, "id", order)
+        rows = _legacy_read_animes(db, limit, after_id=after[1] if after else None, descending=order == "desc")
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = service.build_cursor("id", order, rows[-1]["id"], rows[-1]["id"])
+        items = [{field: row[field] for field in selected_fields} for row in rows]
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return items
+
+@router.get("/export", summary="Stream the full catalog as NDJSON or CSV")
+def export_animes(
+    format: Literal["ndjson", "csv"] = Query(default="ndjson"),
+    fields: str | None = Query(default=None, description="Comma-separated sparse fieldset, e.g. id,title,genre"),
+    batch_size: int = Query(default=1000, ge=100, le=10000),
+    _admin=Depends(require_roles("admin")),
+    db: Session = Depends(get_db),
+):
+    service = AnimeCatalogService()
+    selected_fields = service.parse_fields(fields)
+    if format == "csv":
+        body = service.stream_csv(db, selected_fields, batch_size=batch_size)
+        media_type = "text/csv"
+    else:
+        body = service.stream_ndjson(db, selected_fields, batch_size=batch_size)
+        media_type = "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="animes.{format}"'},
+    )
+
 
 @router.delete("/{anime_id}")
 def delete_anime(
@@ -153,7 +228,7 @@ def delete_anime(
         db.delete(anime)
         db.commit()
         cache_store.invalidate("stats:global")
-        cache_store.invalidate_prefix("stats:user:")
+        cache_store.invalidate_namespace(USER_STATS_NAMESPACE)
         return {"detail": "Anime deleted"}
     except (OperationalError, ProgrammingError):
         db.rollback()
@@ -163,7 +238,7 @@ def delete_anime(
                 if result.rowcount and result.rowcount > 0:
                     db.commit()
                     cache_store.invalidate("stats:global")
-                    cache_store.invalidate_prefix("stats:user:")
+                    cache_store.invalidate_namespace(USER_STATS_NAMESPACE)
                     return {"detail": "Anime deleted"}
                 db.rollback()
             except Exception:
@@ -19,18 +19,18 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
     response_model=schemas.UserRead,
     dependencies=[Depends(limit_requests("auth:register", settings.AUTH_RATE_LIMIT_PER_MINUTE))],
 )
-def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
+async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
     service = UserService()
-    return service.register_user(db, user)
+    return await service.register_user(db, user)
 
 @router.post(
     "/login",
     response_model=schemas.Token,
     dependencies=[Depends(limit_requests("auth:login", settings.AUTH_RATE_LIMIT_PER_MINUTE))],
 )
-def login(user: schemas.UserLogin, db: Session = Depends(get_db)):
+async def login(user: schemas.UserLogin, db: Session = Depends(get_db)):
     service = UserService()
-    return service.login_user(db, user)
+    return await service.login_user(db, user)
 
 
 @router.get("/me", response_model=schemas.UserRead)
@@ -3,12 +3,13 @@
 # Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
 # Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from app import schemas
 from app.core.auth import get_current_user
 from app.core.config import settings
+from app.core.pagination import NEXT_CURSOR_HEADER
 from app.core.rate_limit import limit_requests
 from app.database import get_db
 from app.services.social_service import SocialService
@@ -77,15 +78,20 @@ def follow_user(
 )
 def get_feed(
     user_id: int,
+    response: Response,
     limit: int = Query(default=20, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, description="Opaque cursor from the X-Next-Cursor header"),
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     if user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
     service = SocialService()
-    return service.get_feed(db, user_id, limit=limit, offset=offset)
+    items, next_cursor = service.get_feed(db, user_id, limit=limit, offset=offset, cursor=cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return items
 
 
 @router.get(
@@ -98,6 +104,7 @@ def get_dashboard(
     user_id: int,
     activity_limit: int = Query(default=10, ge=1, le=100),
     activity_offset: int = Query(default=0, ge=0),
+    activity_cursor: str | None = Query(default=None, description="Opaque cursor from next_activity_cursor"),
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
@@ -109,6 +116,7 @@ def get_dashboard(
         user_id,
         activity_limit=activity_limit,
         activity_offset=activity_offset,
+        activity_cursor=activity_cursor,
     )
 
 
@@ -188,6 +188,7 @@ class DashboardRead(BaseModel):
     followers_count: int
     following_count: int
     recent_activities: list[ActivityRead]
+    next_activity_cursor: str | None = None
 
 
 class SchemaStatusRead(BaseModel):
@@ -223,6 +224,18 @@ class AutoStatusResult(BaseModel):
     # Resultado de automaÃ§Ã£o de status com trilha de alteraÃ§Ãµes.
     updated_count: int
     details: list[str]
+    completed_count: int | None = None
+    watching_count: int | None = None
+
+
+class CatalogImportSeasonProgress(BaseModel):
+    year: int
+    season: str
+    status: str = "pending"
+    pages_fetched: int = 0
+    items_fetched: int = 0
+    inserted_or_updated: int = 0
+    error: str | None = None
 
 
 class CatalogImportRangeResult(BaseModel):
@@ -231,4 +244,38 @@ class CatalogImportRangeResult(BaseModel):
     seasons: list[str]
     pages_per_season: int
     inserted_or_updated: int
+    concurrency: int = 1
+    season_progress: list[CatalogImportSeasonProgress] = Field(default_factory=list)
+
+
+class CatalogImportSegmentRead(BaseModel):
+    year: int
+    season: str
+    page: int
+    status: str
+    attempts: int
+    error: str | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CatalogImportJobRead(BaseModel):
+    id: int
+    status: str
+    start_year: int
+    end_year: int
+    seasons: list[str]
+    pages_per_season: int
+    inserted_or_updated: int
+    segments_total: int
+    segments_completed: int
+    segments_failed: int
+    segments_pending: int
+    failed_segments: list[CatalogImportSegmentRead] = Field(default_factory=list)
+    error: str | None = None
+    created_at: datetime
+    finished_at: datetime | None = None
+
+
+
 
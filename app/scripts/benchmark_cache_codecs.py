@@ -0,0 +1,115 @@
+﻿# Arquivo: backend/backend\app\scripts\benchmark_cache_codecs.py
+# Camada: Module
+# Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
+# Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
+
+"""Micro-benchmark dos codecs do cache com os objetos que realmente cacheamos.
+
+Uso: python -m app.scripts.benchmark_cache_codecs [--iterations 2000]
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.core.cache_codecs import CacheSerializer, available_codecs, lz4_frame, zstandard
+from app.external.anime_client import JikanAnimeClient
+
+
+def _season_catalog(size: int) -> list[dict]:
+    client = JikanAnimeClient()
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        client._map_catalog_item(
+            {
+                "mal_id": 50000 + index,
+                "title": f"Benchmark Season Anime {index}",
+                "genres": [{"name": "Action"}, {"name": "Fantasy"}, {"name": "Adventure"}],
+                "episodes": 12 + index % 13,
+                "score": 6.5 + (index % 30) / 10,
+                "members": 10000 * (index + 1),
+                "status": "Finished Airing",
+                "images": {"jpg": {"image_url": f"https://cdn.myanimelist.net/images/anime/{index}.jpg"}},
+                "synopsis": "A long synopsis about heroes, rivals and a journey across the land. " * 6,
+                "aired": {"from": (start + timedelta(days=index)).isoformat()},
+                "url": f"https://myanimelist.net/anime/{50000 + index}",
+            }
+        )
+        for index in range(size)
+    ]
+
+
+def _user_stats(ranking_size: int) -> dict:
+    return {
+        "average_score": 7.84,
+        "total_watched_episodes": 4210,
+        "total_completed": 180,
+        "personal_ranking": [
+            {
+                "anime_id": index,
+                "title": f"Ranked Anime {index}",
+                "status": "completed",
+                "score": 10 - index % 10,
+                "episodes_watched": 24,
+            }
+            for index in range(ranking_size)
+        ],
+    }
+
+
+def _global_stats() -> dict:
+    return {
+        "average_scores": [{"anime_id": index, "title": f"Top {index}", "value": 8.1} for index in range(10)],
+        "most_watched": {"anime_id": 1, "title": "Top 1", "value": 15320},
+        "best_rated": {"anime_id": 2, "title": "Top 2", "value": 9.4},
+    }
+
+
+def _measure(serializer: CacheSerializer, value, iterations: int) -> tuple[float, float, int]:
+    payload = serializer.dumps(value)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        serializer.dumps(value)
+    encode_us = (time.perf_counter() - started) / iterations * 1_000_000
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        serializer.loads(payload)
+    decode_us = (time.perf_counter() - started) / iterations * 1_000_000
+    return encode_us, decode_us, len(payload)
+
+
+def run(iterations: int = 2000) -> None:
+    samples = {
+        "season_catalog_25": _season_catalog(25),
+        "season_catalog_250": _season_catalog(250),
+        "user_stats_100": _user_stats(100),
+        "global_stats": _global_stats(),
+    }
+    compressions = ["none", "zlib"]
+    if zstandard is not None:
+        compressions.append("zstd")
+    if lz4_frame is not None:
+        compressions.append("lz4")
+
+    print(f"{'sample':<20} {'codec':<8} {'compression':<11} {'encode_us':>10} {'decode_us':>10} {'bytes':>9}")
+    for sample_name, value in samples.items():
+        for codec_name in available_codecs():
+            for compression in compressions:
+                serializer = CacheSerializer(codec=codec_name, compression=compression, compression_threshold=1024)
+                assert serializer.loads(serializer.dumps(value)) == value
+                encode_us, decode_us, size = _measure(serializer, value, iterations)
+                print(
+                    f"{sample_name:<20} {codec_name:<8} {compression:<11} "
+                    f"{encode_us:>10.1f} {decode_us:>10.1f} {size:>9}"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark cache codecs")
+    parser.add_argument("--iterations", type=int, default=2000)
+    run(parser.parse_args().iterations)
+
+
+
+
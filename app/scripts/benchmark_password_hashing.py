@@ -0,0 +1,78 @@
+﻿# Arquivo: backend/backend\app\scripts\benchmark_password_hashing.py
+# Camada: Module
+# Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
+# Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
+
+"""Vazao de verificacao de senha (o custo dominante do login) por pool e por core.
+
+Para cada combinacao de executor (thread/process) e numero de workers dispara
+--logins verificacoes concorrentes pelo PasswordHasher e mede logins/s e
+logins/s por core efetivamente usado. A linha "inline" e a referencia de uma
+thread sem pool. Os rounds seguem PASSWORD_PBKDF2_ROUNDS (ou --rounds).
+Uso: python -m app.scripts.benchmark_password_hashing [--workers 1 2 4] [--logins 200] [--rounds 29000]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from passlib.context import CryptContext
+
+from app.core import password_hashing
+from app.core.config import settings
+from app.core.password_hashing import PasswordHasher
+
+
+def _measure_inline(hashed: str, logins: int) -> float:
+    started = time.perf_counter()
+    for _ in range(logins):
+        password_hashing._verify_and_update("benchmark-password", hashed)
+    return logins / (time.perf_counter() - started)
+
+
+async def _measure_pool(hasher: PasswordHasher, hashed: str, logins: int) -> float:
+    # Aquece o pool (processos sobem sob demanda) fora da medicao.
+    await asyncio.gather(*(hasher.verify_and_update("benchmark-password", hashed) for _ in range(hasher.max_workers)))
+    started = time.perf_counter()
+    await asyncio.gather(*(hasher.verify_and_update("benchmark-password", hashed) for _ in range(logins)))
+    return logins / (time.perf_counter() - started)
+
+
+def run(workers: list[int], logins: int = 200, rounds: int | None = None) -> None:
+    rounds = rounds or settings.PASSWORD_PBKDF2_ROUNDS
+    if rounds != settings.PASSWORD_PBKDF2_ROUNDS:
+        # Contexto trocado antes de o pool subir: processos filhos herdam via fork.
+        password_hashing.pwd_context = CryptContext(
+            schemes=["pbkdf2_sha256"],
+            pbkdf2_sha256__default_rounds=rounds,
+            pbkdf2_sha256__min_rounds=rounds,
+        )
+    hashed = password_hashing.pwd_context.hash("benchmark-password")
+    cores = os.cpu_count() or 1
+
+    print(f"rounds={rounds} cpu_count={cores} logins={logins}")
+    print(f"{'executor':<8} {'workers':>7} {'logins_s':>9} {'per_core':>9}")
+    inline = _measure_inline(hashed, max(10, logins // 10))
+    print(f"{'inline':<8} {1:>7} {inline:>9.1f} {inline:>9.1f}")
+    for executor in ("thread", "process"):
+        for size in workers:
+            hasher = PasswordHasher(max_workers=size, use_processes=executor == "process", max_pending=logins + size)
+            try:
+                throughput = asyncio.run(_measure_pool(hasher, hashed, logins))
+            finally:
+                hasher.shutdown()
+            print(f"{executor:<8} {size:>7} {throughput:>9.1f} {throughput / min(size, cores):>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark password verification throughput")
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, os.cpu_count() or 1}))
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=None)
+    arguments = parser.parse_args()
+    run(arguments.workers, arguments.logins, arguments.rounds)
+
+
+
+
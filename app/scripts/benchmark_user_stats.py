@@ -0,0 +1,106 @@
+﻿# Arquivo: backend/backend\app\scripts\benchmark_user_stats.py
+# Camada: Module
+# Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
+# Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
+
+"""Latencia de miss do StatsService._compute_user_stats para listas grandes.
+
+Compara o calculo atual (resumo em uma query + ranking) com o antigo (lookup do
+usuario + tres agregados separados + ranking), num SQLite em memoria.
+Uso: python -m app.scripts.benchmark_user_stats [--sizes 100 1000 10000] [--iterations 50]
+"""
+
+import argparse
+import time
+
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import models
+from app.services.stats_service import StatsService
+
+STATUSES = ("watching", "completed", "dropped", "plan_to_watch")
+
+
+def _legacy_user_stats(service: StatsService, db, user_id: int) -> dict:
+    entries = models.UserAnime
+    db.query(models.User).filter(models.User.id == user_id).first()
+    average_score = db.query(func.avg(entries.score)).filter(entries.user_id == user_id, entries.score.isnot(None)).scalar()
+    total_watched = db.query(func.coalesce(func.sum(entries.episodes_watched), 0)).filter(entries.user_id == user_id).scalar()
+    total_completed = (
+        db.query(func.count(entries.id)).filter(entries.user_id == user_id, entries.status == "completed").scalar()
+    )
+    ranking = service.repository.get_user_personal_ranking(db, user_id)
+    return {
+        "average_score": average_score,
+        "total_watched_episodes": total_watched,
+        "total_completed": total_completed,
+        "personal_ranking": ranking,
+    }
+
+
+def _seed(db, list_size: int) -> int:
+    user = models.User(username=f"bench_{list_size}", email=f"bench_{list_size}@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    animes = [models.Anime(title=f"Bench Anime {list_size}-{index}", episodes=24) for index in range(list_size)]
+    db.add_all(animes)
+    db.flush()
+    db.add_all(
+        models.UserAnime(
+            user_id=user.id,
+            anime_id=anime.id,
+            status=STATUSES[index % len(STATUSES)],
+            score=(index % 10) + 1 if index % 7 else None,
+            episodes_watched=index % 25,
+        )
+        for index, anime in enumerate(animes)
+    )
+    db.commit()
+    return user.id
+
+
+def _measure(compute, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        compute()
+    return (time.perf_counter() - started) / iterations * 1000
+
+
+def run(sizes: list[int], iterations: int = 50) -> None:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    statements = {"count": 0}
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.__setitem__("count", statements["count"] + 1))
+
+    db = sessionmaker(bind=engine)()
+    service = StatsService()
+    print(f"{'entries':>8} {'variant':<8} {'miss_ms':>9} {'queries':>8}")
+    try:
+        for size in sizes:
+            user_id = _seed(db, size)
+            variants = {
+                "legacy": lambda: _legacy_user_stats(service, db, user_id),
+                "current": lambda: service._compute_user_stats(db, user_id),
+            }
+            for name, compute in variants.items():
+                statements["count"] = 0
+                compute()
+                queries = statements["count"]
+                print(f"{size:>8} {name:<8} {_measure(compute, iterations):>9.2f} {queries:>8}")
+    finally:
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark user stats cache-miss latency")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--iterations", type=int, default=50)
+    arguments = parser.parse_args()
+    run(arguments.sizes, arguments.iterations)
+
+
+
+
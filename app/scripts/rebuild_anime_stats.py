@@ -0,0 +1,26 @@
+﻿# Arquivo: backend/backend\app\scripts\rebuild_anime_stats.py
+# Camada: Module
+# Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
+# Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
+
+from app.core.cache import cache_store
+from app.database import SessionLocal
+from app.repositories.stats_repository import StatsRepository
+
+
+def run() -> None:
+    db = SessionLocal()
+    try:
+        rebuilt_count = StatsRepository().rebuild_anime_stats(db)
+    finally:
+        db.close()
+    cache_store.invalidate("stats:global")
+    print(f"anime_stats rebuilt for {rebuilt_count} animes.")
+
+
+if __name__ == "__main__":
+    run()
+
+
+
+
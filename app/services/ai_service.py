@@ -18,50 +18,48 @@ DependÃªncias usadas:
 - SQLAlchemy Session (persistÃªncia/transaÃ§Ãµes)
 """
 
+import asyncio
 from datetime import datetime, timezone
 from math import log10
 
+from sqlalchemy import and_, case, func, or_, select, update
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 
 from app import models, schemas
-from app.external.anime_client import JikanAnimeClient
+from app.core.cache import cache_store
+from app.external.anime_client import AsyncJikanAnimeClient, JikanAnimeClient
+from app.repositories.anime_repository import AnimeRepository
+from app.services.recommendation_engine import recommendation_engine, recommendation_reason, split_genres
+from app.services.stats_service import USER_STATS_NAMESPACE
+
+CATALOG_SEASONS = ("winter", "spring", "summer", "fall")
 
 
 class AIService:
-    def __init__(self, client: JikanAnimeClient | None = None):
+    def __init__(self, client: JikanAnimeClient | None = None, async_client: AsyncJikanAnimeClient | None = None):
         # Injeta o client externo para facilitar testes e troca de provider.
         self.client = client or JikanAnimeClient()
+        self.async_client = async_client
+        self.anime_repository = AnimeRepository()
 
     def ingest_trending_catalog(self, db: Session, limit: int = 40) -> int:
         # IngestÃ£o incremental: top + temporada atual, criando/atualizando registros locais.
         top = self.client.fetch_top_anime(limit=limit)
         season = self.client.fetch_current_season(limit=limit)
-        inserted_or_updated = 0
-
-        for item in top + season:
-            mal_id = item.get("mal_id")
-            if not mal_id:
-                continue
+        return self.upsert_catalog_items(db, top + season)
 
-            anime = db.query(models.Anime).filter(models.Anime.mal_id == mal_id).first()
-            if anime is None:
-                anime = models.Anime(mal_id=mal_id)
-                db.add(anime)
-
-            anime.title = item.get("title") or "Unknown title"
-            anime.genre = item.get("genre") or "Unknown"
-            anime.episodes = item.get("episodes") or 0
-            anime.external_score = item.get("external_score")
-            anime.members = item.get("members")
-            anime.external_status = item.get("external_status")
-            anime.image_url = item.get("image_url")
-            anime.synopsis = item.get("synopsis")
-            anime.last_synced_at = datetime.now(timezone.utc)
-            inserted_or_updated += 1
+    @staticmethod
+    def normalize_import_range(start_year: int, end_year: int, seasons: list[str] | None) -> list[str]:
+        if start_year < 1900 or end_year > 2100 or start_year > end_year:
+            raise HTTPException(status_code=400, detail="Invalid year range")
 
-        db.commit()
-        return inserted_or_updated
+        selected_seasons = seasons or list(CATALOG_SEASONS)
+        normalized_seasons = [season.lower().strip() for season in selected_seasons]
+        for season in normalized_seasons:
+            if season not in CATALOG_SEASONS:
+                raise HTTPException(status_code=400, detail=f"Invalid season: {season}")
+        return normalized_seasons
 
     def import_catalog_range(
         self,
@@ -70,65 +68,180 @@ class AIService:
         end_year: int,
         seasons: list[str] | None = None,
         pages_per_season: int = 1,
+        concurrency: int = 1,
     ) -> schemas.CatalogImportRangeResult:
-        if start_year < 1900 or end_year > 2100 or start_year > end_year:
-            raise HTTPException(status_code=400, detail="Invalid year range")
-
-        selected_seasons = seasons or ["winter", "spring", "summer", "fall"]
-        normalized_seasons = [season.lower().strip() for season in selected_seasons]
-        for season in normalized_seasons:
-            if season not in {"winter", "spring", "summer", "fall"}:
-                raise HTTPException(status_code=400, detail=f"Invalid season: {season}")
-
-        inserted_or_updated = 0
-        for year in range(start_year, end_year + 1):
-            for season in normalized_seasons:
+        normalized_seasons = self.normalize_import_range(start_year, end_year, seasons)
+        safe_pages = max(1, min(pages_per_season, 10))
+        safe_concurrency = max(1, min(concurrency, 16))
+        progress = self._import_progress(start_year, end_year, normalized_seasons)
+
+        if safe_concurrency > 1:
+            # Chamador sync (jobs, scripts): loop e client proprios desta chamada.
+            asyncio.run(self._import_with_own_client(db, progress, safe_pages, safe_concurrency))
+        else:
+            for entry in progress:
                 try:
-                    items = self.client.fetch_season_catalog(year, season, pages=pages_per_season)
-                except Exception:
+                    items = self.client.fetch_season_catalog(entry.year, entry.season, pages=safe_pages)
+                except Exception as exc:
                     # MantÃ©m robustez da operaÃ§Ã£o em lote: segue para prÃ³ximo bloco.
+                    entry.status = "failed"
+                    entry.error = str(exc) or type(exc).__name__
                     continue
-                inserted_or_updated += self._upsert_catalog_items(db, items)
+                entry.items_fetched = len(items)
+                entry.inserted_or_updated = self.upsert_catalog_items(db, items)
+                entry.status = "completed"
+
+        return self._import_result(start_year, end_year, normalized_seasons, safe_pages, safe_concurrency, progress)
 
+    async def import_catalog_range_async(
+        self,
+        db: Session,
+        start_year: int,
+        end_year: int,
+        seasons: list[str] | None = None,
+        pages_per_season: int = 1,
+        concurrency: int = 1,
+    ) -> schemas.CatalogImportRangeResult:
+        # Caminho do handler async: usa o client compartilhado (self.async_client, do lifespan).
+        if concurrency <= 1 or self.async_client is None:
+            return await asyncio.to_thread(
+                self.import_catalog_range, db, start_year, end_year, seasons, pages_per_season, concurrency
+            )
+
+        normalized_seasons = self.normalize_import_range(start_year, end_year, seasons)
+        safe_pages = max(1, min(pages_per_season, 10))
+        safe_concurrency = min(concurrency, 16)
+        progress = self._import_progress(start_year, end_year, normalized_seasons)
+        await self._import_seasons_concurrently(db, self.async_client, progress, safe_pages, safe_concurrency)
+        return self._import_result(start_year, end_year, normalized_seasons, safe_pages, safe_concurrency, progress)
+
+    @staticmethod
+    def _import_progress(
+        start_year: int, end_year: int, seasons: list[str]
+    ) -> list[schemas.CatalogImportSeasonProgress]:
+        return [
+            schemas.CatalogImportSeasonProgress(year=year, season=season)
+            for year in range(start_year, end_year + 1)
+            for season in seasons
+        ]
+
+    @staticmethod
+    def _import_result(
+        start_year: int,
+        end_year: int,
+        seasons: list[str],
+        pages: int,
+        concurrency: int,
+        progress: list[schemas.CatalogImportSeasonProgress],
+    ) -> schemas.CatalogImportRangeResult:
         return schemas.CatalogImportRangeResult(
             start_year=start_year,
             end_year=end_year,
-            seasons=normalized_seasons,
-            pages_per_season=max(1, min(pages_per_season, 10)),
-            inserted_or_updated=inserted_or_updated,
+            seasons=seasons,
+            pages_per_season=pages,
+            inserted_or_updated=sum(entry.inserted_or_updated for entry in progress),
+            concurrency=concurrency,
+            season_progress=progress,
         )
 
+    async def _import_with_own_client(
+        self,
+        db: Session,
+        progress: list[schemas.CatalogImportSeasonProgress],
+        pages: int,
+        concurrency: int,
+    ) -> None:
+        # O pool httpx fica preso ao loop que o criou; aqui o loop e novo, entao o client tambem.
+        async with AsyncJikanAnimeClient() as client:
+            await self._import_seasons_concurrently(db, client, progress, pages, concurrency)
+
+    async def _import_seasons_concurrently(
+        self,
+        db: Session,
+        client: AsyncJikanAnimeClient,
+        progress: list[schemas.CatalogImportSeasonProgress],
+        pages: int,
+        concurrency: int,
+    ) -> None:
+        # Fan-out de temporadas/paginas com concorrencia limitada; o rate governor do
+        # client segura a taxa global. Cada pagina e gravada assim que chega, fora do
+        # loop (Session sync), uma por vez.
+        semaphore = asyncio.Semaphore(concurrency)
+        pending: dict[asyncio.Task, tuple[schemas.CatalogImportSeasonProgress, int]] = {}
+
+        async def fetch_page(entry: schemas.CatalogImportSeasonProgress, page: int) -> dict:
+            async with semaphore:
+                return await client.fetch_season_page(entry.year, entry.season, page)
+
+        def schedule(entry: schemas.CatalogImportSeasonProgress, page: int) -> None:
+            pending[asyncio.create_task(fetch_page(entry, page))] = (entry, page)
+
+        try:
+            for entry in progress:
+                entry.status = "running"
+                schedule(entry, 1)
+
+            while pending:
+                done, _ = await asyncio.wait(pending.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    entry, page = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as exc:
+                        entry.status = "partial" if entry.pages_fetched else "failed"
+                        entry.error = str(exc) or type(exc).__name__
+                        continue
+
+                    entry.pages_fetched += 1
+                    entry.items_fetched += len(result["items"])
+                    entry.inserted_or_updated += await asyncio.to_thread(
+                        self.upsert_catalog_items, db, result["items"]
+                    )
+                    if page == 1:
+                        for next_page in range(2, min(pages, result["last_page"]) + 1):
+                            schedule(entry, next_page)
+
+            for entry in progress:
+                if entry.status == "running":
+                    entry.status = "completed"
+        finally:
+            for task in pending:
+                task.cancel()
+
     def recommend_for_user(self, db: Session, user_id: int, limit: int = 20) -> list[schemas.RecommendationRead]:
         # Ranking hÃ­brido por afinidade de gÃªneros, popularidade e score externo.
         self._ensure_catalog_seed(db)
 
-        user_entries = (
-            db.query(models.UserAnime)
+        # Um unico join traz status/nota/genero de toda a lista (sem N+1 por entrada).
+        profile_rows = (
+            db.query(
+                models.UserAnime.anime_id,
+                models.UserAnime.status,
+                models.UserAnime.score,
+                models.Anime.genre,
+            )
+            .outerjoin(models.Anime, models.Anime.id == models.UserAnime.anime_id)
             .filter(models.UserAnime.user_id == user_id)
             .all()
         )
-        user_anime_ids = {entry.anime_id for entry in user_entries}
-        preferred_genres = self._extract_preferred_genres(db, user_entries)
-
-        candidates_query = db.query(models.Anime)
-        if user_anime_ids:
-            candidates_query = candidates_query.filter(models.Anime.id.notin_(user_anime_ids))
-        candidates = candidates_query.all()
-
-        scored: list[tuple[models.Anime, float, str]] = []
-        for anime in candidates:
-            score, reason = self._score_anime(anime, preferred_genres)
-            scored.append((anime, score, reason))
-
-        scored.sort(key=lambda row: row[1], reverse=True)
-        top_items = scored[: max(1, min(limit, 100))]
+        user_anime_ids = {row.anime_id for row in profile_rows}
+        preferred_genres = self._extract_preferred_genres(profile_rows)
+
+        # Score vetorizado sobre a matriz de features do catalogo; so os top-k viram ORM.
+        matrix = recommendation_engine.get_matrix(db)
+        top_items = matrix.top_k(preferred_genres, user_anime_ids, limit=max(1, min(limit, 100)))
+        top_ids = [anime_id for anime_id, _score, _reason in top_items]
+        animes: dict[int, models.Anime] = {}
+        if top_ids:
+            animes = {anime.id: anime for anime in db.query(models.Anime).filter(models.Anime.id.in_(top_ids)).all()}
         return [
             schemas.RecommendationRead(
-                anime=anime,
+                anime=animes[anime_id],
                 recommendation_score=round(score, 3),
                 reason=reason,
             )
-            for anime, score, reason in top_items
+            for anime_id, score, reason in top_items
+            if anime_id in animes
         ]
 
     def get_news_feed(self, limit: int = 10) -> list[schemas.NewsItemRead]:
@@ -152,22 +265,19 @@ class AIService:
         # AutomaÃ§Ã£o por regra simples:
         # - progresso >= episÃ³dios => completed
         # - progresso > 0 e planned/on_hold => watching
-        entries = (
-            db.query(models.UserAnime)
+        rows = (
+            db.query(models.UserAnime, models.Anime.title, models.Anime.episodes)
+            .join(models.Anime, models.Anime.id == models.UserAnime.anime_id)
             .filter(models.UserAnime.user_id == user_id)
             .all()
         )
         details: list[str] = []
         updated = 0
 
-        for entry in entries:
-            anime = db.query(models.Anime).filter(models.Anime.id == entry.anime_id).first()
-            if not anime:
-                continue
-
-            target_status = self._infer_status(entry.episodes_watched, anime.episodes, entry.status)
+        for entry, title, episodes in rows:
+            target_status = self._infer_status(entry.episodes_watched, episodes, entry.status)
             if target_status != entry.status:
-                details.append(f"{anime.title}: {entry.status} -> {target_status}")
+                details.append(f"{title}: {entry.status} -> {target_status}")
                 entry.status = target_status
                 updated += 1
 
@@ -176,22 +286,119 @@ class AIService:
 
         return schemas.AutoStatusResult(updated_count=updated, details=details)
 
-    def auto_update_statuses_all_users(self, db: Session) -> schemas.AutoStatusResult:
-        users = db.query(models.User.id).all()
-        total = 0
-        details: list[str] = []
-        for (user_id,) in users:
-            result = self.auto_update_statuses(db, user_id)
-            total += result.updated_count
-            details.extend(result.details)
-        return schemas.AutoStatusResult(updated_count=total, details=details[:200])
+    def auto_update_statuses_all_users(
+        self,
+        db: Session,
+        chunk_size: int = 5000,
+        sample_size: int = 200,
+    ) -> schemas.AutoStatusResult:
+        # Versao set-based de _infer_status para todos os usuarios:
+        # 1) progresso >= episodios (episodios > 0) => completed
+        # 2) progresso > 0 e planned/on_hold => watching (roda depois da regra 1)
+        # Status NULL (linhas legadas): "!=" daria NULL no SQL, por isso o IS NULL explicito.
+        reaches_total = and_(
+            models.Anime.episodes > 0,
+            models.UserAnime.episodes_watched >= models.Anime.episodes,
+        )
+        to_completed = and_(
+            reaches_total,
+            or_(models.UserAnime.status.is_(None), models.UserAnime.status != "completed"),
+        )
+        to_watching = and_(
+            models.UserAnime.episodes_watched > 0,
+            models.UserAnime.status.in_(("planned", "on_hold")),
+        )
+
+        sample_rows = (
+            db.query(
+                models.Anime.title,
+                models.UserAnime.status,
+                case((reaches_total, "completed"), else_="watching").label("target_status"),
+            )
+            .join(models.Anime, models.Anime.id == models.UserAnime.anime_id)
+            .filter(or_(to_completed, to_watching))
+            .order_by(models.UserAnime.id.asc())
+            .limit(sample_size)
+            .all()
+        )
+        details = [f"{row.title}: {row.status} -> {row.target_status}" for row in sample_rows]
+
+        if db.get_bind().dialect.name == "postgresql":
+            # UPDATE ... FROM animes: uma instrucao por regra para a base inteira.
+            completed_count = db.execute(
+                update(models.UserAnime)
+                .where(models.UserAnime.anime_id == models.Anime.id, to_completed)
+                .values(status="completed")
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            watching_count = db.execute(
+                update(models.UserAnime)
+                .where(to_watching)
+                .values(status="watching")
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+        else:
+            completed_count, watching_count = self._bulk_update_statuses_chunked(db, chunk_size)
+
+        updated = (completed_count or 0) + (watching_count or 0)
+        if updated:
+            cache_store.invalidate_namespace(USER_STATS_NAMESPACE)
+        return schemas.AutoStatusResult(
+            updated_count=updated,
+            details=details,
+            completed_count=completed_count or 0,
+            watching_count=watching_count or 0,
+        )
 
-    def _extract_preferred_genres(self, db: Session, entries: list[models.UserAnime]) -> dict[str, float]:
+    def _bulk_update_statuses_chunked(self, db: Session, chunk_size: int) -> tuple[int, int]:
+        # Fallback portavel (SQLite): subquery correlacionada + faixas de id,
+        # com commit por faixa para nao segurar o lock de escrita do arquivo inteiro.
+        anime_episodes = (
+            select(models.Anime.episodes)
+            .where(models.Anime.id == models.UserAnime.anime_id)
+            .scalar_subquery()
+        )
+        to_completed = and_(
+            anime_episodes > 0,
+            models.UserAnime.episodes_watched >= anime_episodes,
+            or_(models.UserAnime.status.is_(None), models.UserAnime.status != "completed"),
+        )
+        to_watching = and_(
+            models.UserAnime.episodes_watched > 0,
+            models.UserAnime.status.in_(("planned", "on_hold")),
+        )
+
+        min_id, max_id = db.query(func.min(models.UserAnime.id), func.max(models.UserAnime.id)).one()
+        completed_count = 0
+        watching_count = 0
+        if min_id is None:
+            return completed_count, watching_count
+
+        safe_chunk = max(1, chunk_size)
+        for lower in range(min_id, max_id + 1, safe_chunk):
+            in_chunk = models.UserAnime.id.between(lower, lower + safe_chunk - 1)
+            completed_count += db.execute(
+                update(models.UserAnime)
+                .where(in_chunk, to_completed)
+                .values(status="completed")
+                .execution_options(synchronize_session=False)
+            ).rowcount or 0
+            watching_count += db.execute(
+                update(models.UserAnime)
+                .where(in_chunk, to_watching)
+                .values(status="watching")
+                .execution_options(synchronize_session=False)
+            ).rowcount or 0
+            db.commit()
+        return completed_count, watching_count
+
+    def _extract_preferred_genres(self, entries) -> dict[str, float]:
         # Perfil do usuÃ¡rio com pesos por status + nota histÃ³rica.
+        # entries: linhas (status, score, genre) ja carregadas via join.
         genre_weights: dict[str, float] = {}
         for entry in entries:
-            anime = db.query(models.Anime).filter(models.Anime.id == entry.anime_id).first()
-            if anime is None or not anime.genre:
+            if not entry.genre:
                 continue
 
             status_weight = 1.0
@@ -203,7 +410,7 @@ class AIService:
                 status_weight = 0.8
 
             score_weight = 1.0 + ((entry.score or 0) / 20.0)
-            for raw in anime.genre.split(","):
+            for raw in entry.genre.split(","):
                 genre = raw.strip().lower()
                 if not genre:
                     continue
@@ -224,53 +431,21 @@ class AIService:
             freshness = 1.0 / min(30, age_days)
 
         genre_boost = 0.0
-        if anime.genre:
-            for raw in anime.genre.split(","):
-                genre = raw.strip().lower()
-                genre_boost += preferred_genres.get(genre, 0.0)
+        for genre in split_genres(anime.genre):
+            genre_boost += preferred_genres.get(genre, 0.0)
         normalized_genre_boost = min(2.0, genre_boost / 5.0)
 
         total = (0.45 * popularity) + (0.35 * external_score) + (0.15 * normalized_genre_boost) + (0.05 * freshness)
-        if normalized_genre_boost >= 0.8:
-            reason = "Alta afinidade com seus generos favoritos"
-        elif popularity >= 0.8:
-            reason = "Em alta entre os usuarios"
-        elif freshness >= 0.03:
-            reason = "Lancamento com boa tendencia"
-        else:
-            reason = "Boa combinacao de nota e popularidade"
-        return total, reason
+        return total, recommendation_reason(normalized_genre_boost, popularity, freshness)
 
     def _ensure_catalog_seed(self, db: Session):
         catalog_size = db.query(models.Anime).count()
         if catalog_size < 25:
             self.ingest_trending_catalog(db, limit=40)
 
-    def _upsert_catalog_items(self, db: Session, items: list[dict]) -> int:
-        count = 0
-        for item in items:
-            mal_id = item.get("mal_id")
-            if not mal_id:
-                continue
-
-            anime = db.query(models.Anime).filter(models.Anime.mal_id == mal_id).first()
-            if anime is None:
-                anime = models.Anime(mal_id=mal_id)
-                db.add(anime)
-
-            anime.title = item.get("title") or "Unknown title"
-            anime.genre = item.get("genre") or "Unknown"
-            anime.episodes = item.get("episodes") or 0
-            anime.external_score = item.get("external_score")
-            anime.members = item.get("members")
-            anime.external_status = item.get("external_status")
-            anime.image_url = item.get("image_url")
-            anime.synopsis = item.get("synopsis")
-            anime.last_synced_at = datetime.now(timezone.utc)
-            count += 1
-
-        if count:
-            db.commit()
+    def upsert_catalog_items(self, db: Session, items: list[dict]) -> int:
+        count = self.anime_repository.bulk_upsert_catalog(db, items)
+        db.commit()
         return count
 
     @staticmethod
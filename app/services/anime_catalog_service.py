@@ -0,0 +1,118 @@
+﻿# Arquivo: backend/backend\app\services\anime_catalog_service.py
+# Camada: Module
+# Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
+# Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Iterator
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.repositories.anime_repository import ANIME_FIELDS, ANIME_SORT_FIELDS, AnimeRepository
+
+
+def _export_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class AnimeCatalogService:
+    def __init__(self, repository: AnimeRepository | None = None):
+        self.repository = repository or AnimeRepository()
+
+    @staticmethod
+    def parse_fields(fields: str | None) -> tuple[str, ...]:
+        if not fields:
+            return ANIME_FIELDS
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in requested if field not in ANIME_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        # id sempre volta: e a chave de desempate do cursor.
+        return tuple(field for field in ANIME_FIELDS if field == "id" or field in requested)
+
+    @staticmethod
+    def parse_cursor(cursor: str | None, sort: str, order: str) -> tuple | None:
+        if not cursor:
+            return None
+        payload = decode_cursor(cursor)
+        if payload.get("s") != sort or payload.get("o") != order or not isinstance(payload.get("id"), int):
+            raise HTTPException(status_code=400, detail="Cursor does not match requested ordering")
+        return payload.get("k"), payload["id"]
+
+    @staticmethod
+    def build_cursor(sort: str, order: str, sort_key, anime_id: int) -> str:
+        return encode_cursor({"s": sort, "o": order, "k": sort_key, "id": anime_id})
+
+    def list_catalog(
+        self,
+        db: Session,
+        limit: int = 50,
+        cursor: str | None = None,
+        sort: str = "id",
+        order: str = "asc",
+        fields: str | None = None,
+        genre: str | None = None,
+        external_status: str | None = None,
+        min_score: int | None = None,
+        max_score: int | None = None,
+    ) -> tuple[list[dict], str | None]:
+        if sort not in ANIME_SORT_FIELDS:
+            raise HTTPException(status_code=400, detail=f"Invalid sort: {sort}")
+        if min_score is not None and max_score is not None and min_score > max_score:
+            raise HTTPException(status_code=400, detail="min_score cannot be greater than max_score")
+
+        selected_fields = self.parse_fields(fields)
+        rows = self.repository.list_page(
+            db,
+            fields=selected_fields,
+            limit=limit,
+            sort=sort,
+            descending=order == "desc",
+            after=self.parse_cursor(cursor, sort, order),
+            genre=genre,
+            external_status=external_status,
+            min_score=min_score,
+            max_score=max_score,
+        )
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = self.build_cursor(sort, order, last.sort_key, last.id)
+
+        items = [{field: getattr(row, field) for field in selected_fields} for row in rows]
+        return items, next_cursor
+
+    def stream_ndjson(self, db: Session, fields: tuple[str, ...], batch_size: int = 1000) -> Iterator[bytes]:
+        for partition in self.repository.stream_partitions(db, fields=fields, batch_size=batch_size):
+            lines = [
+                json.dumps(
+                    {field: _export_value(value) for field, value in zip(fields, row)},
+                    ensure_ascii=False,
+                )
+                for row in partition
+            ]
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+    def stream_csv(self, db: Session, fields: tuple[str, ...], batch_size: int = 1000) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        yield buffer.getvalue().encode("utf-8")
+        for partition in self.repository.stream_partitions(db, fields=fields, batch_size=batch_size):
+            buffer.seek(0)
+            buffer.truncate(0)
+            writer.writerows([[_export_value(value) for value in row] for row in partition])
+            yield buffer.getvalue().encode("utf-8")
+
+
+
+
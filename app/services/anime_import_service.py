@@ -3,18 +3,18 @@
 # Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
 # Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
 
-from datetime import datetime, timezone
-
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
 from app import models
 from app.external.anime_client import JikanAnimeClient
+from app.repositories.anime_repository import AnimeRepository
 
 
 class AnimeImportService:
     def __init__(self, client: JikanAnimeClient | None = None):
         self.client = client or JikanAnimeClient()
+        self.anime_repository = AnimeRepository()
 
     def import_by_mal_id(self, db: Session, mal_id: int):
         if mal_id <= 0:
@@ -27,35 +27,10 @@ class AnimeImportService:
         except Exception:
             raise HTTPException(status_code=502, detail="External catalog unavailable")
 
-        anime = db.query(models.Anime).filter(models.Anime.mal_id == mal_id).first()
-        if not anime:
-            anime = models.Anime(
-                title=external["title"],
-                genre=external["genre"],
-                episodes=external["episodes"],
-                mal_id=external["mal_id"],
-                external_score=external["external_score"],
-                members=external["members"],
-                external_status=external["external_status"],
-                image_url=external["image_url"],
-                synopsis=external["synopsis"],
-                last_synced_at=datetime.now(timezone.utc),
-            )
-            db.add(anime)
-        else:
-            anime.title = external["title"]
-            anime.genre = external["genre"]
-            anime.episodes = external["episodes"]
-            anime.external_score = external["external_score"]
-            anime.members = external["members"]
-            anime.external_status = external["external_status"]
-            anime.image_url = external["image_url"]
-            anime.synopsis = external["synopsis"]
-            anime.last_synced_at = datetime.now(timezone.utc)
-
+        # touch_unchanged: sync_catalog gira pela ordem de last_synced_at, entao sempre carimba.
+        self.anime_repository.bulk_upsert_catalog(db, [external], touch_unchanged=True)
         db.commit()
-        db.refresh(anime)
-        return anime
+        return db.query(models.Anime).filter(models.Anime.mal_id == external["mal_id"]).first()
 
     def sync_catalog(self, db: Session, limit: int = 100) -> int:
         animes = (
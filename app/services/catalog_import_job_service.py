@@ -0,0 +1,238 @@
+﻿# Arquivo: backend/backend\app\services\catalog_import_job_service.py
+# Camada: Module
+# Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
+# Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
+
+"""Backfill de catalogo como job persistido e retomavel.
+
+Cada (ano, temporada, pagina) vira um segmento com checkpoint proprio. O
+upsert dos itens e a marcacao do segmento como concluido acontecem na mesma
+transacao, entao um restart do worker nunca perde nem refaz trabalho ja
+gravado; um resume so reprocessa segmentos pendentes ou que falharam.
+"""
+
+import logging
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.core.config import settings
+from app.external.anime_client import JikanAnimeClient
+from app.repositories.anime_repository import AnimeRepository
+from app.services.ai_service import AIService
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogImportJobService:
+    def __init__(self, client: JikanAnimeClient | None = None):
+        self.client = client or JikanAnimeClient()
+        self.anime_repository = AnimeRepository()
+
+    def create_job(
+        self,
+        db: Session,
+        start_year: int,
+        end_year: int,
+        seasons: list[str] | None = None,
+        pages_per_season: int = 1,
+        created_by: int | None = None,
+    ) -> models.CatalogImportJob:
+        normalized_seasons = AIService.normalize_import_range(start_year, end_year, seasons)
+        job = models.CatalogImportJob(
+            status="pending",
+            start_year=start_year,
+            end_year=end_year,
+            seasons=",".join(normalized_seasons),
+            pages_per_season=max(1, min(pages_per_season, 10)),
+            inserted_or_updated=0,
+            created_by=created_by,
+        )
+        db.add(job)
+        db.flush()
+        # Paginas 2..N so sao criadas quando a pagina 1 revela quantas existem.
+        db.add_all(
+            [
+                models.CatalogImportSegment(job_id=job.id, year=year, season=season, page=1, status="pending")
+                for year in range(start_year, end_year + 1)
+                for season in normalized_seasons
+            ]
+        )
+        db.commit()
+        db.refresh(job)
+        return job
+
+    def get_job(self, db: Session, job_id: int) -> models.CatalogImportJob:
+        job = db.query(models.CatalogImportJob).filter(models.CatalogImportJob.id == job_id).first()
+        if not job:
+            raise HTTPException(status_code=404, detail="Import job not found")
+        return job
+
+    def prepare_resume(self, db: Session, job_id: int) -> models.CatalogImportJob:
+        job = self.get_job(db, job_id)
+        if job.status == "completed":
+            raise HTTPException(status_code=409, detail="Import job already completed")
+        if job.status == "running" and not self._is_stale(job):
+            raise HTTPException(status_code=409, detail="Import job is already running")
+
+        # Somente segmentos com falha voltam para a fila; os concluidos ficam intactos.
+        db.query(models.CatalogImportSegment).filter(
+            models.CatalogImportSegment.job_id == job.id,
+            models.CatalogImportSegment.status == "failed",
+        ).update({"status": "pending", "error": None}, synchronize_session=False)
+        job.status = "pending"
+        job.error = None
+        job.finished_at = None
+        db.commit()
+        db.refresh(job)
+        return job
+
+    def run_job(self, db: Session, job_id: int) -> models.CatalogImportJob:
+        job = self.get_job(db, job_id)
+        job.status = "running"
+        job.heartbeat_at = datetime.utcnow()
+        db.commit()
+
+        try:
+            while True:
+                segment = self._next_pending_segment(db, job.id)
+                if segment is None:
+                    break
+                self._run_segment(db, job, segment)
+        except Exception as exc:
+            db.rollback()
+            job.status = "failed"
+            job.error = str(exc) or type(exc).__name__
+            job.finished_at = datetime.utcnow()
+            db.commit()
+            logger.exception("catalog.import.job.failed", extra={"job_id": job.id})
+            return job
+
+        failed = self._count_segments(db, job.id).get("failed", 0)
+        job.status = "partial" if failed else "completed"
+        job.finished_at = datetime.utcnow()
+        db.commit()
+        logger.info(
+            "catalog.import.job.finished",
+            extra={"job_id": job.id, "status": job.status, "inserted_or_updated": job.inserted_or_updated},
+        )
+        return job
+
+    def run_job_in_background(self, bind, job_id: int) -> None:
+        # BackgroundTasks roda depois que a sessao do request foi fechada: abre a propria.
+        with Session(bind=bind, autoflush=False) as db:
+            self.run_job(db, job_id)
+
+    def to_read(self, db: Session, job: models.CatalogImportJob) -> schemas.CatalogImportJobRead:
+        counts = self._count_segments(db, job.id)
+        failed_segments = (
+            db.query(models.CatalogImportSegment)
+            .filter(models.CatalogImportSegment.job_id == job.id, models.CatalogImportSegment.status == "failed")
+            .order_by(models.CatalogImportSegment.year, models.CatalogImportSegment.season, models.CatalogImportSegment.page)
+            .limit(100)
+            .all()
+        )
+        return schemas.CatalogImportJobRead(
+            id=job.id,
+            status=job.status,
+            start_year=job.start_year,
+            end_year=job.end_year,
+            seasons=job.seasons.split(","),
+            pages_per_season=job.pages_per_season,
+            inserted_or_updated=job.inserted_or_updated,
+            segments_total=sum(counts.values()),
+            segments_completed=counts.get("completed", 0),
+            segments_failed=counts.get("failed", 0),
+            segments_pending=counts.get("pending", 0),
+            failed_segments=[schemas.CatalogImportSegmentRead.model_validate(segment) for segment in failed_segments],
+            error=job.error,
+            created_at=job.created_at,
+            finished_at=job.finished_at,
+        )
+
+    def _run_segment(self, db: Session, job: models.CatalogImportJob, segment: models.CatalogImportSegment) -> None:
+        segment.attempts += 1
+        try:
+            result = self.client.fetch_season_page(segment.year, segment.season, segment.page)
+        except Exception as exc:
+            segment.status = "failed"
+            segment.error = str(exc) or type(exc).__name__
+            job.heartbeat_at = datetime.utcnow()
+            db.commit()
+            return
+
+        written = self.anime_repository.bulk_upsert_catalog(db, result["items"])
+        if segment.page == 1:
+            self._plan_remaining_pages(db, job, segment, result["last_page"])
+        segment.status = "completed"
+        segment.error = None
+        segment.items_fetched = len(result["items"])
+        segment.inserted_or_updated = written
+        segment.completed_at = datetime.utcnow()
+        job.inserted_or_updated += written
+        job.heartbeat_at = segment.completed_at
+        # Checkpoint: dados do catalogo + progresso do segmento no mesmo commit.
+        db.commit()
+
+    def _plan_remaining_pages(
+        self,
+        db: Session,
+        job: models.CatalogImportJob,
+        segment: models.CatalogImportSegment,
+        last_page: int,
+    ) -> None:
+        existing = {
+            page
+            for (page,) in db.query(models.CatalogImportSegment.page).filter(
+                models.CatalogImportSegment.job_id == job.id,
+                models.CatalogImportSegment.year == segment.year,
+                models.CatalogImportSegment.season == segment.season,
+            )
+        }
+        db.add_all(
+            [
+                models.CatalogImportSegment(
+                    job_id=job.id,
+                    year=segment.year,
+                    season=segment.season,
+                    page=page,
+                    status="pending",
+                )
+                for page in range(2, min(job.pages_per_season, last_page) + 1)
+                if page not in existing
+            ]
+        )
+
+    @staticmethod
+    def _next_pending_segment(db: Session, job_id: int) -> models.CatalogImportSegment | None:
+        # id preserva a ordem das temporadas pedidas (segmentos da pagina 1 nascem juntos).
+        return (
+            db.query(models.CatalogImportSegment)
+            .filter(models.CatalogImportSegment.job_id == job_id, models.CatalogImportSegment.status == "pending")
+            .order_by(models.CatalogImportSegment.year, models.CatalogImportSegment.page, models.CatalogImportSegment.id)
+            .first()
+        )
+
+    @staticmethod
+    def _count_segments(db: Session, job_id: int) -> dict[str, int]:
+        rows = (
+            db.query(models.CatalogImportSegment.status, func.count(models.CatalogImportSegment.id))
+            .filter(models.CatalogImportSegment.job_id == job_id)
+            .group_by(models.CatalogImportSegment.status)
+            .all()
+        )
+        return {status: count for status, count in rows}
+
+    @staticmethod
+    def _is_stale(job: models.CatalogImportJob) -> bool:
+        if job.heartbeat_at is None:
+            return True
+        timeout = timedelta(seconds=settings.CATALOG_IMPORT_JOB_STALE_SECONDS)
+        return datetime.utcnow() - job.heartbeat_at > timeout
+
+
+
+
@@ -0,0 +1,202 @@
+﻿# Arquivo: backend/backend\app\services\recommendation_engine.py
+# Camada: Module
+# Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
+# Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
+
+"""Motor vetorizado de recomendacao.
+
+Mantem uma matriz colunar (NumPy) com as features do catalogo e calcula o
+score de todos os candidatos com um unico produto matriz-vetor contra o
+vetor de pesos de genero do usuario. A formula e a mesma de
+AIService._score_anime; aqui ela so deixa de rodar linha a linha em Python.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import timezone
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+
+POPULARITY_WEIGHT = 0.45
+EXTERNAL_SCORE_WEIGHT = 0.35
+GENRE_WEIGHT = 0.15
+FRESHNESS_WEIGHT = 0.05
+
+
+def split_genres(raw: str | None) -> list[str]:
+    if not raw:
+        return []
+    return [genre.strip().lower() for genre in raw.split(",")]
+
+
+def recommendation_reason(genre_boost: float, popularity: float, freshness: float) -> str:
+    if genre_boost >= 0.8:
+        return "Alta afinidade com seus generos favoritos"
+    if popularity >= 0.8:
+        return "Em alta entre os usuarios"
+    if freshness >= 0.03:
+        return "Lancamento com boa tendencia"
+    return "Boa combinacao de nota e popularidade"
+
+
+@dataclass
+class CatalogFeatureMatrix:
+    anime_ids: np.ndarray
+    popularity: np.ndarray
+    base_scores: np.ndarray
+    synced_at: np.ndarray
+    genre_matrix: np.ndarray
+    genre_index: dict[str, int]
+    signature: tuple
+    built_at: float
+
+    @classmethod
+    def build(cls, db: Session, signature: tuple) -> "CatalogFeatureMatrix":
+        ids: list[int] = []
+        members: list[float] = []
+        external_scores: list[float] = []
+        synced_at: list[float] = []
+        genre_rows: list[list[str]] = []
+        genre_index: dict[str, int] = {}
+
+        rows = (
+            db.query(
+                models.Anime.id,
+                models.Anime.genre,
+                models.Anime.members,
+                models.Anime.external_score,
+                models.Anime.last_synced_at,
+            )
+            .order_by(models.Anime.id.asc())
+            .yield_per(5000)
+        )
+        for anime_id, genre, member_count, external_score, last_synced_at in rows:
+            ids.append(anime_id)
+            members.append(float(member_count or 0))
+            external_scores.append(float(external_score or 0))
+            if last_synced_at is None:
+                synced_at.append(np.nan)
+            else:
+                if last_synced_at.tzinfo is None:
+                    last_synced_at = last_synced_at.replace(tzinfo=timezone.utc)
+                synced_at.append(last_synced_at.timestamp())
+            genres = split_genres(genre)
+            for name in genres:
+                if name not in genre_index:
+                    genre_index[name] = len(genre_index)
+            genre_rows.append(genres)
+
+        # Multi-hot com contagem: genero repetido na string soma duas vezes, como no loop original.
+        genre_matrix = np.zeros((len(ids), len(genre_index)), dtype=np.float32)
+        for row, genres in enumerate(genre_rows):
+            for name in genres:
+                genre_matrix[row, genre_index[name]] += 1.0
+
+        popularity = np.log10(np.maximum(10.0, np.asarray(members, dtype=np.float64) + 10.0)) / 6.0
+        external = np.asarray(external_scores, dtype=np.float64) / 10.0
+        return cls(
+            anime_ids=np.asarray(ids, dtype=np.int64),
+            popularity=popularity,
+            base_scores=(POPULARITY_WEIGHT * popularity) + (EXTERNAL_SCORE_WEIGHT * external),
+            synced_at=np.asarray(synced_at, dtype=np.float64),
+            genre_matrix=genre_matrix,
+            genre_index=genre_index,
+            signature=signature,
+            built_at=time.monotonic(),
+        )
+
+    def genre_vector(self, preferred_genres: dict[str, float]) -> np.ndarray:
+        weights = np.zeros(len(self.genre_index), dtype=np.float32)
+        for genre, weight in preferred_genres.items():
+            column = self.genre_index.get(genre)
+            if column is not None:
+                weights[column] = weight
+        return weights
+
+    def top_k(
+        self,
+        preferred_genres: dict[str, float],
+        exclude_ids: set[int],
+        limit: int,
+        now: float | None = None,
+    ) -> list[tuple[int, float, str]]:
+        if self.anime_ids.size == 0 or limit <= 0:
+            return []
+
+        now = time.time() if now is None else now
+        age_days = np.maximum(1.0, np.trunc((now - self.synced_at) / 86400.0))
+        freshness = np.where(np.isnan(self.synced_at), 0.0, 1.0 / np.minimum(30.0, age_days))
+
+        genre_boost = (self.genre_matrix @ self.genre_vector(preferred_genres)).astype(np.float64)
+        normalized_genre_boost = np.minimum(2.0, genre_boost / 5.0)
+
+        scores = self.base_scores + (GENRE_WEIGHT * normalized_genre_boost) + (FRESHNESS_WEIGHT * freshness)
+        if exclude_ids:
+            excluded = np.isin(self.anime_ids, np.fromiter(exclude_ids, dtype=np.int64, count=len(exclude_ids)))
+            scores = np.where(excluded, -np.inf, scores)
+            available = int(self.anime_ids.size - np.count_nonzero(excluded))
+        else:
+            available = int(self.anime_ids.size)
+
+        k = min(limit, available)
+        if k <= 0:
+            return []
+        # Selecao parcial O(n) e ordenacao apenas dos vencedores (desempate por id). Empates
+        # no corte entram todos antes do lexsort, senao argpartition escolhe um id arbitrario.
+        threshold = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        candidates = np.flatnonzero(scores >= threshold)
+        ordered = candidates[np.lexsort((self.anime_ids[candidates], -scores[candidates]))][:k]
+        return [
+            (
+                int(self.anime_ids[index]),
+                float(scores[index]),
+                recommendation_reason(
+                    float(normalized_genre_boost[index]),
+                    float(self.popularity[index]),
+                    float(freshness[index]),
+                ),
+            )
+            for index in ordered
+        ]
+
+
+class RecommendationEngine:
+    def __init__(self):
+        self._matrices: dict[str, CatalogFeatureMatrix] = {}
+        self._lock = threading.Lock()
+
+    def get_matrix(self, db: Session) -> CatalogFeatureMatrix:
+        # Assinatura barata do catalogo: qualquer insert/sync muda count/max(id)/max(last_synced_at).
+        count, max_id, max_synced = db.query(
+            func.count(models.Anime.id),
+            func.max(models.Anime.id),
+            func.max(models.Anime.last_synced_at),
+        ).one()
+        signature = (count, max_id, str(max_synced))
+        cache_key = str(db.get_bind().url)
+
+        with self._lock:
+            matrix = self._matrices.get(cache_key)
+            ttl = settings.RECOMMENDATION_MATRIX_TTL_SECONDS
+            if matrix is not None and matrix.signature == signature and time.monotonic() - matrix.built_at < ttl:
+                return matrix
+            matrix = CatalogFeatureMatrix.build(db, signature)
+            self._matrices[cache_key] = matrix
+            return matrix
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._matrices.clear()
+
+
+recommendation_engine = RecommendationEngine()
+
+
+
+
@@ -3,24 +3,31 @@
 # Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
 # Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
 
-import logging
+from datetime import datetime
 
 from fastapi import HTTPException
 from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.orm import Session
 
 from app import models
-from app.events.bus import event_bus
+from app.core.pagination import decode_cursor, encode_cursor
+from app.events.outbox import enqueue_event, outbox_relay
 from app.repositories.social_repository import SocialRepository
 from app import schemas
 from app.services.stats_service import StatsService
+from app.services.timeline_service import TimelineService
 
 
 class SocialService:
-    def __init__(self, repository: SocialRepository | None = None, stats_service: StatsService | None = None):
+    def __init__(
+        self,
+        repository: SocialRepository | None = None,
+        stats_service: StatsService | None = None,
+        timeline_service: TimelineService | None = None,
+    ):
         self.repository = repository or SocialRepository()
         self.stats_service = stats_service or StatsService()
-        self.logger = logging.getLogger(__name__)
+        self.timeline_service = timeline_service or TimelineService()
 
     def create_review(self, db: Session, payload: schemas.ReviewCreate):
         if not self.repository.get_user(db, payload.user_id):
@@ -35,21 +42,18 @@ class SocialService:
             content=payload.content,
         )
         try:
+            db.add(review)
+            db.flush()
+            self._record_activity(
+                db,
+                user_id=payload.user_id,
+                activity_type="review_created",
+                target_type="review",
+                target_id=review.id,
+                message=f"Published a review with score {payload.score}",
+            )
             created = self.repository.create_review(db, review)
-            try:
-                event_bus.publish(
-                    "activity.created",
-                    {
-                        "db": db,
-                        "user_id": payload.user_id,
-                        "activity_type": "review_created",
-                        "target_type": "review",
-                        "target_id": created.id,
-                        "message": f"Published a review with score {payload.score}",
-                    },
-                )
-            except Exception:
-                self.logger.exception("failed to publish review activity")
+            outbox_relay.notify(db)
             return created
         except OperationalError:
             db.rollback()
@@ -68,21 +72,18 @@ class SocialService:
             content=payload.content,
         )
         try:
+            db.add(comment)
+            db.flush()
+            self._record_activity(
+                db,
+                user_id=payload.user_id,
+                activity_type="comment_created",
+                target_type="comment",
+                target_id=comment.id,
+                message="Posted a comment",
+            )
             created = self.repository.create_comment(db, comment)
-            try:
-                event_bus.publish(
-                    "activity.created",
-                    {
-                        "db": db,
-                        "user_id": payload.user_id,
-                        "activity_type": "comment_created",
-                        "target_type": "comment",
-                        "target_id": created.id,
-                        "message": "Posted a comment",
-                    },
-                )
-            except Exception:
-                self.logger.exception("failed to publish comment activity")
+            outbox_relay.notify(db)
             return created
         except OperationalError:
             db.rollback()
@@ -100,21 +101,17 @@ class SocialService:
 
         follow = models.Follow(follower_id=follower_id, following_id=following_id)
         try:
+            self._record_activity(
+                db,
+                user_id=follower_id,
+                activity_type="follow_created",
+                target_type="user",
+                target_id=following_id,
+                message=f"Started following user {following_id}",
+            )
             created = self.repository.create_follow(db, follow)
-            try:
-                event_bus.publish(
-                    "activity.created",
-                    {
-                        "db": db,
-                        "user_id": follower_id,
-                        "activity_type": "follow_created",
-                        "target_type": "user",
-                        "target_id": following_id,
-                        "message": f"Started following user {following_id}",
-                    },
-                )
-            except Exception:
-                self.logger.exception("failed to publish follow activity")
+            self.timeline_service.backfill_follow(db, follower_id, following_id)
+            outbox_relay.notify(db)
             return created
         except IntegrityError:
             db.rollback()
@@ -123,21 +120,69 @@ class SocialService:
             db.rollback()
             raise HTTPException(status_code=503, detail="Database unavailable")
 
-    def get_feed(self, db: Session, user_id: int, limit: int = 20, offset: int = 0):
+    @staticmethod
+    def _record_activity(db: Session, **activity) -> None:
+        # Vai para o outbox no mesmo commit da linha de dominio; a atividade e gravada pelo relay.
+        enqueue_event(db, "activity.created", activity)
+
+    @staticmethod
+    def parse_activity_cursor(cursor: str | None, offset: int = 0) -> tuple[datetime, int] | None:
+        if not cursor:
+            return None
+        if offset:
+            raise HTTPException(status_code=400, detail="Use cursor or offset, not both")
+        payload = decode_cursor(cursor)
+        try:
+            return datetime.fromisoformat(payload["t"]), int(payload["id"])
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    @staticmethod
+    def build_activity_cursor(activity: models.Activity) -> str:
+        return encode_cursor({"t": activity.created_at.isoformat(), "id": activity.id})
+
+    def _page_with_cursor(self, rows: list, limit: int) -> tuple[list, str | None]:
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, self.build_activity_cursor(rows[-1])
+
+    def get_feed(
+        self,
+        db: Session,
+        user_id: int,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: str | None = None,
+    ) -> tuple[list[models.Activity], str | None]:
+        before = self.parse_activity_cursor(cursor, offset)
         if not self.repository.get_user(db, user_id):
             raise HTTPException(status_code=404, detail="User not found")
-        following_ids = self.repository.get_following_ids(db, user_id)
-        return self.repository.get_feed(db, following_ids, limit=limit, offset=offset)
-
-    def get_dashboard(self, db: Session, user_id: int, activity_limit: int = 10, activity_offset: int = 0):
+        # Um item a mais so para saber se existe proxima pagina.
+        rows = self.timeline_service.get_home_timeline(db, user_id, limit=limit + 1, offset=offset, before=before)
+        return self._page_with_cursor(rows, limit)
+
+    def get_dashboard(
+        self,
+        db: Session,
+        user_id: int,
+        activity_limit: int = 10,
+        activity_offset: int = 0,
+        activity_cursor: str | None = None,
+    ):
+        before = self.parse_activity_cursor(activity_cursor, activity_offset)
         user_stats = self.stats_service.get_user_stats(db, user_id)
         followers_count = int(self.repository.get_followers_count(db, user_id) or 0)
         following_count = int(self.repository.get_following_count(db, user_id) or 0)
-        recent_activities = self.repository.get_recent_activities_for_user(
-            db,
-            user_id,
-            limit=activity_limit,
-            offset=activity_offset,
+        recent_activities, next_activity_cursor = self._page_with_cursor(
+            self.repository.get_recent_activities_for_user(
+                db,
+                user_id,
+                limit=activity_limit + 1,
+                offset=activity_offset,
+                before=before,
+            ),
+            activity_limit,
         )
 
         return {
@@ -156,6 +201,7 @@ class SocialService:
                 }
                 for activity in recent_activities
             ],
+            "next_activity_cursor": next_activity_cursor,
         }
 
 
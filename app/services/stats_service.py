@@ -6,29 +6,75 @@
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
-from app import models
 from app.core.cache import cache_store
 from app.repositories.stats_repository import StatsRepository
 
+USER_STATS_NAMESPACE = "stats:user"
+STATS_CACHE_TTL_SECONDS = 120
+STATS_CACHE_STALE_SECONDS = 60
+GLOBAL_STATS_REFRESH_DEBOUNCE_SECONDS = 10
+
 
 class StatsService:
     def __init__(self, repository: StatsRepository | None = None):
         self.repository = repository or StatsRepository()
 
     def get_user_stats(self, db: Session, user_id: int):
-        cache_key = f"stats:user:{user_id}"
-        cached = cache_store.get(cache_key)
-        if cached is not None:
-            return cached
+        cache_key = cache_store.namespace_key(USER_STATS_NAMESPACE, user_id)
+        return cache_store.get_or_compute(
+            cache_key,
+            lambda: self._compute_user_stats(db, user_id),
+            ttl_seconds=STATS_CACHE_TTL_SECONDS,
+            stale_seconds=STATS_CACHE_STALE_SECONDS,
+        )
 
-        user = db.query(models.User).filter(models.User.id == user_id).first()
-        if not user:
+    def get_global_stats(self, db: Session):
+        # Um unico recalculo por vencimento, mesmo com muitos requests simultaneos.
+        return cache_store.get_or_compute(
+            "stats:global",
+            lambda: self._compute_global_stats(db),
+            ttl_seconds=STATS_CACHE_TTL_SECONDS,
+            stale_seconds=STATS_CACHE_STALE_SECONDS,
+        )
+
+    def recompute_cached_user_stats(self, db: Session, user_id: int) -> bool:
+        """Recalcula em background o stats ja cacheado do usuario (chamado pelo relay do outbox).
+
+        So chaves que existem sao recalculadas: usuario sem stats em cache nao paga query.
+        A chave vence antes do recalculo, entao leitores concorrentes recebem o valor atual
+        enquanto um unico get_or_compute grava o novo.
+        """
+        cache_key = cache_store.namespace_key(USER_STATS_NAMESPACE, user_id)
+        if not cache_store.mark_dirty(cache_key, refresh_within=0, stale_seconds=STATS_CACHE_STALE_SECONDS):
+            return False
+        try:
+            cache_store.get_or_compute(
+                cache_key,
+                lambda: self._compute_user_stats(db, user_id),
+                ttl_seconds=STATS_CACHE_TTL_SECONDS,
+                stale_seconds=STATS_CACHE_STALE_SECONDS,
+            )
+        except Exception:
+            # Valor vencido nao fica servindo: a proxima leitura recalcula.
+            cache_store.invalidate(cache_key)
+            raise
+        return True
+
+    def mark_global_stats_dirty(self) -> None:
+        # Uma escrita isolada nao derruba o ranking global de todo mundo: o recalculo
+        # acontece no maximo uma vez por janela de debounce.
+        cache_store.mark_dirty(
+            "stats:global",
+            refresh_within=GLOBAL_STATS_REFRESH_DEBOUNCE_SECONDS,
+            stale_seconds=STATS_CACHE_STALE_SECONDS,
+        )
+
+    def _compute_user_stats(self, db: Session, user_id: int) -> dict:
+        summary = self.repository.get_user_summary(db, user_id)
+        if summary is None:
             raise HTTPException(status_code=404, detail="User not found")
 
-        average_score = self.repository.get_user_average_score(db, user_id)
-        total_watched_episodes = self.repository.get_user_total_watched_episodes(db, user_id)
-        total_completed = self.repository.get_user_total_completed(db, user_id)
-        personal_rows = self.repository.get_user_personal_ranking(db, user_id)
+        personal_rows = self.repository.get_user_personal_ranking(db, user_id) if summary.entry_count else []
 
         personal_ranking = [
             {
@@ -42,20 +88,14 @@ class StatsService:
         ]
 
         result = {
-            "average_score": average_score,
-            "total_watched_episodes": int(total_watched_episodes or 0),
-            "total_completed": int(total_completed or 0),
+            "average_score": float(summary.average_score) if summary.average_score is not None else None,
+            "total_watched_episodes": int(summary.total_watched_episodes or 0),
+            "total_completed": int(summary.total_completed or 0),
             "personal_ranking": personal_ranking,
         }
-        cache_store.set(cache_key, result, ttl_seconds=120)
         return result
 
-    def get_global_stats(self, db: Session):
-        cache_key = "stats:global"
-        cached = cache_store.get(cache_key)
-        if cached is not None:
-            return cached
-
+    def _compute_global_stats(self, db: Session) -> dict:
         average_rows = self.repository.get_global_average_scores(db)
         average_scores = [
             {
@@ -90,7 +130,6 @@ class StatsService:
                 else None
             ),
         }
-        cache_store.set(cache_key, result, ttl_seconds=120)
         return result
 
 
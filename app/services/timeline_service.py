@@ -0,0 +1,67 @@
+﻿# Arquivo: backend/backend\app\services\timeline_service.py
+# Camada: Module
+# Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
+# Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
+
+"""Home timelines com fan-out na escrita e pull hibrido.
+
+Cada atividade nova e copiada (por id) para a timeline de cada seguidor do
+autor, e a leitura do feed vira um range scan no indice (owner_id, created_at).
+Autores com mais de TIMELINE_FANOUT_MAX_FOLLOWERS seguidores nao sao
+espalhados: suas atividades ficam com fanned_out=False e sao puxadas na leitura
+e intercaladas com a timeline materializada.
+"""
+
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.repositories.timeline_repository import TimelineRepository
+
+
+class TimelineService:
+    def __init__(self, repository: TimelineRepository | None = None):
+        self.repository = repository or TimelineRepository()
+
+    def fan_out(self, db: Session, activity: models.Activity) -> int:
+        """Espalha a atividade (ja com flush) na transacao do chamador, sem commit."""
+        if self.repository.count_followers(db, activity.user_id) > settings.TIMELINE_FANOUT_MAX_FOLLOWERS:
+            activity.fanned_out = False
+            return 0
+        activity.fanned_out = True
+        return self.repository.fan_out(db, activity)
+
+    def backfill_follow(self, db: Session, follower_id: int, following_id: int) -> int:
+        # Quem comeca a seguir ja ve as atividades recentes do seguido.
+        inserted = self.repository.backfill_follow(
+            db,
+            follower_id,
+            following_id,
+            limit=settings.TIMELINE_FOLLOW_BACKFILL_LIMIT,
+        )
+        db.commit()
+        return inserted
+
+    def get_home_timeline(
+        self,
+        db: Session,
+        user_id: int,
+        limit: int = 20,
+        offset: int = 0,
+        before: tuple[datetime, int] | None = None,
+    ):
+        window = offset + limit
+        pushed = self.repository.get_pushed(db, user_id, window, before=before)
+        pulled = self.repository.get_pulled(db, user_id, window, before=before)
+        if not pulled:
+            return pushed[offset:window]
+
+        merged = {activity.id: activity for activity in pushed + pulled}
+        ordered = sorted(merged.values(), key=lambda activity: (activity.created_at, activity.id), reverse=True)
+        return ordered[offset:window]
+
+
+
+
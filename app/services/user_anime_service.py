@@ -9,14 +9,20 @@ from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.orm import Session
 
 from app import models
-from app.core.cache import cache_store
+from app.events.outbox import enqueue_event, outbox_relay
+from app.repositories.stats_repository import StatsRepository
 from app.repositories.user_anime_repository import UserAnimeRepository
 from app import schemas
 
 
 class UserAnimeService:
-    def __init__(self, repository: UserAnimeRepository | None = None):
+    def __init__(
+        self,
+        repository: UserAnimeRepository | None = None,
+        stats_repository: StatsRepository | None = None,
+    ):
         self.repository = repository or UserAnimeRepository()
+        self.stats_repository = stats_repository or StatsRepository()
 
     def create_user_anime(self, db: Session, payload: schemas.UserAnimeCreate):
         user = db.query(models.User).filter(models.User.id == payload.user_id).first()
@@ -32,6 +38,15 @@ class UserAnimeService:
             raise HTTPException(status_code=400, detail="UserAnime entry already exists")
 
         try:
+            # O delta entra na mesma transacao do insert (create_entry faz o commit).
+            self.stats_repository.apply_anime_stats_delta(
+                db,
+                payload.anime_id,
+                watcher_delta=1,
+                score_sum_delta=payload.score or 0,
+                score_count_delta=1 if payload.score is not None else 0,
+            )
+            self._record_change(db, payload.user_id, payload.anime_id)
             created = self.repository.create_entry(
                 db=db,
                 user_id=payload.user_id,
@@ -42,7 +57,7 @@ class UserAnimeService:
                 start_date=payload.start_date,
                 finish_date=payload.finish_date,
             )
-            self._invalidate_stats_cache(payload.user_id)
+            outbox_relay.notify(db)
             return created
         except IntegrityError:
             db.rollback()
@@ -90,6 +105,7 @@ class UserAnimeService:
                 )
             entry.episodes_watched = new_progress
 
+        previous_score = entry.score
         if payload.status is not None:
             entry.status = payload.status
         if payload.score is not None:
@@ -100,16 +116,24 @@ class UserAnimeService:
             entry.finish_date = payload.finish_date
 
         try:
+            if entry.score != previous_score:
+                self.stats_repository.apply_anime_stats_delta(
+                    db,
+                    entry.anime_id,
+                    score_sum_delta=(entry.score or 0) - (previous_score or 0),
+                    score_count_delta=int(entry.score is not None) - int(previous_score is not None),
+                )
+            self._record_change(db, entry.user_id, entry.anime_id)
             updated = self.repository.update_entry(db, entry)
-            self._invalidate_stats_cache(updated.user_id)
+            outbox_relay.notify(db)
             return updated
         except OperationalError:
             db.rollback()
             raise HTTPException(status_code=503, detail="Database unavailable")
 
-    def _invalidate_stats_cache(self, user_id: int):
-        cache_store.invalidate(f"stats:user:{user_id}")
-        cache_store.invalidate("stats:global")
+    def _record_change(self, db: Session, user_id: int, anime_id: int):
+        # Cache de stats e atualizado pelo handler de user_anime.changed, fora da transacao.
+        enqueue_event(db, "user_anime.changed", {"user_id": user_id, "anime_id": anime_id})
 
     def _anime_exists(self, db: Session, anime_id: int) -> bool:
         try:
@@ -3,13 +3,19 @@
 # Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
 # Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
 
+import asyncio
+import logging
+
 from fastapi import HTTPException
 from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.orm import Session
 
-from app.core.security import create_access_token, hash_password, verify_password
+from app.core.password_hashing import password_hasher
+from app.core.security import create_access_token
 from app.repositories.user_repository import UserRepository
 
+logger = logging.getLogger(__name__)
+
 
 class UserService:
     def __init__(self, user_repository: UserRepository | None = None):
@@ -21,13 +27,19 @@ class UserService:
             raise HTTPException(status_code=404, detail="User not found")
         return user
 
-    def register_user(self, db: Session, user):
+    # Rotas async: banco (sincrono) via asyncio.to_thread, hash no pool do password_hasher.
+    async def register_user(self, db: Session, user):
+        await asyncio.to_thread(self._ensure_available, db, user)
+        hashed = await password_hasher.hash(user.password)
+        return await asyncio.to_thread(self._create_user, db, user, hashed)
+
+    def _ensure_available(self, db: Session, user) -> None:
         if self.user_repository.get_by_username(db, user.username):
             raise HTTPException(status_code=400, detail="Username already registered")
         if self.user_repository.get_by_email(db, user.email):
             raise HTTPException(status_code=400, detail="Email already registered")
 
-        hashed = hash_password(user.password)
+    def _create_user(self, db: Session, user, hashed: str):
         try:
             return self.user_repository.create_user(
                 db,
@@ -42,18 +54,34 @@ class UserService:
             db.rollback()
             raise HTTPException(status_code=503, detail="Database unavailable")
 
-    def login_user(self, db: Session, user):
-        db_user = self.user_repository.get_by_username(db, user.username)
+    async def login_user(self, db: Session, user):
+        db_user = await asyncio.to_thread(self.user_repository.get_by_username, db, user.username)
 
         if not db_user:
             raise HTTPException(status_code=400, detail="Invalid credentials")
 
-        if not verify_password(user.password, db_user.hashed_password):
+        valid, new_hash = await password_hasher.verify_and_update(user.password, db_user.hashed_password)
+        if not valid:
             raise HTTPException(status_code=400, detail="Invalid credentials")
 
-        token = create_access_token({"sub": db_user.username, "role": db_user.role})
+        # Claims lidos antes do commit do rehash, que expira os atributos do objeto.
+        claims = {"sub": db_user.username, "uid": db_user.id, "role": db_user.role}
+        if new_hash:
+            await asyncio.to_thread(self._rehash_password, db, db_user, new_hash)
+
+        token = create_access_token(claims)
         return {"access_token": token, "token_type": "bearer"}
 
+    def _rehash_password(self, db: Session, db_user, new_hash: str) -> None:
+        # Parametros do hash mudaram: regrava com a senha que acabou de ser validada.
+        user_id = db_user.id
+        try:
+            db_user.hashed_password = new_hash
+            db.commit()
+        except OperationalError:
+            db.rollback()
+            logger.warning("auth.rehash.failed", extra={"user_id": user_id})
+
 
 
 
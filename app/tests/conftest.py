@@ -18,6 +18,10 @@ if str(ROOT_DIR) not in sys.path:
 from app.database import Base, get_db
 from app.main import app
 from app.core import rate_limit
+from app.core.config import settings
+
+# Relay em thread usaria o SessionLocal do app; nos testes o outbox drena inline, na sessao do teste.
+settings.OUTBOX_RELAY_ENABLED = False
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 
@@ -3,10 +3,56 @@
 # Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
 # Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
 
-from app.external.anime_client import JikanAnimeClient
+import asyncio
+import threading
+import uuid
+from contextlib import contextmanager
+
+from sqlalchemy import MetaData, create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.external.anime_client import AsyncJikanAnimeClient, JikanAnimeClient
 from app import models
 from app.services.ai_service import AIService
-from app.tests.conftest import TestingSessionLocal
+from app.services.recommendation_engine import recommendation_engine
+from app.tests.conftest import TestingSessionLocal, engine
+
+
+@contextmanager
+def count_statements():
+    statements: list[str] = []
+
+    def before_cursor_execute(_conn, _cursor, statement, _parameters, _context, _executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def create_user_with_entries(db, entry_count: int) -> int:
+    unique = uuid.uuid4().hex[:8]
+    user = models.User(username=f"n1_{unique}", email=f"n1_{unique}@test.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    for index in range(entry_count):
+        anime = models.Anime(title=f"N+1 {unique} {index}", genre="Action, Drama", episodes=12)
+        db.add(anime)
+        db.flush()
+        db.add(
+            models.UserAnime(
+                user_id=user.id,
+                anime_id=anime.id,
+                status="watching",
+                score=7,
+                episodes_watched=1,
+            )
+        )
+    db.commit()
+    return user.id
 
 
 def create_user_and_token(client, suffix: str = "ai"):
@@ -165,5 +211,290 @@ def test_ai_import_catalog_range_service(monkeypatch):
         db.close()
 
 
+def test_ai_import_catalog_range_concurrent_reports_progress(monkeypatch):
+    calls: list[tuple[int, str, int]] = []
+
+    async def fake_season_page(_self, year: int, season: str, page: int = 1):
+        calls.append((year, season, page))
+        if season == "fall":
+            raise RuntimeError("upstream unavailable")
+        season_code = {"winter": 1, "spring": 2, "summer": 3}[season]
+        return {
+            "items": [
+                {
+                    "mal_id": 880000 + (year - 1990) * 100 + season_code * 10 + page,
+                    "title": f"Concurrent {season} {year} p{page}",
+                    "genre": "Action",
+                    "episodes": 12,
+                    "external_score": 7,
+                    "members": 500,
+                    "external_status": "Finished Airing",
+                }
+            ],
+            "last_page": 3,
+        }
+
+    monkeypatch.setattr(AsyncJikanAnimeClient, "fetch_season_page", fake_season_page)
+
+    db = TestingSessionLocal()
+    try:
+        result = AIService().import_catalog_range(
+            db=db,
+            start_year=1990,
+            end_year=1991,
+            seasons=["winter", "spring", "summer", "fall"],
+            pages_per_season=2,
+            concurrency=4,
+        )
+        assert result.concurrency == 4
+        assert result.inserted_or_updated == 12
+        assert len(calls) == 2 * 3 * 2 + 2
+        progress = {(entry.year, entry.season): entry for entry in result.season_progress}
+        assert progress[(1990, "winter")].status == "completed"
+        assert progress[(1990, "winter")].pages_fetched == 2
+        assert progress[(1991, "fall")].status == "failed"
+        assert progress[(1991, "fall")].error == "upstream unavailable"
+        assert db.query(models.Anime).filter(models.Anime.title.like("Concurrent %")).count() == 12
+    finally:
+        db.close()
+
+
+def test_ai_import_catalog_range_async_uses_shared_client_and_upserts_off_loop(monkeypatch):
+    shared_client = AsyncJikanAnimeClient()
+    clients: set[int] = set()
+    upsert_threads: set[int] = set()
+    original_upsert = AIService.upsert_catalog_items
+
+    async def fake_season_page(self, year: int, season: str, page: int = 1):
+        clients.add(id(self))
+        return {
+            "items": [
+                {
+                    "mal_id": 890000 + (year - 1980) * 10 + page,
+                    "title": f"Shared {season} {year} p{page}",
+                    "genre": "Drama",
+                    "episodes": 12,
+                    "external_score": 7,
+                    "members": 500,
+                    "external_status": "Finished Airing",
+                }
+            ],
+            "last_page": 2,
+        }
+
+    def recording_upsert(self, db, items):
+        upsert_threads.add(threading.get_ident())
+        return original_upsert(self, db, items)
+
+    monkeypatch.setattr(AsyncJikanAnimeClient, "fetch_season_page", fake_season_page)
+    monkeypatch.setattr(AIService, "upsert_catalog_items", recording_upsert)
+
+    async def run_import():
+        result = await AIService(async_client=shared_client).import_catalog_range_async(
+            db=db,
+            start_year=1980,
+            end_year=1981,
+            seasons=["winter"],
+            pages_per_season=2,
+            concurrency=4,
+        )
+        return result, threading.get_ident()
+
+    db = TestingSessionLocal()
+    try:
+        result, loop_thread = asyncio.run(run_import())
+        assert result.inserted_or_updated == 4
+        assert clients == {id(shared_client)}
+        assert upsert_threads and loop_thread not in upsert_threads
+    finally:
+        db.close()
+        asyncio.run(shared_client.aclose())
+
+
+def test_catalog_import_job_checkpoints_and_resumes_failed_segments(client, monkeypatch):
+    calls: list[tuple[int, str, int]] = []
+    state = {"spring_down": True}
+
+    def fake_season_page(_self, year: int, season: str, page: int = 1):
+        calls.append((year, season, page))
+        if season == "spring" and state["spring_down"]:
+            raise RuntimeError("upstream timeout")
+        return {
+            "items": [
+                {
+                    "mal_id": 770000 + (10 if season == "winter" else 20) + page,
+                    "title": f"Job {season} {year} p{page}",
+                    "genre": "Drama",
+                    "episodes": 10,
+                    "external_score": 7,
+                    "members": 300,
+                }
+            ],
+            "last_page": 2,
+        }
+
+    monkeypatch.setattr(JikanAnimeClient, "fetch_season_page", fake_season_page)
+
+    user_id, headers = create_user_and_token(client, "job")
+    db = TestingSessionLocal()
+    try:
+        db.query(models.User).filter(models.User.id == user_id).first().role = "admin"
+        db.commit()
+    finally:
+        db.close()
+
+    params = {"start_year": 1995, "end_year": 1995, "seasons": ["winter", "spring"], "pages_per_season": 2}
+    created = client.post("/ai/import-jobs", params=params, headers=headers)
+    assert created.status_code == 202
+    job_id = created.json()["id"]
+
+    polled = client.get(f"/ai/import-jobs/{job_id}", headers=headers).json()
+    assert polled["status"] == "partial"
+    assert polled["segments_completed"] == 2
+    assert polled["segments_failed"] == 1
+    assert polled["failed_segments"][0]["season"] == "spring"
+    assert polled["inserted_or_updated"] == 2
+
+    calls.clear()
+    state["spring_down"] = False
+    resumed = client.post(f"/ai/import-jobs/{job_id}/resume", headers=headers)
+    assert resumed.status_code == 202
+
+    finished = client.get(f"/ai/import-jobs/{job_id}", headers=headers).json()
+    assert calls == [(1995, "spring", 1), (1995, "spring", 2)]
+    assert finished["status"] == "completed"
+    assert finished["segments_completed"] == 4
+    assert finished["inserted_or_updated"] == 4
+
+    assert client.post(f"/ai/import-jobs/{job_id}/resume", headers=headers).status_code == 409
+
+
+def test_vectorized_recommendation_scores_match_scalar_formula():
+    db = TestingSessionLocal()
+    try:
+        service = AIService()
+        preferred_genres = {"action": 3.0, "fantasy": 1.5, "sci-fi": 0.6}
+        excluded = {db.query(models.Anime.id).order_by(models.Anime.id.asc()).first()[0]}
+
+        matrix = recommendation_engine.get_matrix(db)
+        ranked = matrix.top_k(preferred_genres, excluded, limit=10)
+
+        expected = sorted(
+            (
+                (anime.id, *service._score_anime(anime, preferred_genres))
+                for anime in db.query(models.Anime).filter(models.Anime.id.notin_(excluded)).all()
+            ),
+            key=lambda row: (-row[1], row[0]),
+        )[:10]
+        assert [row[0] for row in ranked] == [row[0] for row in expected]
+        for (_, score, reason), (_, expected_score, expected_reason) in zip(ranked, expected):
+            assert abs(score - expected_score) < 1e-5
+            assert reason == expected_reason
+    finally:
+        db.close()
+
+
+def test_profile_and_auto_status_query_count_is_constant():
+    db = TestingSessionLocal()
+    try:
+        small_user_id = create_user_with_entries(db, 3)
+        large_user_id = create_user_with_entries(db, 40)
+        service = AIService()
+        # Aquece a matriz do catalogo para as duas medicoes verem o mesmo estado.
+        service.recommend_for_user(db, small_user_id, limit=5)
+
+        with count_statements() as small_recommend:
+            service.recommend_for_user(db, small_user_id, limit=5)
+        with count_statements() as large_recommend:
+            service.recommend_for_user(db, large_user_id, limit=5)
+        assert len(small_recommend) == len(large_recommend)
+
+        with count_statements() as small_auto_status:
+            service.auto_update_statuses(db, small_user_id)
+        with count_statements() as large_auto_status:
+            service.auto_update_statuses(db, large_user_id)
+        assert len(small_auto_status) == len(large_auto_status) == 1
+    finally:
+        db.close()
+
+
+def test_auto_update_statuses_all_users_set_based():
+    db = TestingSessionLocal()
+    try:
+        unique = uuid.uuid4().hex[:8]
+        users = [
+            models.User(username=f"bulk_{unique}_{index}", email=f"bulk_{unique}_{index}@test.com", hashed_password="x")
+            for index in range(2)
+        ]
+        short = models.Anime(title=f"Bulk Short {unique}", genre="Action", episodes=12)
+        long = models.Anime(title=f"Bulk Long {unique}", genre="Drama", episodes=24)
+        unknown = models.Anime(title=f"Bulk Unknown {unique}", genre="Drama", episodes=None)
+        db.add_all([*users, short, long, unknown])
+        db.flush()
+        entries = {
+            "planned_done": models.UserAnime(user_id=users[0].id, anime_id=short.id, status="planned", episodes_watched=12),
+            "watching_partial": models.UserAnime(user_id=users[0].id, anime_id=long.id, status="watching", episodes_watched=5),
+            "on_hold_started": models.UserAnime(user_id=users[1].id, anime_id=long.id, status="on_hold", episodes_watched=3),
+            "dropped_done": models.UserAnime(user_id=users[1].id, anime_id=short.id, status="dropped", episodes_watched=12),
+            "planned_unknown": models.UserAnime(user_id=users[1].id, anime_id=unknown.id, status="planned", episodes_watched=2),
+        }
+        db.add_all(entries.values())
+        db.commit()
+        entry_ids = {name: entry.id for name, entry in entries.items()}
+
+        result = AIService().auto_update_statuses_all_users(db, chunk_size=2)
+        assert result.completed_count >= 2
+        assert result.watching_count >= 2
+        assert result.updated_count == result.completed_count + result.watching_count
+        assert f"Bulk Short {unique}: planned -> completed" in result.details
+        assert f"Bulk Unknown {unique}: planned -> watching" in result.details
+
+        db.expire_all()
+        statuses = {
+            name: db.query(models.UserAnime.status).filter(models.UserAnime.id == entry_id).scalar()
+            for name, entry_id in entry_ids.items()
+        }
+        assert statuses == {
+            "planned_done": "completed",
+            "watching_partial": "watching",
+            "on_hold_started": "watching",
+            "dropped_done": "completed",
+            "planned_unknown": "watching",
+        }
+
+        assert AIService().auto_update_statuses_all_users(db).updated_count == 0
+    finally:
+        db.close()
+
+
+def test_auto_update_statuses_all_users_completes_legacy_null_status():
+    # Base legada: user_animes.status ainda sem NOT NULL.
+    legacy_metadata = MetaData()
+    for table in models.Base.metadata.sorted_tables:
+        table.to_metadata(legacy_metadata)
+    legacy_metadata.tables["user_animes"].c.status.nullable = True
+    legacy_engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    legacy_metadata.create_all(legacy_engine)
+
+    db = sessionmaker(bind=legacy_engine)()
+    try:
+        user = models.User(username="legacy_null", email="legacy_null@test.com", hashed_password="x")
+        anime = models.Anime(title="Legacy Null", genre="Drama", episodes=12)
+        db.add_all([user, anime])
+        db.flush()
+        done = models.UserAnime(user_id=user.id, anime_id=anime.id, status=None, episodes_watched=12)
+        db.add(done)
+        db.commit()
+
+        result = AIService().auto_update_statuses_all_users(db)
+        assert result.completed_count == 1
+        assert result.details == ["Legacy Null: None -> completed"]
+        db.expire_all()
+        assert db.get(models.UserAnime, done.id).status == AIService._infer_status(12, 12, None) == "completed"
+    finally:
+        db.close()
+        legacy_engine.dispose()
+
+
 
 
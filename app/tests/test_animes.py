@@ -3,6 +3,15 @@
 # Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
 # Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
 
+import csv
+import io
+import json
+import uuid
+
+from app import models
+from app.tests import conftest as test_setup
+
+
 def get_token(client):
     client.post(
         "/auth/register",
@@ -42,5 +51,85 @@ def test_create_anime_authenticated(client):
     assert response.json()["title"] == "Naruto"
 
 
+def test_read_animes_keyset_pagination_filters_and_sparse_fields(client):
+    token = get_token(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    genre = f"Paged-{uuid.uuid4().hex[:8]}"
+    created_ids = []
+    for index in range(5):
+        response = client.post(
+            "/animes",
+            json={"title": f"Paged {index}", "genre": genre, "episodes": 10 + index},
+            headers=headers,
+        )
+        created_ids.append(response.json()["id"])
+
+    first_page = client.get(f"/animes?genre={genre}&limit=2&fields=title", headers=headers)
+    assert first_page.status_code == 200
+    assert [item["id"] for item in first_page.json()] == created_ids[:2]
+    assert set(first_page.json()[0].keys()) == {"id", "title"}
+    cursor = first_page.headers["X-Next-Cursor"]
+
+    second_page = client.get(f"/animes?genre={genre}&limit=2&fields=title&cursor={cursor}", headers=headers)
+    assert [item["id"] for item in second_page.json()] == created_ids[2:4]
+
+    last_page = client.get(
+        f"/animes?genre={genre}&limit=2&cursor={second_page.headers['X-Next-Cursor']}",
+        headers=headers,
+    )
+    assert [item["id"] for item in last_page.json()] == created_ids[4:]
+    assert "X-Next-Cursor" not in last_page.headers
+    assert "synopsis" in last_page.json()[0]
+
+    descending = client.get(f"/animes?genre={genre}&sort=title&order=desc&limit=10", headers=headers)
+    assert [item["title"] for item in descending.json()] == [f"Paged {index}" for index in range(4, -1, -1)]
+
+    # Curingas do LIKE no filtro sao literais: "Paged_%" nao casa "Paged-xxxx".
+    wildcard = client.get("/animes?genre=Paged_%25&limit=10", headers=headers)
+    assert wildcard.status_code == 200
+    assert wildcard.json() == []
+
+    mismatched = client.get(f"/animes?genre={genre}&sort=title&cursor={cursor}", headers=headers)
+    assert mismatched.status_code == 400
+
+    unknown_field = client.get("/animes?fields=title,password", headers=headers)
+    assert unknown_field.status_code == 400
+
+
+def test_export_animes_streams_ndjson_and_csv_for_admin(client):
+    username = f"export_{uuid.uuid4().hex[:8]}"
+    register_response = client.post(
+        "/auth/register",
+        json={"username": username, "email": f"{username}@test.com", "password": "abc123"},
+    )
+    user_id = register_response.json()["id"]
+    token = client.post("/auth/login", json={"username": username, "password": "abc123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    forbidden = client.get("/animes/export", headers=headers)
+    assert forbidden.status_code == 403
+
+    db = test_setup.TestingSessionLocal()
+    try:
+        db.query(models.User).filter(models.User.id == user_id).first().role = "admin"
+        db.commit()
+        total = db.query(models.Anime).count()
+    finally:
+        db.close()
+
+    ndjson_response = client.get("/animes/export?fields=title,genre&batch_size=100", headers=headers)
+    assert ndjson_response.status_code == 200
+    assert ndjson_response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in ndjson_response.text.splitlines()]
+    assert len(rows) == total
+    assert set(rows[0].keys()) == {"id", "title", "genre"}
+
+    csv_response = client.get("/animes/export?format=csv", headers=headers)
+    assert csv_response.status_code == 200
+    csv_rows = list(csv.reader(io.StringIO(csv_response.text)))
+    assert csv_rows[0][:2] == ["id", "title"]
+    assert len(csv_rows) == total + 1
+
+
 
 
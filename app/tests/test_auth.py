@@ -3,6 +3,18 @@
 # Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
 # Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
 
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from app import models
+from app.core.password_hashing import PasswordHasher
+from app.core.security import pwd_context
+from app.tests.conftest import TestingSessionLocal
+
+
 def test_register_user(client):
     response = client.post(
         "/auth/register",
@@ -28,4 +40,58 @@ def test_login_user(client):
     assert "access_token" in response.json()
 
 
+def test_login_rehashes_passwords_stored_with_old_parameters(client):
+    weak_context = CryptContext(schemes=["pbkdf2_sha256"], pbkdf2_sha256__default_rounds=1000)
+    db = TestingSessionLocal()
+    try:
+        db.add(
+            models.User(
+                username="legacy_hash",
+                email="legacy_hash@test.com",
+                hashed_password=weak_context.hash("legacy123"),
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    response = client.post("/auth/login", json={"username": "legacy_hash", "password": "legacy123"})
+    assert response.status_code == 200
+
+    db = TestingSessionLocal()
+    try:
+        stored = db.query(models.User).filter(models.User.username == "legacy_hash").first().hashed_password
+    finally:
+        db.close()
+    assert stored.startswith("$pbkdf2-sha256$")
+    assert not pwd_context.needs_update(stored)
+    assert pwd_context.verify("legacy123", stored)
+
+    # Hash ja atualizado: login seguinte nao regrava.
+    assert client.post("/auth/login", json={"username": "legacy_hash", "password": "legacy123"}).status_code == 200
+    db = TestingSessionLocal()
+    try:
+        assert db.query(models.User).filter(models.User.username == "legacy_hash").first().hashed_password == stored
+    finally:
+        db.close()
+
+
+def test_password_hasher_rejects_work_beyond_pending_cap():
+    hasher = PasswordHasher(max_workers=1, max_pending=0)
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(hasher.hash("secret"))
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers["Retry-After"] == "1"
+
+    hasher = PasswordHasher(max_workers=2, max_pending=4)
+    try:
+        hashed = asyncio.run(hasher.hash("secret"))
+        assert asyncio.run(hasher.verify_and_update("secret", hashed)) == (True, None)
+        assert hasher.pending == 0
+    finally:
+        hasher.shutdown()
+
+
+
+
 
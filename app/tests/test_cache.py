@@ -0,0 +1,236 @@
+﻿# Arquivo: backend/backend\app\tests\test_cache.py
+# Camada: Module
+# Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
+# Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
+
+import json
+import threading
+import time
+from datetime import date, datetime, timezone
+
+from prometheus_client import REGISTRY
+
+from app.core import cache as cache_module
+from app.core.cache import CacheStore, _LocalTier, cache_store
+from app.core.cache_codecs import CacheSerializer, available_codecs
+
+
+def cache_metric(tier: str, result: str) -> float:
+    return REGISTRY.get_sample_value("anime_manager_cache_requests_total", {"tier": tier, "result": result}) or 0.0
+
+
+def test_local_tier_evicts_least_recently_used_and_expired_entries():
+    tier = _LocalTier(max_entries=2)
+    tier.set("a", 1, ttl_seconds=60)
+    tier.set("b", 2, ttl_seconds=60)
+    assert tier.get("a") == 1
+    tier.set("c", 3, ttl_seconds=60)
+
+    assert tier.get("b") is None
+    assert tier.get("a") == 1
+    assert tier.get("c") == 3
+
+    tier.set("expired", 4, ttl_seconds=-1)
+    assert tier.get("expired") is None
+
+
+def test_cache_store_counts_tier_hits_and_applies_remote_invalidations():
+    store = CacheStore()
+    hits_before = cache_metric("l1", "hit")
+    misses_before = cache_metric("l1", "miss")
+
+    store.set("stats:user:1", {"total": 3}, ttl_seconds=60)
+    store.set("stats:user:2", {"total": 5}, ttl_seconds=60)
+    store.set("stats:global", {"animes": 9}, ttl_seconds=60)
+    assert store.get("stats:user:1") == {"total": 3}
+    assert store.get("missing") is None
+    assert cache_metric("l1", "hit") == hits_before + 1
+    assert cache_metric("l1", "miss") == misses_before + 1
+
+    # Mensagem do proprio worker e ignorada; de outro worker derruba o L1 local.
+    own = json.dumps({"origin": store._instance_id, "kind": "key", "target": "stats:global"})
+    store._handle_invalidation(own.encode("utf-8"))
+    assert store.get("stats:global") == {"animes": 9}
+
+    remote_key = json.dumps({"origin": "other-worker", "kind": "key", "target": "stats:global"})
+    remote_prefix = json.dumps({"origin": "other-worker", "kind": "prefix", "target": "stats:user:"})
+    store._handle_invalidation(remote_key.encode("utf-8"))
+    store._handle_invalidation(remote_prefix.encode("utf-8"))
+    assert store.get("stats:global") is None
+    assert store.get("stats:user:1") is None
+    assert store.get("stats:user:2") is None
+
+
+def test_local_tier_enforces_byte_cap_and_sweeps_expired_entries():
+    tier = _LocalTier(max_entries=100, max_bytes=250)
+    for index in range(5):
+        tier.set(f"stats:user:{index}", {"payload": "x" * 40}, ttl_seconds=60)
+    assert tier.size_bytes <= 250
+    assert tier.get("stats:user:0") is None
+    assert tier.get("stats:user:4") is not None
+
+    tier.set("huge", "y" * 500, ttl_seconds=60)
+    assert tier.get("huge") is None
+    assert tier.get("stats:user:4") is not None
+
+    # replace (CAS do mark_dirty) que aumenta o valor tambem respeita o teto de bytes.
+    current = tier.get("stats:user:4")
+    assert tier.replace("stats:user:4", current, {"payload": "z" * 200}, ttl_seconds=60) is True
+    assert tier.size_bytes <= 250
+    assert tier.get("stats:user:3") is None
+    assert tier.get("stats:user:4") == {"payload": "z" * 200}
+
+    bytes_before = tier.size_bytes
+    tier.set("short-lived", 1, ttl_seconds=-1)
+    assert tier.sweep() == 1
+    assert tier.size_bytes == bytes_before
+
+
+def test_cache_gauges_track_entries_and_bytes():
+    cache_store.set("gauge:probe", {"value": 1}, ttl_seconds=60)
+    assert REGISTRY.get_sample_value("anime_manager_cache_entries") == cache_store.stats()["entries"]
+    assert REGISTRY.get_sample_value("anime_manager_cache_bytes") == cache_store.stats()["bytes"] > 0
+    cache_store.invalidate("gauge:probe")
+
+
+def test_namespace_invalidation_bumps_version_instead_of_scanning_keys():
+    store = CacheStore()
+    first_key = store.namespace_key("stats:user", 7)
+    store.set(first_key, {"total": 1}, ttl_seconds=60)
+    store.set("stats:global", {"animes": 2}, ttl_seconds=60)
+
+    store.invalidate_namespace("stats:user")
+
+    second_key = store.namespace_key("stats:user", 7)
+    assert second_key != first_key
+    assert store.get(second_key) is None
+    assert store.get(first_key) is None
+    assert store.get("stats:global") == {"animes": 2}
+
+
+def test_get_or_compute_coalesces_concurrent_misses():
+    store = CacheStore()
+    calls = {"count": 0}
+
+    def slow_compute():
+        calls["count"] += 1
+        time.sleep(0.1)
+        return {"animes": 42}
+
+    results = []
+    workers = [
+        threading.Thread(target=lambda: results.append(store.get_or_compute("stats:global", slow_compute, ttl_seconds=60)))
+        for _ in range(8)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert calls["count"] == 1
+    assert results == [{"animes": 42}] * 8
+    assert store.get("stats:global") == {"animes": 42}
+
+
+def test_get_or_compute_serves_stale_while_single_caller_revalidates():
+    store = CacheStore()
+    store.get_or_compute("external:jikan:top:10", lambda: ["old"], ttl_seconds=0, stale_seconds=60)
+
+    def slow_refresh():
+        time.sleep(0.2)
+        return ["new"]
+
+    refreshed = []
+    refresher = threading.Thread(
+        target=lambda: refreshed.append(
+            store.get_or_compute("external:jikan:top:10", slow_refresh, ttl_seconds=60, stale_seconds=60)
+        )
+    )
+    refresher.start()
+    time.sleep(0.05)
+
+    # Enquanto o dono do lock recalcula, os demais recebem o valor vencido sem esperar.
+    started = time.perf_counter()
+    assert store.get_or_compute("external:jikan:top:10", slow_refresh, ttl_seconds=60) == ["old"]
+    assert time.perf_counter() - started < 0.1
+
+    refresher.join()
+    assert refreshed == [["new"]]
+    assert store.get_or_compute("external:jikan:top:10", slow_refresh, ttl_seconds=60) == ["new"]
+
+
+def test_cache_serializer_round_trips_datetimes_and_compresses_large_values():
+    value = {
+        "items": [
+            {"mal_id": index, "title": f"Anime {index}", "aired_from": datetime(2024, 1, index + 1, tzinfo=timezone.utc)}
+            for index in range(20)
+        ],
+        "generated_on": date(2024, 2, 1),
+    }
+    for codec_name in available_codecs():
+        serializer = CacheSerializer(codec=codec_name, compression="zstd", compression_threshold=256)
+        payload = serializer.dumps(value)
+        assert payload[1] != 0
+        assert serializer.loads(payload) == value
+
+        small = serializer.dumps({"total": 1})
+        assert small[1] == 0
+        assert serializer.loads(small) == {"total": 1}
+
+    # Chaves int: json/orjson devolvem str (como a stdlib), msgpack preserva o tipo.
+    score_counts = {"score_counts": {10: 3, 7: 1}}
+    for codec_name in available_codecs():
+        serializer = CacheSerializer(codec=codec_name, compression="zstd", compression_threshold=256)
+        expected = score_counts if codec_name == "msgpack" else {"score_counts": {"10": 3, "7": 1}}
+        assert serializer.loads(serializer.dumps(score_counts)) == expected
+
+    # Valores gravados antes dos codecs (json puro, sem cabecalho) continuam legiveis.
+    assert CacheSerializer().loads(json.dumps({"legacy": True}).encode("utf-8")) == {"legacy": True}
+
+
+def test_mark_dirty_debounces_recomputation_of_hot_keys():
+    store = CacheStore()
+    calls = {"count": 0}
+
+    def compute():
+        calls["count"] += 1
+        return {"version": calls["count"]}
+
+    assert store.get_or_compute("stats:global", compute, ttl_seconds=120, stale_seconds=60) == {"version": 1}
+    assert store.mark_dirty("stats:global", refresh_within=0.2, stale_seconds=60) is True
+    # Escritas seguintes dentro da janela nao regravam nem reagendam.
+    assert store.mark_dirty("stats:global", refresh_within=0.2, stale_seconds=60) is False
+    assert store.get_or_compute("stats:global", compute, ttl_seconds=120, beta=0) == {"version": 1}
+
+    time.sleep(0.25)
+    assert store.get_or_compute("stats:global", compute, ttl_seconds=120, beta=0) == {"version": 2}
+    assert calls["count"] == 2
+    assert store.mark_dirty("missing", refresh_within=0.2) is False
+
+    # mark_dirty que leu o envelope antes de uma gravacao concorrente nao regrava o valor antigo.
+    stale_envelope = store._get_envelope("stats:global")
+    store.set("stats:global", {**stale_envelope, "value": {"version": 3}}, ttl_seconds=120)
+    assert store._local.replace("stats:global", stale_envelope, {**stale_envelope, "soft_expires_at": 0}, 60) is False
+    assert store.get("stats:global") == {"version": 3}
+
+
+def test_local_tier_sizes_values_without_serializing_them(monkeypatch):
+    def fail_dumps(*_args, **_kwargs):
+        raise AssertionError("json.dumps on the L1 set path")
+
+    value = {"items": [{"anime_id": index, "title": f"Anime {index}", "value": 8.5} for index in range(200)]}
+    expected = len(json.dumps(value, separators=(",", ":")))
+    monkeypatch.setattr(cache_module.json, "dumps", fail_dumps)
+
+    tier = _LocalTier(max_entries=10)
+    tier.set("stats:global", value, ttl_seconds=60)
+    assert 0.5 * expected < tier.size_bytes < 1.5 * expected
+
+    # Bytes ja codificados para o L2 sao reaproveitados como tamanho.
+    tier.set("stats:global", value, ttl_seconds=60, encoded=b"x" * 100)
+    assert tier.size_bytes == len("stats:global") + 100
+
+
+
+
+
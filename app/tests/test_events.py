@@ -0,0 +1,231 @@
+﻿# Arquivo: backend/backend\app\tests\test_events.py
+# Camada: Module
+# Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
+# Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
+
+import json
+import threading
+import time
+from collections import defaultdict
+
+from app import models
+from app.core.config import settings
+from app.events.bus import EventBus, event_bus
+from app.events.outbox import OutboxRelay, enqueue_event, outbox_relay
+from app.services.timeline_service import TimelineService
+from app.tests.conftest import TestingSessionLocal
+from app.tests.test_social import create_user_and_token
+
+
+def test_event_bus_hands_batches_to_batch_handlers_and_payloads_to_the_rest():
+    bus = EventBus()
+    batches: list[list[dict]] = []
+    singles: list[dict] = []
+    bus.subscribe_batch("activity.created", batches.append)
+    bus.subscribe("activity.created", singles.append)
+
+    bus.dispatch("activity.created", [{"n": 1}, {"n": 2}])
+    bus.publish("activity.created", {"n": 3})
+    bus.dispatch("unknown.event", [{"n": 4}])
+
+    assert batches == [[{"n": 1}, {"n": 2}], [{"n": 3}]]
+    assert singles == [{"n": 1}, {"n": 2}, {"n": 3}]
+
+
+def test_outbox_keeps_events_until_relay_publishes_them(client, monkeypatch):
+    user_id, headers = create_user_and_token(client, "outbox")
+    anime_id = client.post(
+        "/animes",
+        json={"title": "Odd Taxi", "genre": "Mystery", "episodes": 13},
+        headers=headers,
+    ).json()["id"]
+
+    # Relay "fora do ar": a review e o evento sao commitados juntos, a atividade ainda nao existe.
+    monkeypatch.setattr(outbox_relay, "notify", lambda db: None)
+    review = client.post(
+        "/social/reviews",
+        json={"user_id": user_id, "anime_id": anime_id, "score": 8, "content": "Sharp writing."},
+        headers=headers,
+    ).json()
+
+    def review_activities(db):
+        return (
+            db.query(models.Activity)
+            .filter(
+                models.Activity.user_id == user_id,
+                models.Activity.target_type == "review",
+                models.Activity.target_id == review["id"],
+            )
+            .count()
+        )
+
+    db = TestingSessionLocal()
+    try:
+        pending = db.query(models.OutboxEvent).filter(models.OutboxEvent.published_at.is_(None)).all()
+        assert any(json.loads(event.payload)["target_id"] == review["id"] for event in pending)
+        assert review_activities(db) == 0
+
+        # Handler falhando: nada se perde, a tentativa e registrada e o evento volta no proximo drain.
+        def failing_fan_out(self, db, activity):
+            raise RuntimeError("handler down")
+
+        relay = OutboxRelay(session_factory=TestingSessionLocal)
+        with monkeypatch.context() as patch:
+            patch.setattr(TimelineService, "fan_out", failing_fan_out)
+            assert relay.drain(db) == 0
+        failed = db.query(models.OutboxEvent).filter(models.OutboxEvent.published_at.is_(None)).all()
+        assert failed and all(event.attempts == 1 and "handler down" in event.last_error for event in failed)
+        failed_ids = [event.id for event in failed]
+
+        assert relay.drain(db) >= 1
+        assert review_activities(db) == 1
+        assert db.query(models.OutboxEvent).filter(models.OutboxEvent.published_at.is_(None)).count() == 0
+        # Uma tentativa falha + uma entrega: exatamente duas, nada contado em dobro.
+        db.expire_all()
+        delivered = db.query(models.OutboxEvent).filter(models.OutboxEvent.id.in_(failed_ids)).all()
+        assert [event.attempts for event in delivered] == [2] * len(failed_ids)
+    finally:
+        db.close()
+
+
+def test_concurrent_relays_publish_each_outbox_event_once(monkeypatch):
+    delivered: dict[str, list[int]] = defaultdict(list)
+
+    def record(event_name):
+        return lambda payloads: delivered[event_name].extend(payload["n"] for payload in payloads)
+
+    monkeypatch.setattr(event_bus, "_batch_handlers", defaultdict(list))
+    monkeypatch.setattr(event_bus, "_handlers", defaultdict(list))
+    event_bus.subscribe_batch("test.first", record("test.first"))
+    event_bus.subscribe_batch("test.second", record("test.second"))
+
+    db = TestingSessionLocal()
+    other_db = TestingSessionLocal()
+    try:
+        for index in range(3):
+            enqueue_event(db, "test.first", {"n": index})
+            enqueue_event(db, "test.second", {"n": index})
+        db.commit()
+
+        first_relay = OutboxRelay(session_factory=TestingSessionLocal)
+        second_relay = OutboxRelay(session_factory=TestingSessionLocal)
+        original_publish = OutboxRelay._publish
+        interleaved = {"done": False}
+
+        def publish_then_let_other_relay_drain(self, session, event_name, rows, record_failure):
+            result = original_publish(self, session, event_name, rows, record_failure)
+            # Entre o commit do primeiro grupo e o proximo, outro relay drena o mesmo lote.
+            if self is first_relay and not interleaved["done"]:
+                interleaved["done"] = True
+                second_relay.drain(other_db)
+            return result
+
+        monkeypatch.setattr(OutboxRelay, "_publish", publish_then_let_other_relay_drain)
+        first_relay.drain(db)
+    finally:
+        db.close()
+        other_db.close()
+
+    assert interleaved["done"]
+    assert sorted(delivered["test.first"]) == [0, 1, 2]
+    assert sorted(delivered["test.second"]) == [0, 1, 2]
+
+
+def test_outbox_claim_is_compare_and_set_between_relays():
+    db = TestingSessionLocal()
+    other_db = TestingSessionLocal()
+    try:
+        events = [enqueue_event(db, "test.claim", {"n": index}) for index in range(3)]
+        db.commit()
+        row_ids = [event.id for event in events]
+
+        first_relay = OutboxRelay(session_factory=TestingSessionLocal)
+        second_relay = OutboxRelay(session_factory=TestingSessionLocal)
+        # Os dois leram o mesmo grupo como pendente; so o primeiro UPDATE leva as linhas.
+        assert [row.id for row in first_relay._claim(db, row_ids)] == row_ids
+        assert second_relay._claim(other_db, row_ids) == []
+
+        # Lease vencida (relay que morreu no meio da entrega) volta a ser reivindicavel.
+        db.query(models.OutboxEvent).filter(models.OutboxEvent.id.in_(row_ids)).update(
+            {models.OutboxEvent.claimed_until: models.OutboxEvent.created_at}, synchronize_session=False
+        )
+        db.commit()
+        assert [row.id for row in second_relay._claim(other_db, row_ids)] == row_ids
+        db.query(models.OutboxEvent).filter(models.OutboxEvent.id.in_(row_ids)).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+        other_db.close()
+
+
+def test_threaded_relay_persists_activities_and_flushes_on_stop(client, monkeypatch):
+    user_id, _ = create_user_and_token(client, "relay_thread")
+    monkeypatch.setattr(settings, "OUTBOX_POLL_INTERVAL_SECONDS", 0.05)
+    relay = OutboxRelay(session_factory=TestingSessionLocal)
+
+    def enqueue_activities(target_ids):
+        db = TestingSessionLocal()
+        try:
+            for target_id in target_ids:
+                enqueue_event(
+                    db,
+                    "activity.created",
+                    {
+                        "user_id": user_id,
+                        "activity_type": "review_created",
+                        "target_type": "relay_probe",
+                        "target_id": target_id,
+                        "message": "Relayed",
+                    },
+                )
+            db.commit()
+            relay.notify(db)
+        finally:
+            db.close()
+
+    def relayed_activities():
+        db = TestingSessionLocal()
+        try:
+            return (
+                db.query(models.Activity)
+                .filter(models.Activity.user_id == user_id, models.Activity.target_type == "relay_probe")
+                .count()
+            )
+        finally:
+            db.close()
+
+    relay.start()
+    try:
+        assert relay.is_running
+        enqueue_activities([1, 2, 3])
+        deadline = time.monotonic() + 5
+        while relayed_activities() < 3 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert relayed_activities() == 3
+
+        # Worker parado de drenar: o que ficar pendente so sai na drenagem final do stop().
+        original_drain_all = relay._drain_all
+
+        def drain_outside_worker():
+            if threading.current_thread().name != "outbox-relay":
+                original_drain_all()
+
+        monkeypatch.setattr(relay, "_drain_all", drain_outside_worker)
+        enqueue_activities([4, 5])
+        time.sleep(0.15)
+        assert relayed_activities() == 3
+    finally:
+        relay.stop()
+
+    assert not relay.is_running
+    assert relayed_activities() == 5
+    db = TestingSessionLocal()
+    try:
+        assert db.query(models.OutboxEvent).filter(models.OutboxEvent.published_at.is_(None)).count() == 0
+    finally:
+        db.close()
+
+
+
+
+
@@ -3,9 +3,12 @@
 # Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
 # Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
 
+import asyncio
+
 import httpx
 
-from app.external.anime_client import JikanAnimeClient
+from app.external.anime_client import AsyncJikanAnimeClient, JikanAnimeClient
+from app.external.rate_governor import RateGovernor, RedisRateGovernor, TokenBucket
 
 
 class DummyResponse:
@@ -55,5 +58,84 @@ def test_jikan_client_retries_on_429(monkeypatch):
     assert calls["count"] == 2
 
 
+def test_async_jikan_client_retries_and_reuses_pool(monkeypatch):
+    calls = {"count": 0, "clients": set()}
+
+    async def fake_get(self, url):
+        calls["count"] += 1
+        calls["clients"].add(id(self))
+        if calls["count"] == 1:
+            return DummyResponse(503, headers={"Retry-After": "0"})
+        mal_id = int(url.rsplit("/", 2)[-2])
+        return DummyResponse(200, payload={"data": {"mal_id": mal_id, "title": f"Async {mal_id}"}})
+
+    monkeypatch.setattr(httpx.AsyncClient, "get", fake_get)
+
+    async def run():
+        async with AsyncJikanAnimeClient() as client:
+            return await asyncio.gather(client.fetch_anime(9101), client.fetch_anime(9102))
+
+    first, second = asyncio.run(run())
+    assert first["title"] == "Async 9101"
+    assert second["title"] == "Async 9102"
+    assert calls["count"] == 3
+    assert len(calls["clients"]) == 1
+
+
+def test_rate_governor_never_exceeds_jikan_windows():
+    clock = {"now": 0.0}
+
+    def fake_sleep(seconds):
+        clock["now"] += seconds
+
+    governor = RateGovernor(
+        [TokenBucket.for_limit(3, 1.0, burst=1), TokenBucket.for_limit(60, 60.0, burst=1)],
+        clock=lambda: clock["now"],
+        sleep=fake_sleep,
+    )
+    sent = []
+    for _ in range(150):
+        governor.acquire()
+        sent.append(clock["now"])
+
+    # Nenhuma janela deslizante de 1s/60s passa do limite, e a taxa sustentada fica proxima de 60/min.
+    assert all(sum(1 for t in sent if start <= t < start + 1.0) <= 3 for start in sent)
+    assert all(sum(1 for t in sent if start <= t < start + 60.0) <= 60 for start in sent)
+    assert sent[-1] < 160.0
+
+    governor.pause(5.0)
+    before = clock["now"]
+    governor.acquire()
+    assert clock["now"] >= before + 5.0
+
+
+def test_redis_rate_governor_shares_retry_after_pause_with_other_workers():
+    calls = []
+
+    class RecordingClient:
+        def register_script(self, script):
+            def run(keys, args):
+                calls.append((script, keys, args))
+                # Outro worker ja registrou um 429: o script de acquire devolve a pausa.
+                return 2_000_000 if "PTTL" in script and "HMGET" in script else 0
+
+            return run
+
+    governor = RedisRateGovernor(
+        RecordingClient(),
+        "ratelimit:jikan",
+        [TokenBucket.for_limit(3, 1.0, burst=1)],
+        clock=lambda: 0.0,
+    )
+    assert governor.try_acquire() == 2.0
+    assert calls[-1][1] == ["ratelimit:jikan:paused_until", "ratelimit:jikan:0"]
+
+    governor.pause(1.5)
+    pause_script, keys, args = calls[-1]
+    assert "HMGET" not in pause_script
+    assert keys == ["ratelimit:jikan:paused_until"] and args == [1500]
+
+
+
 
 
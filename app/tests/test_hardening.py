@@ -3,6 +3,7 @@
 # Objetivo: Define responsabilidades deste modulo e sua funcao no sistema.
 # Dependencias: FastAPI/SQLAlchemy/Pydantic e utilitarios internos conforme necessario.
 
+import time
 import uuid
 
 import jwt
@@ -49,6 +50,56 @@ def test_auth_rate_limit_returns_429(client):
 
     blocked = client.post("/auth/login", json={"username": username, "password": password})
     assert blocked.status_code == 429
+    assert blocked.headers["X-RateLimit-Limit"] == str(settings.AUTH_RATE_LIMIT_PER_MINUTE)
+    assert blocked.headers["X-RateLimit-Remaining"] == "0"
+    assert 1 <= int(blocked.headers["Retry-After"]) <= 60
+
+
+def test_rate_limit_headers_count_down_on_allowed_requests(client):
+    username, password = create_user(client, "rate_headers")
+    rate_limit.rate_limiter._hits.clear()
+
+    first = client.post("/auth/login", json={"username": username, "password": password})
+    second = client.post("/auth/login", json={"username": username, "password": password})
+    assert first.headers["X-RateLimit-Limit"] == str(settings.AUTH_RATE_LIMIT_PER_MINUTE)
+    assert int(first.headers["X-RateLimit-Remaining"]) == settings.AUTH_RATE_LIMIT_PER_MINUTE - 1
+    assert int(second.headers["X-RateLimit-Remaining"]) == settings.AUTH_RATE_LIMIT_PER_MINUTE - 2
+    assert 0 < int(first.headers["X-RateLimit-Reset"]) <= 60
+
+
+def test_in_memory_limiter_slides_instead_of_resetting_on_window_boundary():
+    limiter = rate_limit.InMemoryRateLimiter()
+    assert [limiter.hit("probe", 2, 1).allowed for _ in range(3)] == [True, True, False]
+
+    # Recusadas nao entram no log: a vaga volta quando a mais antiga sai da janela.
+    blocked = limiter.hit("probe", 2, 1)
+    assert blocked.remaining == 0 and 0 < blocked.reset_seconds <= 1
+    time.sleep(1.05)
+    assert limiter.hit("probe", 2, 1).allowed is True
+
+
+def test_redis_limiter_checks_with_a_single_script_call():
+    calls = []
+
+    class RecordingClient:
+        def register_script(self, script):
+            assert "ZREMRANGEBYSCORE" in script and "PEXPIRE" in script
+
+            def run(keys, args):
+                calls.append((keys, args))
+                return [0, 5, 1500]
+
+            return run
+
+    result = rate_limit.RedisRateLimiter(RecordingClient()).hit("auth:login:1.2.3.4", 5, 60)
+
+    assert len(calls) == 1
+    assert calls[0][0] == ["auth:login:1.2.3.4"]
+    assert calls[0][1][:2] == [5, 60000]
+    assert result.allowed is False and result.remaining == 0
+    assert result.headers()["Retry-After"] == "2"
+    assert result.headers()["X-RateLimit-Reset"] == "2"
+
 
 
 
@@ -7,6 +7,7 @@ import uuid
 
 from app import models
 from app.external.anime_client import JikanAnimeClient
+from app.repositories.anime_repository import AnimeRepository
 from app.tests import conftest as test_setup
 
 
@@ -86,5 +87,35 @@ def test_admin_sync_animes_manual_trigger(client, monkeypatch):
     assert sync_response.json()["synced_count"] >= 1
 
 
+def test_bulk_upsert_catalog_dedupes_and_skips_unchanged_rows():
+    base_mal_id = 900000 + int(uuid.uuid4().int % 50000)
+    items = [
+        {"mal_id": base_mal_id, "title": "Bulk A", "genre": "Action", "episodes": 12, "members": 10},
+        {"mal_id": base_mal_id + 1, "title": "Bulk B", "genre": "Drama", "episodes": 24, "members": 20},
+        {"mal_id": base_mal_id, "title": "Bulk A (latest)", "genre": "Action", "episodes": 12, "members": 11},
+        {"mal_id": None, "title": "Ignored"},
+    ]
+    repository = AnimeRepository()
+    db = test_setup.TestingSessionLocal()
+    try:
+        assert repository.bulk_upsert_catalog(db, items, batch_size=1) == 2
+        db.commit()
+        first = db.query(models.Anime).filter(models.Anime.mal_id == base_mal_id).one()
+        assert first.title == "Bulk A (latest)"
+        first_synced_at = first.last_synced_at
+
+        assert repository.bulk_upsert_catalog(db, items) == 0
+        db.commit()
+        assert db.query(models.Anime).filter(models.Anime.mal_id == base_mal_id).one().last_synced_at == first_synced_at
+
+        changed = [{**items[1], "members": 21}]
+        assert repository.bulk_upsert_catalog(db, changed) == 1
+        assert repository.bulk_upsert_catalog(db, changed, touch_unchanged=True) == 1
+        db.commit()
+        assert db.query(models.Anime).filter(models.Anime.mal_id == base_mal_id + 1).one().members == 21
+    finally:
+        db.close()
+
+
 
 
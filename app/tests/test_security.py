@@ -5,7 +5,13 @@
 
 import uuid
 
+import jwt
+from sqlalchemy import event
+
 from app import models
+from app.core.auth import principal_cache_key
+from app.core.cache import cache_store
+from app.core.config import settings
 from app.tests import conftest as test_setup
 
 
@@ -86,5 +92,66 @@ def test_admin_role_enforced_and_metrics_available(client):
     assert "anime_manager_http_requests_total" in metrics_response.text
 
 
+def test_authenticated_requests_reuse_cached_principal(client):
+    user_id, headers = create_user_and_token(client, "sec_cache")
+    claims = jwt.decode(
+        headers["Authorization"].split()[1],
+        settings.SECRET_KEY,
+        algorithms=[settings.ALGORITHM],
+        audience=settings.JWT_AUDIENCE,
+        issuer=settings.JWT_ISSUER,
+    )
+    assert claims["uid"] == user_id and claims["role"] == "user" and claims["jti"]
+
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_setup.engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/auth/me", headers=headers)
+    finally:
+        event.remove(test_setup.engine, "before_cursor_execute", record)
+    assert response.status_code == 200
+    assert response.json()["id"] == user_id
+    assert not [statement for statement in statements if "FROM users" in statement]
+
+
+def test_committed_role_and_active_changes_invalidate_cached_principal(client):
+    user_id, headers = create_user_and_token(client, "sec_promote")
+    assert client.get("/auth/me", headers=headers).json()["role"] == "user"
+    assert cache_store.get(principal_cache_key(user_id)) is not None
+
+    # Rollback: a mudanca nunca existiu, o principal em cache continua valendo.
+    db = test_setup.TestingSessionLocal()
+    try:
+        db.query(models.User).filter(models.User.id == user_id).first().role = "admin"
+        db.flush()
+        db.rollback()
+    finally:
+        db.close()
+    assert cache_store.get(principal_cache_key(user_id))["role"] == "user"
+
+    db = test_setup.TestingSessionLocal()
+    try:
+        db.query(models.User).filter(models.User.id == user_id).first().role = "admin"
+        db.commit()
+    finally:
+        db.close()
+    assert cache_store.get(principal_cache_key(user_id)) is None
+    assert client.get("/auth/me", headers=headers).json()["role"] == "admin"
+
+    db = test_setup.TestingSessionLocal()
+    try:
+        db.query(models.User).filter(models.User.id == user_id).first().is_active = False
+        db.commit()
+    finally:
+        db.close()
+    assert client.get("/auth/me", headers=headers).json()["is_active"] is False
+
+
+
 
 
@@ -5,6 +5,10 @@
 
 import uuid
 
+from app import models
+from app.core.config import settings
+from app.tests.conftest import TestingSessionLocal
+
 
 def create_user_and_token(client, suffix: str):
     username = f"user_{suffix}_{uuid.uuid4().hex[:6]}"
@@ -88,5 +92,106 @@ def test_social_review_feed_and_dashboard(client):
     assert "user_stats" in dashboard
 
 
+def test_feed_reads_fanned_out_timeline_and_pulls_high_follower_authors(client, monkeypatch):
+    author_id, author_headers = create_user_and_token(client, "author")
+    celebrity_id, celebrity_headers = create_user_and_token(client, "celebrity")
+    reader_id, reader_headers = create_user_and_token(client, "reader")
+    anime_id = client.post(
+        "/animes",
+        json={"title": "Mushishi", "genre": "Slice of Life", "episodes": 26},
+        headers=author_headers,
+    ).json()["id"]
+
+    for following_id in (author_id, celebrity_id):
+        response = client.post(
+            "/social/follow",
+            json={"follower_id": reader_id, "following_id": following_id},
+            headers=reader_headers,
+        )
+        assert response.status_code == 200
+
+    review = client.post(
+        "/social/reviews",
+        json={"user_id": author_id, "anime_id": anime_id, "score": 9, "content": "Quiet and beautiful."},
+        headers=author_headers,
+    ).json()
+    monkeypatch.setattr(settings, "TIMELINE_FANOUT_MAX_FOLLOWERS", 0)
+    celebrity_review = client.post(
+        "/social/reviews",
+        json={"user_id": celebrity_id, "anime_id": anime_id, "score": 7, "content": "Too slow for me."},
+        headers=celebrity_headers,
+    ).json()
+
+    db = TestingSessionLocal()
+    try:
+        entries = db.query(models.TimelineEntry).filter(models.TimelineEntry.owner_id == reader_id).all()
+        pushed_targets = {
+            db.get(models.Activity, entry.activity_id).target_id
+            for entry in entries
+        }
+    finally:
+        db.close()
+    assert review["id"] in pushed_targets
+    assert celebrity_review["id"] not in pushed_targets
+
+    feed = client.get(f"/social/feed/{reader_id}", headers=reader_headers).json()
+    review_targets = [item["target_id"] for item in feed if item["activity_type"] == "review_created"]
+    assert review_targets == [celebrity_review["id"], review["id"]]
+
+    second_page = client.get(f"/social/feed/{reader_id}?limit=1&offset=1", headers=reader_headers).json()
+    assert second_page == feed[1:2]
+
+
+def test_feed_and_dashboard_cursor_pagination(client):
+    author_id, author_headers = create_user_and_token(client, "pager")
+    reader_id, reader_headers = create_user_and_token(client, "scroller")
+    client.post(
+        "/social/follow",
+        json={"follower_id": reader_id, "following_id": author_id},
+        headers=reader_headers,
+    )
+    anime_id = client.post(
+        "/animes",
+        json={"title": "Haikyuu", "genre": "Sports", "episodes": 85},
+        headers=author_headers,
+    ).json()["id"]
+    for score in range(1, 6):
+        client.post(
+            "/social/reviews",
+            json={"user_id": author_id, "anime_id": anime_id, "score": score, "content": f"Take {score}"},
+            headers=author_headers,
+        )
+
+    full_feed = client.get(f"/social/feed/{reader_id}?limit=100", headers=reader_headers).json()
+    assert len(full_feed) == 5
+
+    collected, cursor = [], None
+    while True:
+        url = f"/social/feed/{reader_id}?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(url, headers=reader_headers)
+        assert response.status_code == 200
+        collected.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert collected == full_feed
+
+    conflicting = client.get(f"/social/feed/{reader_id}?limit=2&offset=2&cursor=abc", headers=reader_headers)
+    assert conflicting.status_code == 400
+    invalid = client.get(f"/social/feed/{reader_id}?cursor=not-a-cursor", headers=reader_headers)
+    assert invalid.status_code == 400
+
+    first = client.get(f"/social/dashboard/{author_id}?activity_limit=3", headers=author_headers).json()
+    assert len(first["recent_activities"]) == 3
+    second = client.get(
+        f"/social/dashboard/{author_id}?activity_limit=3&activity_cursor={first['next_activity_cursor']}",
+        headers=author_headers,
+    ).json()
+    assert second["next_activity_cursor"] is None
+    ids = [item["id"] for item in first["recent_activities"] + second["recent_activities"]]
+    assert len(ids) == len(set(ids)) == 5
+    assert ids == sorted(ids, reverse=True)
+
+
 
 
@@ -5,6 +5,14 @@
 
 import uuid
 
+import pytest
+from fastapi import HTTPException
+
+from app import models
+from app.core.cache import cache_store
+from app.services.stats_service import USER_STATS_NAMESPACE, StatsService
+from app.tests.conftest import TestingSessionLocal
+
 
 def setup_stats_data(client):
     unique = uuid.uuid4().hex[:8]
@@ -94,5 +102,78 @@ def test_global_stats(client):
     assert payload["best_rated"] is not None
 
 
+def anime_stats_snapshot(anime_ids):
+    db = TestingSessionLocal()
+    try:
+        rows = db.query(models.AnimeStats).filter(models.AnimeStats.anime_id.in_(anime_ids)).all()
+        return {
+            row.anime_id: (row.watcher_count, row.score_sum, row.score_count, row.average_score)
+            for row in rows
+        }
+    finally:
+        db.close()
+
+
+def test_anime_stats_follow_writes_and_match_rebuild(client):
+    user_id, headers = setup_stats_data(client)
+    entries = client.get(f"/user-animes/user/{user_id}", headers=headers).json()
+    by_score = {entry["score"]: entry for entry in entries}
+    anime_ids = [entry["anime_id"] for entry in entries]
+
+    assert anime_stats_snapshot(anime_ids) == {
+        by_score[10]["anime_id"]: (1, 10, 1, 10.0),
+        by_score[8]["anime_id"]: (1, 8, 1, 8.0),
+    }
+    assert client.get(f"/stats/users/{user_id}", headers=headers).json()["average_score"] == 9.0
+
+    response = client.patch(f"/user-animes/{by_score[8]['id']}", json={"score": 6}, headers=headers)
+    assert response.status_code == 200
+    incremental = anime_stats_snapshot(anime_ids)
+    assert incremental[by_score[8]["anime_id"]] == (1, 6, 1, 6.0)
+    # O relay recalcula o stats ja cacheado: a chave tem o valor novo sem ter sido apagada.
+    cached = cache_store.get(cache_store.namespace_key(USER_STATS_NAMESPACE, user_id))
+    assert cached["average_score"] == 8.0
+    assert client.get(f"/stats/users/{user_id}", headers=headers).json()["average_score"] == 8.0
+
+    db = TestingSessionLocal()
+    try:
+        db.query(models.User).filter(models.User.id == user_id).first().role = "admin"
+        db.commit()
+    finally:
+        db.close()
+    rebuild = client.post("/admin/rebuild-anime-stats", headers=headers)
+    assert rebuild.status_code == 200
+    assert rebuild.json()["rebuilt_count"] >= 2
+    assert anime_stats_snapshot(anime_ids) == incremental
+
+
+def test_user_stats_for_empty_list_and_unknown_user(client):
+    unique = uuid.uuid4().hex[:8]
+    user_id = client.post(
+        "/auth/register",
+        json={"username": f"empty_{unique}", "email": f"empty_{unique}@test.com", "password": "abc123"},
+    ).json()["id"]
+    token = client.post("/auth/login", json={"username": f"empty_{unique}", "password": "abc123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    payload = client.get(f"/stats/users/{user_id}", headers=headers).json()
+    assert payload == {
+        "average_score": None,
+        "total_watched_episodes": 0,
+        "total_completed": 0,
+        "personal_ranking": [],
+    }
+
+    db = TestingSessionLocal()
+    try:
+        with pytest.raises(HTTPException) as missing:
+            StatsService()._compute_user_stats(db, 999999)
+        assert missing.value.status_code == 404
+        # Sem stats em cache nao ha o que manter quente: o relay nao faz query.
+        assert StatsService().recompute_cached_user_stats(db, 999999) is False
+    finally:
+        db.close()
+
+
 
 